@@ -8,11 +8,27 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
 
+@dataclass
+class VADConfig:
+    enabled: bool = False            # watch live audio and stop ARI recordings at end of utterance
+    stop_recording: bool = True      # False = shadow mode: measure only, let maxSilence end the turn
+    backend: str = "energy"          # energy | webrtc (needs the webrtcvad package)
+    mode: int = 2                    # 0 (permissive) .. 3 (aggressive)
+    threshold_db: float = -45.0      # absolute speech floor in dBFS
+    min_speech_ms: int = 200
+    end_silence_ms: int = 700
+
+
 @dataclass
 class STTConfig:
     hotwords: List[str] = field(default_factory=list)
     max_duration: int = 10
     max_silence: int = 2
+    # Stream caller audio over ARI external media and transcribe at pauses.
+    streaming: bool = False
+    # Send raw and enhanced audio to STT concurrently; the first non-empty transcript wins.
+    speculative: bool = False
+    vad: VADConfig = field(default_factory=VADConfig)
 
 
 @dataclass
@@ -20,6 +36,7 @@ class LLMConfig:
     prompt_template: str = ""
     intent_categories: List[str] = field(default_factory=lambda: ["yes", "no", "number_question", "unknown"])
     fallback_tokens: Dict[str, List[str]] = field(default_factory=dict)
+    local_threshold: float = 0.0     # answer with the on-box classifier at/above this confidence; 0 = always ask the LLM
 
 
 @dataclass
@@ -41,12 +41,19 @@ class AriSettings:
     app_name: str
     username: str
     password: str
+    event_workers: int = 32  # per-channel ordered dispatch lanes
+    event_queue_size: int = 1000  # per lane; also bounds the WebSocket receive buffer
+    event_overflow: str = "block"  # block | drop | spawn when a lane is full
+    event_filter: bool = True  # subscribe to handled event types only (ARI application eventFilter)
 
 
 @dataclass
 class GapGPTSettings:
     base_url: str
     api_key: str
+    batch_window_ms: float = 0.0  # 0 disables micro-batching of intent classifications
+    batch_max_items: int = 16
+    stream: bool = True  # read intent replies as SSE and stop at the first label
 
 
 @dataclass
@@ -56,6 +63,24 @@ class ViraSettings:
     stt_url: str
     tts_url: str
     verify_ssl: bool
+    enhance_backend: str = "numpy"
+
+
+@dataclass
+class StreamingSettings:
+    bind_host: str
+    advertise_host: str
+    codec: str
+
+
+@dataclass
+class AuditSettings:
+    directory: str
+    sample_rate: float
+    queue_size: int
+    max_bytes: int
+    max_age_hours: float
+    prune_interval: float = 300.0
 
 
 @dataclass
@@ -90,6 +115,34 @@ class DialerSettings:
     static_contacts: List[str]
     batch_size: int
     default_retry: int
+    max_inflight_originations: int = 8
+
+
+@dataclass
+class IntentCacheSettings:
+    max_entries: int
+    ttl_seconds: float
+    path: str
+
+
+@dataclass
+class IntentClassifierSettings:
+    path: str
+
+
+@dataclass
+class PacingSettings:
+    enabled: bool  # predictive pacing against free outbound agents
+    target_abandon: float  # acceptable share of transfers that find no free agent
+    window: int  # calls remembered for answer/transfer rates and timings
+    min_samples: int  # completed calls before learned rates replace the conservative prior
+
+
+@dataclass
+class WarmupSettings:
+    connections: int  # keep-alive connections opened per upstream at startup; 0 skips warm-up
+    timeout: float
+    readiness_file: str
 
 
 @dataclass
@@ -98,6 +151,8 @@ class ConcurrencySettings:
     max_parallel_tts: int
     max_parallel_llm: int
     http_max_connections: int
+    audio_workers: int = 2
+    audio_worker_queue: int = 64
 
 
 @dataclass
@@ -122,6 +177,9 @@ class PanelSettings:
     base_url: str
     api_token: str
     company: str
+    outbox_path: str = "logs/panel_outbox.sqlite"
+    outbox_max: int = 10000
+    report_concurrency: int = 4
 
 
 @dataclass
@@ -133,6 +191,12 @@ class Settings:
     operator: OperatorSettings
     panel: PanelSettings
     audio: AudioSettings
+    audit: AuditSettings
+    streaming: StreamingSettings
+    intent_cache: IntentCacheSettings
+    intent_classifier: IntentClassifierSettings
+    warmup: WarmupSettings
+    pacing: PacingSettings
     concurrency: ConcurrencySettings
     timeouts: TimeoutSettings
     sms: SMSSettings
@@ -150,11 +214,18 @@ def get_settings() -> Settings:
         app_name=os.getenv("ARI_APP_NAME", "salehi"),
         username=os.getenv("ARI_USERNAME", "salehi"),
         password=os.getenv("ARI_PASSWORD", "changeme"),
+        event_workers=int(os.getenv("ARI_EVENT_WORKERS", "32")),
+        event_queue_size=int(os.getenv("ARI_EVENT_QUEUE_SIZE", "1000")),
+        event_overflow=os.getenv("ARI_EVENT_OVERFLOW", "block").strip().lower(),
+        event_filter=os.getenv("ARI_EVENT_FILTER", "true").lower() not in ("0", "false", "no"),
     )
 
     gapgpt = GapGPTSettings(
         base_url=os.getenv("GAPGPT_BASE_URL", "https://api.gapgpt.app/v1"),
         api_key=os.getenv("GAPGPT_API_KEY", ""),
+        batch_window_ms=float(os.getenv("LLM_BATCH_WINDOW_MS", "0")),
+        batch_max_items=int(os.getenv("LLM_BATCH_MAX_ITEMS", "16")),
+        stream=os.getenv("LLM_STREAM", "true").lower() not in ("0", "false", "no"),
     )
 
     vira = ViraSettings(
@@ -167,6 +238,7 @@ def get_settings() -> Settings:
             "VIRA_TTS_URL", "https://partai.gw.isahab.ir/avasho/v2/avasho/request"
         ),
         verify_ssl=os.getenv("VIRA_VERIFY_SSL", "true").lower() not in ("0", "false", "no"),
+        enhance_backend=os.getenv("STT_ENHANCE_BACKEND", "numpy").strip().lower(),
     )
 
     call_window_start = _parse_time(
@@ -190,6 +262,7 @@ def get_settings() -> Settings:
         static_contacts=_parse_list(os.getenv("STATIC_CONTACTS", "")),
         batch_size=int(os.getenv("DIALER_BATCH_SIZE", os.getenv("MAX_CALLS_PER_MINUTE", "10"))),
         default_retry=int(os.getenv("DIALER_DEFAULT_RETRY", "60")),
+        max_inflight_originations=int(os.getenv("MAX_INFLIGHT_ORIGINATIONS", "8")),
     )
 
     operator = OperatorSettings(
@@ -207,6 +280,9 @@ def get_settings() -> Settings:
         base_url=os.getenv("PANEL_BASE_URL", ""),
         api_token=os.getenv("PANEL_API_TOKEN", ""),
         company=company,
+        outbox_path=os.getenv("PANEL_OUTBOX_PATH", "logs/panel_outbox.sqlite"),
+        outbox_max=int(os.getenv("PANEL_OUTBOX_MAX", "10000")),
+        report_concurrency=int(os.getenv("PANEL_REPORT_CONCURRENCY", "4")),
     )
 
     audio = AudioSettings(
@@ -215,11 +291,50 @@ def get_settings() -> Settings:
         ast_sound_dir=os.getenv("AST_SOUND_DIR", "/var/lib/asterisk/sounds/custom"),
     )
 
+    audit = AuditSettings(
+        directory=os.getenv("AUDIT_DIR", "/var/spool/asterisk/recording/enhanced"),
+        sample_rate=float(os.getenv("AUDIT_SAMPLE_RATE", "1.0")),
+        queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "256")),
+        max_bytes=int(float(os.getenv("AUDIT_MAX_MB", "2048")) * 1024 * 1024),
+        max_age_hours=float(os.getenv("AUDIT_MAX_AGE_HOURS", "168")),
+    )
+
+    streaming = StreamingSettings(
+        bind_host=os.getenv("STT_STREAM_BIND_HOST", "127.0.0.1"),
+        advertise_host=os.getenv("STT_STREAM_HOST", "127.0.0.1"),
+        codec=os.getenv("STT_STREAM_CODEC", "slin16").strip().lower(),
+    )
+
+    intent_cache = IntentCacheSettings(
+        max_entries=int(os.getenv("INTENT_CACHE_SIZE", "10000")),
+        ttl_seconds=float(os.getenv("INTENT_CACHE_TTL_HOURS", "24")) * 3600,
+        path=os.getenv("INTENT_CACHE_PATH", ""),
+    )
+
+    intent_classifier = IntentClassifierSettings(
+        path=os.getenv("INTENT_CLASSIFIER_PATH", ""),
+    )
+
+    pacing = PacingSettings(
+        enabled=os.getenv("PACING_ENABLED", "false").lower() not in ("0", "false", "no"),
+        target_abandon=float(os.getenv("PACING_TARGET_ABANDON", "0.03")),
+        window=int(os.getenv("PACING_WINDOW", "200")),
+        min_samples=int(os.getenv("PACING_MIN_SAMPLES", "30")),
+    )
+
+    warmup = WarmupSettings(
+        connections=int(os.getenv("WARMUP_CONNECTIONS", "4")),
+        timeout=float(os.getenv("WARMUP_TIMEOUT", "15")),
+        readiness_file=os.getenv("READINESS_FILE", ""),
+    )
+
     concurrency = ConcurrencySettings(
         max_parallel_stt=int(os.getenv("MAX_PARALLEL_STT", "50")),
         max_parallel_tts=int(os.getenv("MAX_PARALLEL_TTS", "50")),
         max_parallel_llm=int(os.getenv("MAX_PARALLEL_LLM", "10")),
         http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        audio_workers=int(os.getenv("AUDIO_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        audio_worker_queue=int(os.getenv("AUDIO_WORKER_QUEUE", "64")),
     )
 
     timeouts = TimeoutSettings(
@@ -248,6 +363,12 @@ def get_settings() -> Settings:
         operator=operator,
         panel=panel,
         audio=audio,
+        audit=audit,
+        streaming=streaming,
+        intent_cache=intent_cache,
+        intent_classifier=intent_classifier,
+        warmup=warmup,
+        pacing=pacing,
         concurrency=concurrency,
         timeouts=timeouts,
         sms=sms,
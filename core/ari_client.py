@@ -1,5 +1,6 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import quote
 
 import httpx
 
@@ -57,6 +58,14 @@ class AriClient:
             return response.json()
         return {}
 
+    async def set_event_filter(self, allowed: Iterable[str]) -> Dict[str, Any]:
+        """Limit the events Asterisk sends this application to the given types."""
+        return await self._request(
+            "PUT",
+            f"/applications/{quote(self.app_name, safe='')}/eventFilter",
+            json={"allowed": [{"type": event_type} for event_type in sorted(allowed)]},
+        )
+
     async def create_bridge(self, name: str, bridge_type: str = "mixing") -> Dict[str, Any]:
         return await self._request(
             "POST",
@@ -159,6 +168,29 @@ class AriClient:
             "POST", f"/channels/{channel_id}/record", params=params
         )
 
+    async def snoop_channel(
+        self, channel_id: str, app_args: str, spy: str = "in"
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "app": self.app_name,
+            "appArgs": app_args,
+            "spy": spy,
+        }
+        return await self._request(
+            "POST", f"/channels/{channel_id}/snoop", params=params
+        )
+
+    async def external_media(self, external_host: str, fmt: str = "slin16") -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "app": self.app_name,
+            "external_host": external_host,
+            "format": fmt,
+            "encapsulation": "rtp",
+            "transport": "udp",
+            "direction": "both",
+        }
+        return await self._request("POST", "/channels/externalMedia", params=params)
+
     async def get_channel_variable(self, channel_id: str, variable: str) -> Optional[str]:
         try:
             resp = await self._request(
@@ -169,6 +201,18 @@ class AriClient:
             logger.debug("Failed to fetch channel var %s for %s: %s", variable, channel_id, exc)
             return None
 
+    async def stop_recording(self, name: str) -> None:
+        """Stop a live recording now; Asterisk then emits RecordingFinished."""
+        await self._request("POST", f"/recordings/live/{name}/stop")
+
+    async def sound_exists(self, sound_id: str) -> bool:
+        """True if Asterisk knows `sound_id` (e.g. "custom/hello"); False on 404."""
+        response = await self.client.get(f"/sounds/{quote(sound_id, safe='')}")
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
     async def fetch_stored_recording(self, name: str) -> bytes:
         logger.debug("Fetching stored recording %s", name)
         response = await self.client.get(f"/recordings/stored/{name}/file")
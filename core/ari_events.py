@@ -0,0 +1,42 @@
+"""
+Decoding helpers for ARI WebSocket messages.
+
+`loads` uses orjson or msgspec when installed and falls back to the stdlib.
+`sniff_type` reads the event type without a full decode: Asterisk puts
+"type" first in every event object, so an anchored regex is enough to drop
+uninteresting events (ChannelVarset, ChannelDialplan, ...) before parsing.
+"""
+import json
+import re
+from typing import Optional, Union
+
+try:  # Optional: pip install orjson
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+    DECODE_ERRORS: tuple = (ValueError,)
+except ImportError:
+    try:  # Optional: pip install msgspec
+        import msgspec
+
+        loads = msgspec.json.Decoder().decode
+        JSON_BACKEND = "msgspec"
+        DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+    except ImportError:
+        loads = json.loads
+        JSON_BACKEND = "json"
+        DECODE_ERRORS = (ValueError,)
+
+
+_TYPE_PREFIX = re.compile(r'\s*\{\s*"type"\s*:\s*"([^"\\]+)"')
+_TYPE_PREFIX_BYTES = re.compile(rb'\s*\{\s*"type"\s*:\s*"([^"\\]+)"')
+
+
+def sniff_type(message: Union[str, bytes]) -> Optional[str]:
+    """Event type when "type" is the first key of the message, else None (decode to find out)."""
+    if isinstance(message, bytes):
+        match = _TYPE_PREFIX_BYTES.match(message)
+        return match.group(1).decode() if match else None
+    match = _TYPE_PREFIX.match(message)
+    return match.group(1) if match else None
@@ -1,13 +1,16 @@
 import asyncio
-import json
 import logging
-from typing import Awaitable, Callable, Optional
+from typing import Awaitable, Callable, Iterable, Optional, Union
 
 import websockets
 from websockets import WebSocketClientProtocol
 from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
 
 from config.settings import AriSettings
+from core.ari_client import AriClient
+from core.ari_events import DECODE_ERRORS, JSON_BACKEND, loads, sniff_type
+from core.event_dispatcher import EventDispatcher
+from utils.metrics import Counters
 
 
 logger = logging.getLogger(__name__)
@@ -15,18 +18,38 @@ logger = logging.getLogger(__name__)
 
 class AriWebSocketClient:
     """
-    Subscribes to ARI events and forwards them to the provided async handler.
+    Subscribes to ARI events and forwards them to the provided async handler
+    through an `EventDispatcher` (ordered per channel, bounded per worker).
+    With `event_types`, other events are dropped before full decode and, when
+    `ari_client` is given and ARI_EVENT_FILTER is on, Asterisk is asked not to
+    send them at all.
     """
 
     def __init__(
         self,
         settings: AriSettings,
         event_handler: Callable[[dict], Awaitable[None]],
+        event_types: Optional[Iterable[str]] = None,
+        ari_client: Optional[AriClient] = None,
     ):
         self.settings = settings
         self.event_handler = event_handler
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.ari_client = ari_client
+        # Per event type.
+        self.received = Counters()
+        self.dropped = Counters()
+        self.dispatched = Counters()
+        self.dispatcher = EventDispatcher(
+            event_handler,
+            workers=settings.event_workers,
+            queue_size=settings.event_queue_size,
+            overflow=settings.event_overflow,
+        )
         self._ws: Optional[WebSocketClientProtocol] = None
         self._stop_event = asyncio.Event()
+        # Set while the event subscription is live (used by startup warm-up).
+        self.connected = asyncio.Event()
 
     def _build_url(self) -> str:
         return (
@@ -37,8 +60,9 @@ class AriWebSocketClient:
 
     async def run(self) -> None:
         """
-        Maintain the WebSocket connection and fan out events as tasks.
+        Maintain the WebSocket connection and fan out events to the dispatcher workers.
         """
+        self.dispatcher.start()
         while not self._stop_event.is_set():
             url = self._build_url()
             try:
@@ -47,10 +71,13 @@ class AriWebSocketClient:
                     url,
                     ping_interval=20,
                     ping_timeout=20,
-                    max_queue=None,
+                    # Bounded so a blocked dispatcher back-pressures the socket.
+                    max_queue=self.settings.event_queue_size,
                 ) as ws:
                     self._ws = ws
-                    logger.info("Connected to ARI WebSocket")
+                    self.connected.set()
+                    logger.info("Connected to ARI WebSocket (json=%s)", JSON_BACKEND)
+                    await self._apply_event_filter()
                     await self._consume(ws)
             except (ConnectionClosedError, ConnectionClosedOK) as exc:
                 if self._stop_event.is_set():
@@ -61,6 +88,7 @@ class AriWebSocketClient:
                     break
                 logger.exception("WebSocket error; reconnecting: %s", exc)
             self._ws = None
+            self.connected.clear()
             if not self._stop_event.is_set():
                 await asyncio.sleep(1)
         logger.info("ARI WebSocket listener stopped")
@@ -71,13 +99,39 @@ class AriWebSocketClient:
                 break
             await self._handle_message(message)
 
-    async def _handle_message(self, message: str) -> None:
+    async def _apply_event_filter(self) -> None:
+        if not (self.settings.event_filter and self.event_types and self.ari_client):
+            return
+        try:
+            await self.ari_client.set_event_filter(self.event_types)
+            logger.info("ARI event filter set: %s", ", ".join(sorted(self.event_types)))
+        except Exception as exc:
+            # Older Asterisk has no eventFilter endpoint; local filtering still applies.
+            logger.warning("ARI event filter not applied; filtering locally: %s", exc)
+
+    def _wanted(self, event_type: str) -> bool:
+        if self.event_types is None or event_type in self.event_types:
+            return True
+        self.dropped.inc(event_type)
+        return False
+
+    async def _handle_message(self, message: Union[str, bytes]) -> None:
         try:
-            event = json.loads(message)
-            logger.debug("Received ARI event: %s", event.get("type"))
-            task = asyncio.create_task(self.event_handler(event))
-            task.add_done_callback(self._log_task_exception)
-        except json.JSONDecodeError:
+            event_type = sniff_type(message)
+            if event_type is not None:
+                self.received.inc(event_type)
+                if not self._wanted(event_type):
+                    return
+            event = loads(message)
+            if event_type is None:
+                event_type = event.get("type") or "unknown"
+                self.received.inc(event_type)
+                if not self._wanted(event_type):
+                    return
+            logger.debug("Received ARI event: %s", event_type)
+            self.dispatched.inc(event_type)
+            await self.dispatcher.dispatch(event)
+        except DECODE_ERRORS:
             logger.error("Failed to decode ARI event: %s", message)
         except Exception as exc:
             logger.exception("Unexpected error handling ARI event: %s", exc)
@@ -86,12 +140,13 @@ class AriWebSocketClient:
         self._stop_event.set()
         if self._ws:
             await self._ws.close()
+        await self.dispatcher.stop()
 
-    @staticmethod
-    def _log_task_exception(task: asyncio.Task) -> None:
-        try:
-            exc = task.exception()
-        except asyncio.CancelledError:
-            return
-        if exc:
-            logger.exception("Unhandled exception in ARI event task: %s", exc)
+    def stats(self) -> dict:
+        return {
+            "json_backend": JSON_BACKEND,
+            "received": self.received.snapshot(),
+            "dropped": self.dropped.snapshot(),
+            "dispatched": self.dispatched.snapshot(),
+            "dispatcher": self.dispatcher.stats(),
+        }
@@ -0,0 +1,145 @@
+"""
+Ordered, bounded dispatch of ARI events.
+
+Events are hashed by the channel they concern (channel id, Dial peer, or the
+`channel:<id>` target of a playback/recording) onto a fixed set of worker
+queues. Each worker handles its queue one event at a time, so events for the
+same channel keep their WebSocket order (PlaybackFinished before
+ChannelHangupRequest before StasisEnd) while different calls run in parallel.
+Events without a channel are spread round-robin.
+
+When a worker queue is full the overflow policy decides:
+- "block": wait for room, which back-pressures the WebSocket reader (default)
+- "drop": discard the event and count it
+- "spawn": run it as a detached task (the old unbounded behaviour, unordered)
+"""
+import asyncio
+import logging
+import zlib
+from typing import Awaitable, Callable, List, Optional, Set
+
+from utils.metrics import Counters, LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop", "spawn")
+
+
+def event_key(event: dict) -> Optional[str]:
+    """Channel (or bridge) an event belongs to, used to keep per-call ordering."""
+    channel = event.get("channel")
+    if isinstance(channel, dict) and channel.get("id"):
+        return channel["id"]
+    peer = event.get("peer")
+    if isinstance(peer, dict) and peer.get("id"):
+        return peer["id"]
+    for name in ("playback", "recording"):
+        item = event.get(name)
+        if isinstance(item, dict):
+            target = item.get("target_uri") or ""
+            if target.startswith("channel:"):
+                return target[len("channel:"):]
+            if target:
+                return target
+    return None
+
+
+class EventDispatcher:
+    def __init__(
+        self,
+        handler: Callable[[dict], Awaitable[None]],
+        workers: int = 32,
+        queue_size: int = 1000,
+        overflow: str = "block",
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown ARI event overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}")
+        self.handler = handler
+        self.overflow = overflow
+        self.queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=max(1, queue_size)) for _ in range(max(1, workers))]
+        self.high_water = [0] * len(self.queues)
+        self.counters = Counters()
+        self.latency = LatencyStats()
+        self._tasks: List[asyncio.Task] = []
+        self._round_robin = 0
+        self._spawned: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work(queue)) for queue in self.queues]
+
+    async def stop(self) -> None:
+        tasks = self._tasks + list(self._spawned)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _index(self, event: dict) -> int:
+        key = event_key(event)
+        if key is None:
+            self._round_robin = (self._round_robin + 1) % len(self.queues)
+            return self._round_robin
+        return zlib.crc32(key.encode()) % len(self.queues)
+
+    async def dispatch(self, event: dict) -> None:
+        self.start()
+        index = self._index(event)
+        queue = self.queues[index]
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.counters.inc("overflow")
+            if self.overflow == "drop":
+                self.counters.inc("dropped")
+                logger.warning("ARI event queue %d full; dropping %s", index, event.get("type"))
+                return
+            if self.overflow == "spawn":
+                self.counters.inc("spawned")
+                task = asyncio.create_task(self._handle(event))
+                self._spawned.add(task)
+                task.add_done_callback(self._spawned.discard)
+                return
+            await queue.put(event)
+        self.counters.inc("dispatched")
+        depth = queue.qsize()
+        if depth > self.high_water[index]:
+            self.high_water[index] = depth
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                await self._handle(event)
+            finally:
+                queue.task_done()
+
+    async def _handle(self, event: dict) -> None:
+        try:
+            with self.latency.time():
+                await self.handler(event)
+        except Exception as exc:
+            self.counters.inc("errors")
+            logger.exception("Unhandled exception in ARI event handler (%s): %s", event.get("type"), exc)
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+        for queue in self.queues:
+            await queue.join()
+
+    def depths(self) -> List[int]:
+        return [queue.qsize() for queue in self.queues]
+
+    def stats(self) -> dict:
+        depths = self.depths()
+        return {
+            "workers": len(self.queues),
+            "overflow_policy": self.overflow,
+            "queued": sum(depths),
+            "max_depth": max(depths),
+            "high_water": max(self.high_water),
+            "counters": self.counters.snapshot(),
+            "handler_latency": self.latency.snapshot(),
+        }
+
@@ -0,0 +1,184 @@
+"""
+Startup warm-up and readiness.
+
+Before the dialer starts, open keep-alive connections to every upstream
+(ARI, Vira STT/TTS, GapGPT, panel) so the first calls after a deploy do not
+pay TCP/TLS setup, confirm the ARI WebSocket subscription is live, and check
+that scenario prompts exist on Asterisk. `Readiness` records the outcome and
+mirrors it to an optional file for external probes.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from config.settings import Settings
+from core.ari_client import AriClient
+from core.ari_ws import AriWebSocketClient
+from integrations.panel.client import PanelClient
+from llm.client import GapGPTClient
+from logic.scenario_registry import ScenarioRegistry
+from stt_tts.vira_stt import ViraSTTClient
+from stt_tts.vira_tts import ViraTTSClient
+
+
+logger = logging.getLogger(__name__)
+
+# Checks that must pass for the service to report ready; the rest are advisory.
+REQUIRED_CHECKS = ("ari", "ari_ws")
+
+
+@dataclass
+class WarmupResult:
+    name: str
+    ok: bool
+    elapsed_ms: float = 0.0
+    opened: int = 0
+    detail: str = ""
+
+
+async def open_connections(
+    client: httpx.AsyncClient, method: str, url: str, count: int, require_ok: bool = False,
+) -> int:
+    """
+    Fire `count` concurrent requests so the pool holds that many keep-alive
+    connections. Any HTTP response counts unless `require_ok`; raises only if
+    every request failed.
+    """
+
+    async def one() -> None:
+        response = await client.request(method, url)
+        if require_ok:
+            response.raise_for_status()
+
+    results = await asyncio.gather(*(one() for _ in range(max(1, count))), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if len(errors) == len(results):
+        raise errors[0]
+    return len(results) - len(errors)
+
+
+def scenario_sounds(registry: ScenarioRegistry) -> List[str]:
+    """Asterisk sound ids referenced by `sound:` prompts across loaded scenarios."""
+    sounds = set()
+    for scenario in registry.get_all().values():
+        for media in scenario.prompts.values():
+            if isinstance(media, str) and media.startswith("sound:"):
+                sounds.add(media[len("sound:"):])
+    return sorted(sounds)
+
+
+async def _check(name: str, fn: Callable[[], Awaitable[WarmupResult]], timeout: float) -> WarmupResult:
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(fn(), timeout)
+    except Exception as exc:
+        result = WarmupResult(name=name, ok=False, detail=str(exc) or type(exc).__name__)
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def warm_up(
+    settings: Settings,
+    ari_client: AriClient,
+    ws_client: AriWebSocketClient,
+    registry: ScenarioRegistry,
+    stt_client: ViraSTTClient,
+    tts_client: ViraTTSClient,
+    llm_client: GapGPTClient,
+    panel_client: Optional[PanelClient] = None,
+) -> List[WarmupResult]:
+    count = settings.warmup.connections
+    timeout = settings.warmup.timeout
+
+    async def ari() -> WarmupResult:
+        opened = await open_connections(ari_client.client, "GET", "/asterisk/info", count, require_ok=True)
+        return WarmupResult(name="ari", ok=True, opened=opened)
+
+    async def ari_ws() -> WarmupResult:
+        await ws_client.connected.wait()
+        return WarmupResult(name="ari_ws", ok=True)
+
+    async def prompts() -> WarmupResult:
+        sounds = scenario_sounds(registry)
+        found = await asyncio.gather(*(ari_client.sound_exists(sound) for sound in sounds))
+        missing = [sound for sound, ok in zip(sounds, found) if not ok]
+        detail = f"missing: {', '.join(missing)}" if missing else f"{len(sounds)} sounds present"
+        return WarmupResult(name="prompts", ok=not missing, detail=detail)
+
+    def pool(name: str, client: httpx.AsyncClient, method: str, url: str, require_ok: bool = False):
+        async def run() -> WarmupResult:
+            opened = await open_connections(client, method, url, count, require_ok=require_ok)
+            return WarmupResult(name=name, ok=True, opened=opened)
+        return run
+
+    checks: Dict[str, Callable[[], Awaitable[WarmupResult]]] = {"ari": ari, "ari_ws": ari_ws, "prompts": prompts}
+    if settings.vira.stt_url:
+        checks["vira_stt"] = pool("vira_stt", stt_client.client, "HEAD", settings.vira.stt_url)
+    if settings.vira.tts_url:
+        checks["vira_tts"] = pool("vira_tts", tts_client.client, "HEAD", settings.vira.tts_url)
+    if llm_client.api_key:
+        # Cheapest authenticated call on an OpenAI-compatible API.
+        checks["gapgpt"] = pool("gapgpt", llm_client.client, "GET", "/models", require_ok=True)
+    if panel_client:
+        checks["panel"] = pool("panel", panel_client.client, "HEAD", "/")
+
+    results = await asyncio.gather(*(_check(name, fn, timeout) for name, fn in checks.items()))
+    for result in results:
+        log = logger.info if result.ok else logger.warning
+        log(
+            "Warm-up %s: %s in %.0f ms (connections=%d) %s",
+            result.name, "ok" if result.ok else "FAILED", result.elapsed_ms, result.opened, result.detail,
+        )
+    return list(results)
+
+
+class Readiness:
+    """
+    Process readiness flag. `ready` turns true once warm-up has run and every
+    required check passed; with `path` set, the state is written there as
+    JSON (and removed on shutdown) for systemd/container probes.
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.ready = False
+        self.results: List[WarmupResult] = []
+
+    def mark(self, results: List[WarmupResult]) -> bool:
+        self.results = results
+        by_name = {result.name: result for result in results}
+        self.ready = all(by_name[name].ok for name in REQUIRED_CHECKS if name in by_name)
+        self._write()
+        return self.ready
+
+    def snapshot(self) -> dict:
+        return {"ready": self.ready, "checks": [asdict(result) for result in self.results]}
+
+    def _write(self) -> None:
+        if not self.path:
+            return
+        try:
+            target = Path(self.path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            tmp.write_text(json.dumps(self.snapshot(), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError as exc:
+            logger.warning("Could not write readiness file %s: %s", self.path, exc)
+
+    def clear(self) -> None:
+        self.ready = False
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.debug("Could not remove readiness file %s: %s", self.path, exc)
@@ -6,9 +6,18 @@ from typing import List, Optional
 
 import httpx
 
+from integrations.panel.outbox import ReportOutbox
+from utils.metrics import Counters
+
 
 logger = logging.getLogger(__name__)
 
+# Report sender backoff after a round with no successful delivery (seconds).
+REPORT_BACKOFF_BASE = 1.0
+REPORT_BACKOFF_MAX = 60.0
+# How long shutdown waits for a last delivery round.
+REPORT_CLOSE_TIMEOUT = 2.0
+
 
 @dataclass
 class PanelNumber:
@@ -62,6 +71,9 @@ class PanelClient:
         timeout: float = 10.0,
         max_connections: int = 20,
         default_retry: int = 60,
+        outbox: Optional[ReportOutbox] = None,
+        report_concurrency: int = 4,
+        report_batch_size: int = 50,
     ):
         self.base_url = base_url.rstrip("/")
         self.api_token = api_token
@@ -74,12 +86,42 @@ class PanelClient:
             limits=limits,
             headers={"Authorization": f"Bearer {api_token}"},
         )
-        self.pending_reports: list[dict] = []
-        self.lock = asyncio.Lock()
+        # Result reports go through the outbox; `start()` launches the background sender.
+        self.outbox = outbox if outbox is not None else ReportOutbox()
+        self.report_concurrency = max(1, report_concurrency)
+        self.report_batch_size = max(1, report_batch_size)
+        self.report_counters = Counters()
+        self._reports_ready = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if not self._sender:
+            self._sender = asyncio.create_task(self._send_reports())
 
     async def close(self) -> None:
+        if self._sender:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+        if len(self.outbox):
+            # Best-effort last round; a persistent outbox keeps the rest for the next start.
+            try:
+                await asyncio.wait_for(self._deliver_round(), REPORT_CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            if len(self.outbox):
+                if self.outbox.persistent:
+                    logger.info("Panel outbox keeps %d unsent reports for the next start", len(self.outbox))
+                else:
+                    logger.warning("Dropping %d unsent panel reports on shutdown (no PANEL_OUTBOX_PATH)", len(self.outbox))
+        self.outbox.close()
         await self.client.aclose()
 
+    def report_stats(self) -> dict:
+        data = self.report_counters.snapshot()
+        data["outbox"] = self.outbox.stats()
+        return data
+
     def _company_params(self, extra: Optional[dict] = None) -> dict:
         """Build query params including company identifier."""
         params = {}
@@ -98,7 +140,6 @@ class PanelClient:
             server_time=None, schedule_version=None,
         )
         try:
-            await self.flush_pending()
             extra: dict = {}
             if size is not None:
                 extra["size"] = size
@@ -198,14 +239,13 @@ class PanelClient:
             payload["scenario_id"] = scenario_id
         if outbound_line_id is not None:
             payload["outbound_line_id"] = outbound_line_id
-        try:
-            resp = await self.client.post("/api/dialer/report-result", json=payload)
-            resp.raise_for_status()
-            logger.info("Reported result to panel number_id=%s status=%s", number_id, status)
-        except Exception as exc:
-            logger.warning("Failed to report result to panel; queueing. err=%s payload=%s", exc, payload)
-            async with self.lock:
-                self.pending_reports.append(payload)
+        # Only the local append is awaited; delivery happens in `_send_reports`.
+        if self.outbox.persistent:
+            await asyncio.to_thread(self.outbox.append, payload)
+        else:
+            self.outbox.append(payload)
+        self._reports_ready.set()
+        logger.debug("Queued panel report number_id=%s status=%s", number_id, status)
 
     async def register_scenarios(self, scenarios: List[dict]) -> bool:
         """Register available scenarios with the panel."""
@@ -242,25 +282,98 @@ class PanelClient:
             logger.warning("Failed to register outbound lines with panel: %s", exc)
             return False
 
-    async def flush_pending(self) -> None:
-        async with self.lock:
-            if not self.pending_reports:
-                return
-            queued = list(self.pending_reports)
-            self.pending_reports.clear()
-        for payload in queued:
-            if not payload.get("number_id") and not payload.get("phone_number"):
-                logger.debug("Dropping queued panel report without number/phone: %s", payload)
-                continue
+    async def _send_reports(self) -> None:
+        backoff = 0.0
+        while True:
+            self._reports_ready.clear()
+            if not len(self.outbox):
+                await self._reports_ready.wait()
             try:
-                resp = await self.client.post("/api/dialer/report-result", json=payload)
-                resp.raise_for_status()
-                logger.info("Flushed queued report to panel number_id=%s", payload.get("number_id"))
+                delivered, failed = await self._deliver_round()
             except Exception as exc:
-                logger.warning("Failed to flush queued report; requeue. err=%s payload=%s", exc, payload)
-                async with self.lock:
-                    self.pending_reports.append(payload)
-                break
+                logger.exception("Panel report round failed: %s", exc)
+                delivered, failed = 0, 1
+            if not failed:
+                backoff = 0.0
+                continue
+            # Panel partly reachable: retry soon; unreachable: back off exponentially.
+            backoff = REPORT_BACKOFF_BASE if delivered else min(REPORT_BACKOFF_MAX, backoff * 2 or REPORT_BACKOFF_BASE)
+            self.report_counters.inc("backoffs")
+            await asyncio.sleep(backoff)
+
+    async def _deliver_round(self) -> tuple[int, int]:
+        """
+        Send the oldest outbox reports; returns (acked, failed). Rejected reports count as acked.
+
+        Reports for the same number (number_id, else phone_number) go out one at a
+        time in outbox order, and a failure holds back that number's later reports
+        until the next round, so e.g. a "missed" never overtakes the final result.
+        Different numbers are sent concurrently, so ordering across numbers is not
+        preserved. Each report is acked as soon as the panel takes it, so a round
+        cancelled by `close()` only re-sends what was still in flight.
+        """
+        if self.outbox.persistent:
+            batch = await asyncio.to_thread(self.outbox.peek, self.report_batch_size)
+        else:
+            batch = self.outbox.peek(self.report_batch_size)
+        if not batch:
+            return 0, 0
+        groups: dict = {}
+        for report_id, payload in batch:
+            groups.setdefault(self._report_key(report_id, payload), []).append((report_id, payload))
+        semaphore = asyncio.Semaphore(self.report_concurrency)
+
+        async def send_in_order(reports: list) -> int:
+            done = 0
+            for report_id, payload in reports:
+                async with semaphore:
+                    ok = await self._post_report(payload)
+                if ok is False:
+                    break
+                # Ack right away: a round cut short by close() must not re-send it.
+                await self._ack([report_id])
+                done += 1
+            return done
+
+        results = await asyncio.gather(*(send_in_order(reports) for reports in groups.values()))
+        done = sum(results)
+        return done, len(batch) - done
+
+    async def _ack(self, report_ids: List[int]) -> None:
+        if self.outbox.persistent:
+            await asyncio.to_thread(self.outbox.ack, report_ids)
+        else:
+            self.outbox.ack(report_ids)
+
+    @staticmethod
+    def _report_key(report_id: int, payload: dict) -> tuple:
+        if payload.get("number_id") is not None:
+            return ("id", payload["number_id"])
+        if payload.get("phone_number"):
+            return ("phone", payload["phone_number"])
+        return ("report", report_id)
+
+    async def _post_report(self, payload: dict) -> Optional[bool]:
+        """True when delivered, None when permanently rejected (dropped), False to retry."""
+        try:
+            resp = await self.client.post("/api/dialer/report-result", json=payload)
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            code = exc.response.status_code
+            if 400 <= code < 500 and code not in (408, 429):
+                self.report_counters.inc("rejected")
+                logger.warning("Panel rejected report (%s); dropping payload=%s", code, payload)
+                return None
+            self.report_counters.inc("failed")
+            logger.warning("Failed to report result to panel; will retry. err=%s number_id=%s", exc, payload.get("number_id"))
+            return False
+        except Exception as exc:
+            self.report_counters.inc("failed")
+            logger.warning("Failed to report result to panel; will retry. err=%s number_id=%s", exc, payload.get("number_id"))
+            return False
+        self.report_counters.inc("sent")
+        logger.info("Reported result to panel number_id=%s status=%s", payload.get("number_id"), payload.get("status"))
+        return True
 
     @staticmethod
     def _parse_dt(value: Optional[str]) -> Optional[datetime]:
@@ -0,0 +1,137 @@
+"""
+Durable outbox for panel result reports.
+
+`PanelClient.report_result` appends the payload here and returns; a
+background sender in the client drains it. With a path, reports live in a
+SQLite file (WAL) until the panel acknowledges them, so a restart or a panel
+outage loses nothing. Without one (or if the file cannot be opened) the outbox
+is in memory only. Past `max_size` the oldest reports are dropped.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from utils.metrics import Counters
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReportOutbox:
+    def __init__(self, path: Optional[str] = None, max_size: int = 10000):
+        self.path = path
+        self.max_size = max(1, max_size)
+        self.counters = Counters()
+        # In-memory mode: (id, payload); ids keep ack semantics identical to the SQLite tier.
+        self._memory: Deque[Tuple[int, dict]] = deque()
+        self._next_id = 1
+        self._size = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str) -> None:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS reports (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)")
+            self._size = db.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            self._db = db
+            if self._size:
+                logger.info("Panel outbox %s has %d unsent reports from a previous run", path, self._size)
+        except sqlite3.Error as exc:
+            logger.warning("Panel outbox persistence disabled (%s): %s", path, exc)
+            self._db = None
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+    def append(self, payload: dict) -> None:
+        with self._lock:
+            if self._db:
+                try:
+                    self._db.execute("INSERT INTO reports (payload) VALUES (?)", (json.dumps(payload),))
+                except sqlite3.Error as exc:
+                    # Keep the report rather than lose it; it goes out from memory.
+                    logger.warning("Panel outbox write failed, keeping report in memory: %s", exc)
+                    self._memory_append(payload)
+                else:
+                    self._size += 1
+            else:
+                self._memory_append(payload)
+            self.counters.inc("queued")
+            self._enforce_cap()
+
+    def _memory_append(self, payload: dict) -> None:
+        # Negative ids never collide with SQLite rowids.
+        self._memory.append((-self._next_id, payload))
+        self._next_id += 1
+        self._size += 1
+
+    def _enforce_cap(self) -> None:
+        excess = self._size - self.max_size
+        if excess <= 0:
+            return
+        dropped = 0
+        while dropped < excess and self._memory:
+            self._memory.popleft()
+            dropped += 1
+        if dropped < excess and self._db:
+            self._db.execute(
+                "DELETE FROM reports WHERE id IN (SELECT id FROM reports ORDER BY id LIMIT ?)", (excess - dropped,)
+            )
+            dropped = excess
+        self._size -= dropped
+        self.counters.inc("dropped", dropped)
+        logger.warning("Panel outbox over %d reports; dropped %d oldest", self.max_size, dropped)
+
+    def peek(self, limit: int) -> List[Tuple[int, dict]]:
+        """Oldest `limit` reports as (id, payload), without removing them."""
+        with self._lock:
+            items: List[Tuple[int, dict]] = list(self._memory)[:limit]
+            if self._db and len(items) < limit:
+                rows = self._db.execute(
+                    "SELECT id, payload FROM reports ORDER BY id LIMIT ?", (limit - len(items),)
+                ).fetchall()
+                items.extend((row_id, json.loads(payload)) for row_id, payload in rows)
+            return items
+
+    def ack(self, ids: List[int]) -> None:
+        """Remove delivered (or permanently rejected) reports."""
+        if not ids:
+            return
+        with self._lock:
+            memory_ids = {i for i in ids if i < 0}
+            if memory_ids:
+                before = len(self._memory)
+                self._memory = deque(item for item in self._memory if item[0] not in memory_ids)
+                self._size -= before - len(self._memory)
+            db_ids = [i for i in ids if i > 0]
+            if db_ids and self._db:
+                cursor = self._db.execute(
+                    f"DELETE FROM reports WHERE id IN ({','.join('?' * len(db_ids))})", db_ids
+                )
+                self._size -= max(0, cursor.rowcount)
+
+    def stats(self) -> dict:
+        data = self.counters.snapshot()
+        data["pending"] = self._size
+        data["persistent"] = self.persistent
+        return data
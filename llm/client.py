@@ -1,11 +1,13 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
 from config.settings import GapGPTSettings
+from utils.metrics import Counters, LatencyStats
 
 
 logger = logging.getLogger(__name__)
@@ -46,32 +48,30 @@ class GapGPTClient:
     async def close(self) -> None:
         await self.client.aclose()
 
+    def _sse_delta(self, line: str) -> str:
+        """Assistant text carried by one SSE line ("" for keep-alives, [DONE], junk)."""
+        line = line.strip()
+        if not line.startswith("data:"):
+            return ""
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            return ""
+        try:
+            item = json.loads(payload)
+        except json.JSONDecodeError:
+            return ""
+
+        choices = item.get("choices") or []
+        if not choices:
+            return ""
+        delta = choices[0].get("delta") or {}
+        return delta.get("content") or ""
+
     def _extract_from_sse(self, raw: str) -> str:
         """
         Parse OpenAI-style SSE chunks and reconstruct assistant text.
         """
-        parts: List[str] = []
-        for line in raw.splitlines():
-            line = line.strip()
-            if not line.startswith("data:"):
-                continue
-            payload = line[5:].strip()
-            if not payload or payload == "[DONE]":
-                continue
-            try:
-                item = json.loads(payload)
-            except json.JSONDecodeError:
-                continue
-
-            choices = item.get("choices") or []
-            if not choices:
-                continue
-            delta = choices[0].get("delta") or {}
-            chunk = delta.get("content")
-            if chunk:
-                parts.append(chunk)
-
-        return "".join(parts)
+        return "".join(self._sse_delta(line) for line in raw.splitlines())
 
     async def chat(
         self,
@@ -107,3 +107,172 @@ class GapGPTClient:
 
         data = response.json()
         return data["choices"][0]["message"]["content"]
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.2,
+    ) -> AsyncIterator[str]:
+        """
+        Yield assistant text deltas as SSE chunks arrive. A plain JSON reply is
+        yielded whole. Closing the iterator early (e.g. via contextlib.aclosing)
+        closes the response, so the rest of the body is never read.
+        """
+        if not self.api_key:
+            logger.warning("GapGPT API key not provided; returning empty response.")
+            return
+
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+        }
+        async with self.semaphore:
+            async with self.client.stream("POST", "/chat/completions", json=payload, timeout=self.timeout) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+
+                content_type = (response.headers.get("content-type") or "").lower()
+                if "text/event-stream" not in content_type:
+                    raw = (await response.aread()).decode("utf-8", errors="replace")
+                    if raw.lstrip().startswith("data:"):
+                        yield self._extract_from_sse(raw)
+                    else:
+                        yield json.loads(raw)["choices"][0]["message"]["content"]
+                    return
+
+                async for line in response.aiter_lines():
+                    chunk = self._sse_delta(line)
+                    if chunk:
+                        yield chunk
+
+
+class ChatBatcher:
+    """
+    Micro-batches concurrent intent classifications into one chat request.
+
+    Calls sharing the same instructions (same scenario prompt) and model that
+    arrive within `window_ms` (or until `max_items` are queued) are sent as a
+    numbered list with a request for a JSON array of labels; each waiter gets
+    its own label back. A lone call is sent as its normal single prompt, and
+    an unparseable batch reply falls back to one request per item.
+    """
+
+    def __init__(self, client: GapGPTClient, window_ms: float = 50.0, max_items: int = 16):
+        self.client = client
+        self.window = window_ms / 1000.0
+        self.max_items = max(1, max_items)
+        # (model, instructions) -> [(transcript, single_prompt, future, enqueued_at)]
+        self._pending: Dict[tuple, list] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self.counters = Counters()
+        self.queue_delay = LatencyStats()
+
+    def stats(self) -> dict:
+        data = self.counters.snapshot()
+        data["queue_delay"] = self.queue_delay.snapshot()
+        return data
+
+    async def classify(
+        self,
+        instructions: str,
+        transcript: str,
+        single_prompt: str,
+        model: str = "gpt-4o-mini",
+    ) -> str:
+        """Raw label text for one transcript; `single_prompt` is what a lone call would send."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (model, instructions)
+        group = self._pending.setdefault(key, [])
+        group.append((transcript, single_prompt, future, time.perf_counter()))
+        self.counters.inc("items")
+        if len(group) >= self.max_items:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        group = [item for item in self._pending.pop(key, []) if not item[2].done()]
+        if not group:
+            return
+        now = time.perf_counter()
+        for item in group:
+            self.queue_delay.observe(now - item[3])
+        task = asyncio.create_task(self._send(key, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: tuple, group: list) -> None:
+        model, instructions = key
+        if len(group) == 1:
+            await self._send_single(model, group[0])
+            return
+        self.counters.inc("batches")
+        try:
+            reply = await self.client.chat(
+                messages=[{"role": "user", "content": self._batch_prompt(instructions, group)}],
+                model=model,
+                temperature=0,
+            )
+        except Exception as exc:
+            for _, _, future, _ in group:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        labels = self._parse_labels(reply, len(group))
+        if labels is None:
+            self.counters.inc("parse_fallbacks")
+            logger.warning("Batched intent reply unparseable (%d items); retrying singly: %r", len(group), reply[:200])
+            await asyncio.gather(*(self._send_single(model, item) for item in group))
+            return
+        self.counters.inc("requests_saved", len(group) - 1)
+        for (_, _, future, _), label in zip(group, labels):
+            if not future.done():
+                future.set_result(label)
+
+    async def _send_single(self, model: str, item: tuple) -> None:
+        _, prompt, future, _ = item
+        try:
+            reply = await self.client.chat(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=0,
+            )
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(reply)
+
+    @staticmethod
+    def _batch_prompt(instructions: str, group: list) -> str:
+        lines = [f"{idx}. {json.dumps(item[0], ensure_ascii=False)}" for idx, item in enumerate(group, 1)]
+        return (
+            f"{instructions}\n\n"
+            f"Classify each of the {len(group)} numbered user utterances below independently, using the rules above.\n"
+            f"Reply with only a JSON array of exactly {len(group)} lowercase labels, in order.\n"
+            + "\n".join(lines)
+        )
+
+    @staticmethod
+    def _parse_labels(reply: str, expected: int) -> Optional[List[str]]:
+        start, end = reply.find("["), reply.rfind("]")
+        if start < 0 or end <= start:
+            return None
+        try:
+            labels = json.loads(reply[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(labels, list) or len(labels) != expected or not all(isinstance(l, str) for l in labels):
+            return None
+        return [label.strip().lower() for label in labels]
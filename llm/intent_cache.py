@@ -0,0 +1,123 @@
+"""
+Transcript -> intent cache in front of GapGPT.
+
+Keys are (scenario name, prompt-template hash, normalized transcript), so a
+changed prompt or example list never serves stale labels. The in-memory tier
+is an LRU with TTL; an optional SQLite file keeps entries across restarts.
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from utils.metrics import Counters
+
+
+logger = logging.getLogger(__name__)
+
+
+def template_hash(template: str) -> str:
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(scenario: str, template_digest: str, normalized_transcript: str) -> str:
+    """`normalized_transcript` must come from utils.text_normalize.normalize_persian."""
+    return f"{scenario}|{template_digest}|{normalized_transcript}"
+
+
+class IntentCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400.0, path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.path = path
+        # key -> (intent, expires_at wall-clock); wall clock so the disk tier can share it.
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.counters = Counters()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str) -> None:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS intents (key TEXT PRIMARY KEY, intent TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("DELETE FROM intents WHERE expires_at < ?", (time.time(),))
+            self._db = db
+        except sqlite3.Error as exc:
+            logger.warning("Intent cache disk tier disabled (%s): %s", path, exc)
+            self._db = None
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        data = self.counters.snapshot()
+        data["entries"] = len(self._entries)
+        data["persistent"] = self._db is not None
+        return data
+
+    def _remember(self, key: str, intent: str, expires_at: float) -> None:
+        self._entries[key] = (intent, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters.inc("evicted")
+
+    def _db_get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            if not self._db:
+                return None
+            row = self._db.execute("SELECT intent, expires_at FROM intents WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _db_put(self, key: str, intent: str, expires_at: float) -> None:
+        with self._db_lock:
+            if not self._db:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO intents (key, intent, expires_at) VALUES (?, ?, ?)",
+                    (key, intent, expires_at),
+                )
+            except sqlite3.Error as exc:
+                logger.debug("Intent cache write failed: %s", exc)
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry:
+            if entry[1] > now:
+                self._entries.move_to_end(key)
+                self.counters.inc("hits")
+                return entry[0]
+            del self._entries[key]
+            self.counters.inc("expired")
+        if self._db:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row and row[1] > now:
+                self._remember(key, row[0], row[1])
+                self.counters.inc("disk_hits")
+                return row[0]
+        self.counters.inc("misses")
+        return None
+
+    async def put(self, key: str, intent: str) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(key, intent, expires_at)
+        self.counters.inc("stores")
+        if self._db:
+            await asyncio.to_thread(self._db_put, key, intent, expires_at)
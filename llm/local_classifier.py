@@ -0,0 +1,230 @@
+"""
+On-box intent classifier tier in front of GapGPT.
+
+Character n-gram TF-IDF features over normalized Persian text and a softmax
+logistic regression, both in plain NumPy. It is trained from the transcript
+logs FlowEngine already writes (logs/positive_stt.log -> yes,
+negative_stt.log -> no, unknown_stt.log -> the logged intent), so its labels
+are whatever the LLM/fallback decided at the time. FlowEngine answers locally
+only when the top probability clears the scenario's `llm.local_threshold`.
+
+Train and evaluate with scripts/train_intent_classifier.py.
+"""
+import logging
+import re
+import statistics
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from utils.text_normalize import normalize_persian
+
+
+logger = logging.getLogger(__name__)
+
+LOG_LABELS = {"positive_stt": "yes", "negative_stt": "no", "unknown_stt": "unknown"}
+_TRANSCRIPT = re.compile(r"transcript=(.*)$")
+_INTENT = re.compile(r"\bintent=(\S+)")
+
+
+def load_labeled_logs(log_dir: str) -> List[Tuple[str, str]]:
+    """(transcript, label) pairs from the transcript logs, including rotated backups."""
+    samples: List[Tuple[str, str]] = []
+    for stem, default_label in LOG_LABELS.items():
+        for path in sorted(Path(log_dir).glob(f"{stem}.log*")):
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                for line in fh:
+                    match = _TRANSCRIPT.search(line.rstrip("\n"))
+                    if not match or not match.group(1).strip():
+                        continue
+                    label = default_label
+                    if default_label == "unknown":
+                        # FlowEngine logs the label it chose (e.g. number_question).
+                        intent = _INTENT.search(line[: match.start()])
+                        if intent and intent.group(1) not in ("yes", "no"):
+                            label = intent.group(1)
+                    samples.append((match.group(1).strip(), label))
+    return samples
+
+
+def split_holdout(samples: Sequence[Tuple[str, str]], fraction: float = 0.2) -> Tuple[list, list]:
+    """Deterministic split by transcript hash, so repeats of a phrase never straddle train/test."""
+    buckets = max(2, round(1 / fraction)) if fraction > 0 else 0
+    train, test = [], []
+    for text, label in samples:
+        key = zlib.crc32(normalize_persian(text).encode("utf-8"))
+        (test if buckets and key % buckets == 0 else train).append((text, label))
+    return train, test
+
+
+def _ngrams(text: str, low: int, high: int) -> Counter:
+    padded = f" {normalize_persian(text)} "
+    grams: Counter = Counter()
+    for n in range(low, high + 1):
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class LocalIntentClassifier:
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 4), max_features: int = 20000, min_df: int = 1):
+        self.ngram_range = ngram_range
+        self.max_features = max_features
+        self.min_df = min_df
+        self.vocab: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.labels: List[str] = []
+        self.weights = np.zeros((0, 0), dtype=np.float32)
+        self.bias = np.zeros(0, dtype=np.float32)
+
+    # -- features ----------------------------------------------------------
+
+    def _vector(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse L2-normalized TF-IDF row as (indices, values)."""
+        grams = _ngrams(text, *self.ngram_range)
+        pairs = [(self.vocab[g], c) for g, c in grams.items() if g in self.vocab]
+        if not pairs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        idx = np.fromiter((p[0] for p in pairs), dtype=np.int64, count=len(pairs))
+        tf = np.fromiter((p[1] for p in pairs), dtype=np.float32, count=len(pairs))
+        values = (1 + np.log(tf)) * self.idf[idx]
+        return idx, values / np.linalg.norm(values)
+
+    def _matrix(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR-style (row ids, column ids, values) for a batch of texts."""
+        rows, cols, vals = [], [], []
+        for row, text in enumerate(texts):
+            idx, values = self._vector(text)
+            rows.append(np.full(len(idx), row, dtype=np.int64))
+            cols.append(idx)
+            vals.append(values)
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+    def _build_vocab(self, texts: Sequence[str]) -> None:
+        df: Counter = Counter()
+        for text in texts:
+            df.update(_ngrams(text, *self.ngram_range).keys())
+        kept = [(g, c) for g, c in df.items() if c >= self.min_df]
+        kept.sort(key=lambda item: (-item[1], item[0]))
+        kept = kept[: self.max_features]
+        self.vocab = {g: i for i, (g, _) in enumerate(kept)}
+        counts = np.array([c for _, c in kept], dtype=np.float32)
+        self.idf = (np.log((1 + len(texts)) / (1 + counts)) + 1).astype(np.float32)
+
+    # -- training / inference ---------------------------------------------
+
+    def fit(
+        self,
+        samples: Sequence[Tuple[str, str]],
+        epochs: int = 300,
+        learning_rate: float = 4.0,
+        l2: float = 1e-4,
+    ) -> "LocalIntentClassifier":
+        texts = [text for text, _ in samples]
+        self.labels = sorted({label for _, label in samples})
+        self._build_vocab(texts)
+        rows, cols, vals = self._matrix(texts)
+        n, n_features, n_classes = len(texts), len(self.vocab), len(self.labels)
+        y = np.array([self.labels.index(label) for _, label in samples])
+        target = np.zeros((n, n_classes), dtype=np.float32)
+        target[np.arange(n), y] = 1.0
+
+        self.weights = np.zeros((n_features, n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+        velocity_w = np.zeros_like(self.weights)
+        velocity_b = np.zeros_like(self.bias)
+        for _ in range(epochs):
+            # Full-batch gradient descent with momentum; sparse products via bincount.
+            logits = np.empty((n, n_classes), dtype=np.float32)
+            for c in range(n_classes):
+                logits[:, c] = np.bincount(rows, weights=vals * self.weights[cols, c], minlength=n)
+            probs = _softmax(logits + self.bias)
+            grad = (probs - target) / n
+            grad_w = np.empty_like(self.weights)
+            for c in range(n_classes):
+                grad_w[:, c] = np.bincount(cols, weights=vals * grad[rows, c], minlength=n_features)
+            grad_w += l2 * self.weights
+            velocity_w = 0.9 * velocity_w - learning_rate * grad_w
+            velocity_b = 0.9 * velocity_b - learning_rate * grad.sum(axis=0)
+            self.weights += velocity_w
+            self.bias += velocity_b
+        return self
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability."""
+        idx, values = self._vector(text)
+        logits = self.bias + values @ self.weights[idx]
+        probs = _softmax(logits[None, :])[0]
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        with open(path, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                vocab=np.array(vocab, dtype=str),
+                idf=self.idf,
+                labels=np.array(self.labels, dtype=str),
+                weights=self.weights,
+                bias=self.bias,
+                ngram_range=np.array(self.ngram_range),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(ngram_range=tuple(int(n) for n in data["ngram_range"]))
+            model.vocab = {g: i for i, g in enumerate(data["vocab"].tolist())}
+            model.idf = data["idf"]
+            model.labels = data["labels"].tolist()
+            model.weights = data["weights"]
+            model.bias = data["bias"]
+        model.max_features = len(model.vocab)
+        return model
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def evaluate(
+    model: LocalIntentClassifier,
+    samples: Sequence[Tuple[str, str]],
+    thresholds: Iterable[float] = (0.5, 0.7, 0.8, 0.9, 0.95),
+) -> dict:
+    """Offline accuracy, local coverage per threshold, and per-call latency."""
+    if not samples:
+        return {"samples": 0}
+    predictions, latencies = [], []
+    for text, _ in samples:
+        start = time.perf_counter()
+        predictions.append(model.predict(text))
+        latencies.append((time.perf_counter() - start) * 1e6)
+    gold = [label for _, label in samples]
+    correct = [pred[0] == label for pred, label in zip(predictions, gold)]
+    by_threshold = {}
+    for threshold in thresholds:
+        answered = [ok for ok, pred in zip(correct, predictions) if pred[1] >= threshold]
+        by_threshold[threshold] = {
+            "coverage": len(answered) / len(samples),
+            "accuracy": sum(answered) / len(answered) if answered else None,
+        }
+    latencies.sort()
+    return {
+        "samples": len(samples),
+        "accuracy": sum(correct) / len(samples),
+        "thresholds": by_threshold,
+        "latency_us_p50": statistics.median(latencies),
+        "latency_us_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
@@ -1,22 +1,31 @@
 import asyncio
 import logging
-import time
+import math
 from collections import deque
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Deque, List, Optional
+from datetime import date, datetime
+from typing import Deque, List, Optional, Tuple
 
 from config.settings import Settings
 from core.ari_client import AriClient
 from integrations.panel.client import NextBatchResponse, PanelClient, PanelNumber, PanelOutboundLine
 from integrations.sms.melipayamak import SMSClient
+from logic.line_selector import LineSelector
+from logic.pacing import PredictivePacer
+from logic.panel_prefetcher import PanelPrefetcher
+from logic.rate_limiter import DailyCounter, RateLimits, ScopedRateLimits, SlidingWindowCounter, TokenBucket
 from logic.scenario_registry import ScenarioRegistry
 from sessions.session import SessionStatus
 from sessions.session_manager import SessionManager
+from utils.metrics import Counters
+from utils.timer_wheel import TimerWheel
 
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on any scheduler sleep; a safety net in case a wake-up signal is missed.
+IDLE_RECHECK_SECONDS = 5.0
+
 
 @dataclass
 class ContactItem:
@@ -38,43 +47,48 @@ class Dialer:
         session_manager: SessionManager,
         scenario_registry: Optional[ScenarioRegistry] = None,
         panel_client: Optional[PanelClient] = None,
+        pacer: Optional[PredictivePacer] = None,
+        timers: Optional[TimerWheel] = None,
     ):
         self.settings = settings
         self.ari_client = ari_client
         self.session_manager = session_manager
         self.scenario_registry = scenario_registry
         self.panel_client = panel_client
+        # Predictive pacing (PACING_ENABLED): holds originations while free agents are covered.
+        self.pacer = pacer
         self.static_mode_enabled = bool(settings.dialer.static_contacts)
         # Static mode: always dial STATIC_CONTACTS directly, regardless of panel batch numbers.
         self.contacts: Deque[ContactItem] = deque(
             [ContactItem(phone_number=number) for number in settings.dialer.static_contacts]
         )
         self.line_stats = {}
+        # Per-line rate limits (1 s spacing, per-minute, per-day); line_stats holds concurrency only.
+        self.line_limits = ScopedRateLimits(self._new_line_limits)
         self.enabled_lines: set[str] = set()
         for num in settings.dialer.outbound_numbers:
             norm = self._normalize_number(num)
             if not norm:
                 continue
             self.enabled_lines.add(norm)
-            self.line_stats[norm] = {
-                "active": 0,
-                "inbound_active": 0,
-                "attempts": deque(),
-                "daily": 0,
-                "daily_marker": date.today(),
-                "last_originated_ts": 0.0,
-            }
+            self.line_stats[norm] = self._init_line_stats()
         self.line_id_by_number: dict[str, int] = {}
         self.scenario_id_by_name: dict[str, int] = {}
-        self.attempt_timestamps: Deque[datetime] = deque()  # global per-minute
         self.daily_counter = 0  # global per-day
         self.daily_marker: date = date.today()
         self._running = False
         self.lock = asyncio.Lock()
-        self.last_originate_window_start: float = 0.0
-        self.originate_count_in_window: int = 0
-        self.next_panel_poll: datetime = datetime.utcnow()
-        self.timeout_tasks: dict[str, asyncio.Task] = {}
+        # Limits shared by all lines (MAX_ORIGINATIONS_PER_SECOND).
+        self.global_limits = RateLimits(cps=TokenBucket(settings.dialer.max_originations_per_second))
+        # ARI originate requests in flight; bounded by MAX_INFLIGHT_ORIGINATIONS.
+        self.inflight_originations: set[asyncio.Task] = set()
+        # Background next-batch polling with a low-water mark (panel mode only).
+        self.prefetcher = PanelPrefetcher(self, panel_client) if panel_client else None
+        # Normalized numbers queued or in a live session; panel batches skip them.
+        self.pending_numbers: set[str] = set()
+        self.session_number: dict[str, str] = {}
+        # Shared deadline wheel; origination timeouts are keyed (session_id, "origination").
+        self.timers = timers if timers is not None else TimerWheel()
         self.paused_by_failures = False
         self.failure_streak = 0
         self.sms_client = SMSClient(settings.sms) if settings.sms.api_key and settings.sms.sender else None
@@ -82,39 +96,102 @@ class Dialer:
         self.session_line: dict[str, str] = {}
         self.inbound_session_line: dict[str, str] = {}
         self.waiting_inbound: dict[str, int] = {}
+        # Heap index over enabled lines; touch a line whenever its counters change.
+        self.line_selector = LineSelector(self._line_state)
+        self.line_selector.reset(self.enabled_lines)
         # When an operator leg is being placed, pause queue origination until it obtains a line.
         self.operator_priority_requests: int = 0
+        # Set whenever something that can unblock origination happens (line freed, contacts queued, ...).
+        self._wakeup = asyncio.Event()
+        # Scheduler wake-ups by cause: "signal" (event) vs "timer" (next eligible time reached).
+        self.wakeups = Counters()
 
     async def run(self, stop_event: asyncio.Event) -> None:
         if self._running:
             return
         self._running = True
         logger.info("Dialer started with %d queued contacts", len(self.contacts))
+        stop_watch = asyncio.create_task(self._wake_on(stop_event))
+        prefetch = asyncio.create_task(self.prefetcher.run(stop_event)) if self.prefetcher else None
         try:
             while not stop_event.is_set() and self._running:
+                # Clear before evaluating: any signal raised from here on ends the next wait.
+                self._wakeup.clear()
                 self._reset_daily_if_needed()
-                await self._maybe_refill_from_panel()
                 if self.paused_by_failures:
-                    await asyncio.sleep(2)
+                    # The prefetcher's next poll resumes us once the panel allows calls again.
+                    await self._wait_for_wakeup(None)
                     continue
                 if self.operator_priority_requests > 0:
-                    await asyncio.sleep(0.05)
+                    await self._wait_for_wakeup(None)
+                    continue
+                if len(self.inflight_originations) >= self._max_inflight():
+                    # A finishing originate task wakes the loop.
+                    await self._wait_for_wakeup(None)
                     continue
-                if not await self._can_start_call():
-                    await asyncio.sleep(1)
+                if self.pacer and not self.pacer.allow():
+                    # Hangups (which also free agents) wake the loop.
+                    await self._wait_for_wakeup(None)
+                    continue
+                delay = self._next_line_delay()
+                if delay is None or delay > 0:
+                    await self._wait_for_wakeup(delay)
                     continue
                 contact = await self._next_contact()
                 if not contact:
-                    await asyncio.sleep(5)
+                    if self.prefetcher:
+                        self.prefetcher.on_starved()
+                    await self._wait_for_wakeup(None)
+                    continue
+                line = self._reserve_line()
+                if not line:
+                    # Capacity changed while we waited for the queue lock; retry this contact first.
+                    async with self.lock:
+                        self.contacts.appendleft(contact)
                     continue
-                await self._originate(contact)
-                await asyncio.sleep(0.05)
+                if self.pacer:
+                    self.pacer.reserve()
+                self._start_origination(contact, line)
         finally:
+            stop_watch.cancel()
+            if prefetch:
+                prefetch.cancel()
+            for task in list(self.inflight_originations):
+                task.cancel()
+            if self.inflight_originations:
+                await asyncio.gather(*self.inflight_originations, return_exceptions=True)
             self._running = False
             logger.info("Dialer stopped")
 
+    def stats(self) -> dict:
+        return {
+            "wakeups": self.wakeups.snapshot(),
+            "inflight_originations": len(self.inflight_originations),
+            "pacing": self.pacer.stats() if self.pacer else None,
+            "prefetch": self.prefetcher.stats() if self.prefetcher else None,
+            "timers": self.timers.stats(),
+        }
+
     async def stop(self) -> None:
         self._running = False
+        self.wake()
+
+    def wake(self) -> None:
+        """Re-evaluate origination now (a line was freed, contacts arrived, lines changed...)."""
+        self._wakeup.set()
+
+    async def _wake_on(self, event: asyncio.Event) -> None:
+        await event.wait()
+        self.wake()
+
+    async def _wait_for_wakeup(self, timeout: Optional[float]) -> None:
+        """Sleep until signalled or until `timeout` (the next eligible time) passes."""
+        timeout = IDLE_RECHECK_SECONDS if timeout is None else min(max(timeout, 0.0), IDLE_RECHECK_SECONDS)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+            self.wakeups.inc("signal")
+        except asyncio.TimeoutError:
+            self.wakeups.inc("timer")
 
     async def add_contacts(self, numbers: List[str]) -> None:
         async with self.lock:
@@ -123,20 +200,30 @@ class Dialer:
                 if clean:
                     self.contacts.append(ContactItem(phone_number=clean))
         logger.info("Queued %d new contacts", len(numbers))
+        self.wake()
 
     async def on_session_completed(self, session_id: str) -> None:
         logger.debug("Session %s completed; dialer notified", session_id)
+        self.timers.cancel((session_id, "origination"))
+        if self.pacer:
+            self.pacer.on_finished(session_id)
+        number = self.session_number.pop(session_id, None)
+        if number:
+            self.pending_numbers.discard(number)
         async with self.lock:
             line = self.session_line.pop(session_id, None)
             if line and line in self.line_stats:
                 self.line_stats[line]["active"] = max(self.line_stats[line]["active"] - 1, 0)
+                self.line_selector.touch(line)
             inbound_line = self.inbound_session_line.pop(session_id, None)
             if inbound_line and inbound_line in self.line_stats:
                 stats = self.line_stats[inbound_line]
                 stats["inbound_active"] = max(stats.get("inbound_active", 0) - 1, 0)
+                self.line_selector.touch(inbound_line)
         # reset failure streak on completion unless paused
         if not self.paused_by_failures:
             self.failure_streak = 0
+        self.wake()
 
     async def register_inbound_session(self, session_id: str, line: str) -> bool:
         """
@@ -150,9 +237,11 @@ class Dialer:
             total_active = self._line_active_total(stats)
             if total_active >= self.settings.dialer.max_concurrent_calls:
                 self.waiting_inbound[line] = self.waiting_inbound.get(line, 0) + 1
+                self.line_selector.touch(line)
                 return False
             stats["inbound_active"] = stats.get("inbound_active", 0) + 1
             self.inbound_session_line[session_id] = line
+            self.line_selector.touch(line)
             return True
 
     async def try_register_waiting_inbound(self, session_id: str, line: str) -> bool:
@@ -172,7 +261,9 @@ class Dialer:
                 self.waiting_inbound[line] = max(0, self.waiting_inbound[line] - 1)
                 if self.waiting_inbound[line] == 0:
                     del self.waiting_inbound[line]
-            return True
+            self.line_selector.touch(line)
+        self.wake()
+        return True
 
     async def cancel_waiting_inbound(self, line: str) -> None:
         """
@@ -183,6 +274,8 @@ class Dialer:
                 self.waiting_inbound[line] = max(0, self.waiting_inbound[line] - 1)
                 if self.waiting_inbound[line] == 0:
                     del self.waiting_inbound[line]
+            self.line_selector.touch(line)
+        self.wake()
 
     async def on_result(
         self,
@@ -225,23 +318,20 @@ class Dialer:
             logger.info("Resetting daily counters")
             self.daily_counter = 0
             self.daily_marker = today
-            self.attempt_timestamps.clear()
-
-    async def _can_start_call(self) -> bool:
-        # Global guard: only proceed if some line is available
-        line = self._available_line()
-        return line is not None
 
     def _init_line_stats(self) -> dict:
         return {
             "active": 0,
             "inbound_active": 0,
-            "attempts": deque(),
-            "daily": 0,
-            "daily_marker": date.today(),
-            "last_originated_ts": 0.0,
         }
 
+    def _new_line_limits(self) -> RateLimits:
+        return RateLimits(
+            spacing=SlidingWindowCounter(1, 1.0),  # per-line cap of 1 origination per second
+            minute=SlidingWindowCounter(self.settings.dialer.max_calls_per_minute, 60.0),
+            day=DailyCounter(self.settings.dialer.max_calls_per_day),
+        )
+
     async def _update_outbound_lines(self, lines: List[PanelOutboundLine]) -> None:
         normalized_lines = []
         line_id_by_number: dict[str, int] = {}
@@ -270,41 +360,60 @@ class Dialer:
                     and self.waiting_inbound.get(line, 0) == 0
                 ):
                     del self.line_stats[line]
+                    self.line_limits.drop(line)
+            self.line_selector.reset(unique_lines)
 
         if hasattr(self.session_manager, "update_inbound_lines"):
             self.session_manager.update_inbound_lines(list(unique_lines))
-
-    def _prune_attempts(self) -> None:
-        cutoff = datetime.utcnow() - timedelta(minutes=1)
-        while self.attempt_timestamps and self.attempt_timestamps[0] < cutoff:
-            self.attempt_timestamps.popleft()
-
-    def _prune_line_attempts(self, stats: dict) -> None:
-        cutoff = datetime.utcnow() - timedelta(minutes=1)
-        attempts: Deque[datetime] = stats.get("attempts", deque())
-        while attempts and attempts[0] < cutoff:
-            attempts.popleft()
-        # reset daily if date changed
-        today = date.today()
-        if stats.get("daily_marker") != today:
-            stats["daily_marker"] = today
-            stats["daily"] = 0
+        self.wake()
 
     async def _next_contact(self) -> Optional[ContactItem]:
         async with self.lock:
             if not self.contacts:
                 return None
-            return self.contacts.popleft()
+            contact = self.contacts.popleft()
+        if self.prefetcher:
+            self.prefetcher.on_consumed()
+        return contact
+
+    def _max_inflight(self) -> int:
+        return max(1, self.settings.dialer.max_inflight_originations)
 
-    async def _originate(self, contact: ContactItem) -> None:
+    def _reserve_line(self) -> Optional[str]:
+        """
+        Pick a line and take its capacity (active slot, per-minute/day counts,
+        1 s spacing, global token) before any await, so concurrent originations
+        cannot oversubscribe it. Released by `_release_line` if the originate fails.
+        """
+        line = self._available_line()
+        if not line:
+            return None
+        self.line_stats[line]["active"] += 1
+        self.line_limits.get(line).record()
+        self._record_attempt()
+        self.line_selector.touch(line)
+        return line
+
+    def _release_line(self, line: str) -> None:
+        stats = self.line_stats.get(line)
+        if stats:
+            stats["active"] = max(stats["active"] - 1, 0)
+            self.line_selector.touch(line)
+        self.wake()
+
+    def _start_origination(self, contact: ContactItem, line: str) -> None:
+        task = asyncio.create_task(self._originate(contact, line))
+        self.inflight_originations.add(task)
+        task.add_done_callback(self._origination_done)
+
+    def _origination_done(self, task: asyncio.Task) -> None:
+        self.inflight_originations.discard(task)
+        self.wake()
+
+    async def _originate(self, contact: ContactItem, line: str) -> None:
+        """Place one call on a line already reserved by `_reserve_line`."""
+        session_id = None
         try:
-            line = self._available_line()
-            if not line:
-                logger.info("No available outbound line for contact %s; requeueing", contact.phone_number)
-                async with self.lock:
-                    self.contacts.append(contact)
-                await asyncio.sleep(1)
-                return
             attempted_at = datetime.utcnow()
             contact.attempted_at = attempted_at
             metadata = {"attempted_at": attempted_at.isoformat()}
@@ -331,6 +440,14 @@ class Dialer:
                 contact_number=contact.phone_number,
                 metadata=metadata,
             )
+            session_id = session.session_id
+            # Map before the ARI request: hangup events can arrive before it returns.
+            self.session_line[session_id] = line
+            if self.pacer:
+                self.pacer.on_originated(session_id)
+            number = self._pending_key(contact.phone_number)
+            if number in self.pending_numbers:
+                self.session_number[session_id] = number
             endpoint = self._build_endpoint(contact, line)
             app_args = f"outbound,{session.session_id}"
             # Originate returns channel info including protocol_id for early failure tracking
@@ -346,26 +463,23 @@ class Dialer:
                 if protocol_id:
                     await self.session_manager.register_protocol_id(session.session_id, protocol_id)
             self._schedule_timeout_watch(session.session_id)
-            async with self.lock:
-                stats = self.line_stats.get(line)
-                if stats:
-                    stats["active"] += 1
-                    stats["attempts"].append(datetime.utcnow())
-                    stats["daily"] += 1
-                    stats["last_originated_ts"] = time.monotonic()
-                if not hasattr(self, "session_line"):
-                    self.session_line = {}
-                self.session_line[session.session_id] = line
-            self._record_attempt()
             logger.info(
                 "Origination requested for %s (session %s) via line %s", contact.phone_number, session.session_id, line
             )
         except Exception as exc:
             logger.exception("Failed to originate call to %s: %s", contact.phone_number, exc)
+            # Return the active slot unless the session already completed and freed it;
+            # rate counters stay consumed since the attempt reached (or tried) ARI.
+            if session_id is None or self.session_line.pop(session_id, None):
+                self._release_line(line)
+            if self.pacer:
+                self.pacer.discard(session_id)
+            if session_id is None or self.session_number.pop(session_id, None):
+                self.pending_numbers.discard(self._pending_key(contact.phone_number))
 
     def _record_attempt(self) -> None:
-        self.attempt_timestamps.append(datetime.utcnow())
         self.daily_counter += 1
+        self.global_limits.record()
 
     def _build_endpoint(self, contact: ContactItem, line: str) -> str:
         trunk = self.settings.dialer.outbound_trunk
@@ -389,40 +503,45 @@ class Dialer:
         digits = "".join(ch for ch in number if ch.isdigit())
         return digits or None
 
+    def _pending_key(self, number: str) -> str:
+        return self._normalize_number(number) or number
+
     def _line_active_total(self, stats: dict) -> int:
         return stats.get("active", 0) + stats.get("inbound_active", 0)
 
+    def _line_delay(self, line: str, stats: dict) -> Optional[float]:
+        """
+        Seconds until `line` may originate (0 = now), or None while it is blocked
+        on something only an event can change (busy, inbound waiting, limit of 0).
+        """
+        if self.waiting_inbound.get(line, 0) > 0:
+            # Hold outbound when inbound callers are waiting for this line.
+            return None
+        if self._line_active_total(stats) >= self.settings.dialer.max_concurrent_calls:
+            return None
+        delay = self.line_limits.get(line).delay()
+        return None if delay == math.inf else delay
+
+    def _line_state(self, line: str) -> Tuple[Optional[float], tuple]:
+        """LineSelector callback: (delay or None when blocked, load key for least-load choice)."""
+        stats = self.line_stats.get(line)
+        if not stats or line not in self.enabled_lines:
+            return None, ()
+        delay = self._line_delay(line, stats)
+        if delay is None:
+            return None, ()
+        limits = self.line_limits.get(line)
+        return delay, (self._line_active_total(stats), limits["minute"].count(), limits["day"].count())
+
+    def _next_line_delay(self) -> Optional[float]:
+        """Seconds until some line can originate (0 = now); None if every line waits on an event."""
+        delay = self.line_selector.next_delay()
+        if delay is None:
+            return None
+        return max(delay, self.global_limits.delay())
+
     def _available_line(self) -> Optional[str]:
-        now = datetime.utcnow()
-        now_mono = time.monotonic()
-        best = None
-        best_load = None
-        for line in self.enabled_lines:
-            stats = self.line_stats.get(line)
-            if not stats:
-                continue
-            if not line:
-                continue
-            self._prune_line_attempts(stats)
-            if self.waiting_inbound.get(line, 0) > 0:
-                # Hold outbound when inbound callers are waiting for this line.
-                continue
-            last_ts = stats.get("last_originated_ts", 0.0)
-            if last_ts and now_mono - last_ts < 1.0:
-                # Enforce per-line per-second cap of 1.
-                continue
-            total_active = self._line_active_total(stats)
-            if total_active >= self.settings.dialer.max_concurrent_calls:
-                continue
-            if len(stats["attempts"]) >= self.settings.dialer.max_calls_per_minute:
-                continue
-            if stats["daily"] >= self.settings.dialer.max_calls_per_day:
-                continue
-            load = (total_active, len(stats["attempts"]), stats["daily"])
-            if best_load is None or load < best_load:
-                best = line
-                best_load = load
-        return best
+        return self.line_selector.pick()
 
     async def _handle_failure_threshold(
         self,
@@ -474,41 +593,33 @@ class Dialer:
     def _schedule_timeout_watch(self, session_id: str) -> None:
         # If no events arrive (no answer/hangup), mark as missed at origination timeout.
         timeout = self.settings.dialer.origination_timeout
-        task = asyncio.create_task(self._mark_missed_if_no_events(session_id, timeout))
-        self.timeout_tasks[session_id] = task
+        self.timers.schedule((session_id, "origination"), timeout, self._mark_missed_if_no_events, session_id)
 
-    async def _mark_missed_if_no_events(self, session_id: str, delay: int) -> None:
-        try:
-            await asyncio.sleep(delay)
-            session = await self.session_manager.get_session(session_id)
-            if not session:
-                return
-            async with session.lock:
-                # If the call is already active/answered or completed, do nothing.
-                if session.status in {SessionStatus.ACTIVE, SessionStatus.COMPLETED}:
-                    return
-                if session.result:
-                    return
-                session.result = "missed"
-            if self.session_manager.scenario_handler:
-                try:
-                    await self.session_manager.scenario_handler.on_call_finished(session)
-                except Exception as exc:
-                    logger.exception("Failed to report missed for session %s: %s", session_id, exc)
-            await self.session_manager._cleanup_session(session)  # type: ignore[attr-defined]
-            logger.warning("Marked session %s as missed due to timeout/no events", session_id)
-        finally:
-            self.timeout_tasks.pop(session_id, None)
+    def on_call_answered(self, session_id: str) -> None:
+        """The call is up; its origination timeout no longer applies."""
+        self.timers.cancel((session_id, "origination"))
 
-    async def _maybe_refill_from_panel(self) -> None:
-        if not self.panel_client:
+    async def _mark_missed_if_no_events(self, session_id: str) -> None:
+        session = await self.session_manager.get_session(session_id)
+        if not session:
             return
-        now = datetime.utcnow()
-        if now < self.next_panel_poll:
-            return
-
-        batch: NextBatchResponse = await self.panel_client.get_next_batch()
+        async with session.lock:
+            # If the call is already active/answered or completed, do nothing.
+            if session.status in {SessionStatus.ACTIVE, SessionStatus.COMPLETED}:
+                return
+            if session.result:
+                return
+            session.result = "missed"
+        if self.session_manager.scenario_handler:
+            try:
+                await self.session_manager.scenario_handler.on_call_finished(session)
+            except Exception as exc:
+                logger.exception("Failed to report missed for session %s: %s", session_id, exc)
+        await self.session_manager._cleanup_session(session)  # type: ignore[attr-defined]
+        logger.warning("Marked session %s as missed due to timeout/no events", session_id)
 
+    async def _apply_panel_batch(self, batch: NextBatchResponse) -> int:
+        """Apply a next-batch response (lines, scenarios, agents, pause state, numbers); returns numbers queued."""
         # Outbound lines now come from panel in each batch response.
         await self._update_outbound_lines(batch.outbound_lines)
 
@@ -549,29 +660,38 @@ class Dialer:
             self.paused_by_failures = False
             self.failure_streak = 0
             self.paused_reason = ""
+            self.wake()
         if not batch.call_allowed:
             retry = batch.retry_after_seconds or self.settings.dialer.default_retry
-            self.next_panel_poll = now + timedelta(seconds=retry)
             logger.info("Panel disallowed calls; retry in %ss reason=%s", retry, batch.reason)
-            return
+            return 0
 
-        self.next_panel_poll = now + timedelta(seconds=self.settings.dialer.default_retry)
         if batch.numbers:
-            await self._queue_panel_numbers(batch.numbers, batch.batch_id)
+            return await self._queue_panel_numbers(batch.numbers, batch.batch_id)
+        return 0
 
-    async def _queue_panel_numbers(self, numbers: List[PanelNumber], batch_id: Optional[str]) -> None:
+    async def _queue_panel_numbers(self, numbers: List[PanelNumber], batch_id: Optional[str]) -> int:
         if self.static_mode_enabled:
             logger.info(
                 "Skipping %d panel batch numbers because STATIC_CONTACTS mode is enabled",
                 len(numbers),
             )
-            return
+            return 0
         items: List[ContactItem] = []
-        for n in numbers:
-            items.append(ContactItem(phone_number=n.phone_number, number_id=n.id, batch_id=batch_id))
+        skipped = 0
         async with self.lock:
+            for n in numbers:
+                key = self._pending_key(n.phone_number)
+                if key in self.pending_numbers:
+                    # Already queued or on a live call (e.g. re-issued by an overlapping batch).
+                    skipped += 1
+                    continue
+                self.pending_numbers.add(key)
+                items.append(ContactItem(phone_number=n.phone_number, number_id=n.id, batch_id=batch_id))
             self.contacts.extend(items)
-        logger.info("Queued %d contacts from panel batch %s", len(items), batch_id)
+        logger.info("Queued %d contacts from panel batch %s (%d duplicates skipped)", len(items), batch_id, skipped)
+        self.wake()
+        return len(items)
 
     async def _available_capacity(self) -> int:
         if not self.enabled_lines:
@@ -583,13 +703,13 @@ class Dialer:
                 continue
             if not line:
                 continue
-            self._prune_line_attempts(stats)
             if self.waiting_inbound.get(line, 0) > 0:
                 continue
             total_active = self._line_active_total(stats)
+            limits = self.line_limits.get(line)
             remaining_concurrency = self.settings.dialer.max_concurrent_calls - total_active
-            remaining_per_minute = self.settings.dialer.max_calls_per_minute - len(stats["attempts"])
-            remaining_daily = self.settings.dialer.max_calls_per_day - stats["daily"]
+            remaining_per_minute = limits["minute"].remaining()
+            remaining_daily = limits["day"].remaining()
             line_slots = min(remaining_concurrency, remaining_per_minute, remaining_daily)
             if line_slots > 0:
                 available_slots += line_slots
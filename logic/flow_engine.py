@@ -5,11 +5,10 @@ Replaces MarketingScenario with a generic step-based engine that can run
 any scenario defined in config/scenarios/*.yaml.
 """
 import asyncio
-import io
+import contextlib
 import logging
+import re
 import time
-import audioop
-import wave
 from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
@@ -21,15 +20,26 @@ from config.flow_definition import ScenarioConfig
 from config.settings import Settings
 from core.ari_client import AriClient
 from integrations.panel.client import PanelClient
-from llm.client import GapGPTClient
+from llm.client import ChatBatcher, GapGPTClient
+from llm.intent_cache import IntentCache, cache_key, template_hash
+from llm.local_classifier import LocalIntentClassifier
 from logic.base import BaseScenario
+from logic.intent_matcher import YES_FAST_PATH
 from logic.scenario_registry import ScenarioRegistry
 from sessions.session import CallLeg, LegDirection, LegState, Session
+from stt_tts import audio_enhance
+from stt_tts.audio_workers import AudioWorkerPool
+from stt_tts.streaming import StreamingCapture, VadRecordingMonitor
 from stt_tts.vira_stt import STTResult, ViraSTTClient
+from utils.metrics import Counters, Histogram, LatencyStats
+from utils.text_normalize import normalize_persian
 
 
 logger = logging.getLogger(__name__)
 
+# First complete word of a streamed reply (a delimiter must follow it).
+_FIRST_WORD = re.compile(r"\s*([a-z_]+)[^a-z_]")
+
 
 class FlowEngine(BaseScenario):
     """
@@ -48,6 +58,10 @@ class FlowEngine(BaseScenario):
         session_manager,  # forward ref to avoid circular import
         registry: ScenarioRegistry,
         panel_client: Optional[PanelClient] = None,
+        audio_workers: Optional[AudioWorkerPool] = None,
+        intent_cache: Optional[IntentCache] = None,
+        local_classifier: Optional[LocalIntentClassifier] = None,
+        llm_batcher: Optional[ChatBatcher] = None,
     ):
         self.settings = settings
         self.ari_client = ari_client
@@ -56,7 +70,25 @@ class FlowEngine(BaseScenario):
         self.session_manager = session_manager
         self.registry = registry
         self.panel_client = panel_client
+        self.audio_workers = audio_workers
+        self.intent_cache = intent_cache
+        self.local_classifier = local_classifier
+        self.llm_batcher = llm_batcher
+        # Where intents came from: "local" answers vs "local_escalated" to the LLM.
+        self.intent_sources = Counters()
         self.dialer = None
+        # session_id -> active live-audio consumer (stt.streaming capture or stt.vad monitor)
+        self.captures: dict[str, StreamingCapture | VadRecordingMonitor] = {}
+        # Time from the caller's last speech frame to RecordingFinished, by what ended the turn.
+        self.turn_end_latency = {"vad": Histogram(), "silence": Histogram()}
+        # Recorded-turn pipeline stages; stt_raw/stt_enhanced only in stt.speculative mode.
+        self.stage_latency = {
+            stage: LatencyStats()
+            for stage in ("fetch", "empty_check", "stt", "stt_raw", "stt_enhanced", "intent")
+        }
+        self.speculative_wins = Counters()
+        # session_id -> (transcript, intent task) started as soon as a speculative transcript lands
+        self.pending_intents: dict[str, tuple[str, asyncio.Task]] = {}
 
         # Per-scenario agent rosters
         # inbound_agents: list of {phone_number, id} for inbound calls
@@ -64,6 +96,8 @@ class FlowEngine(BaseScenario):
         self.inbound_agents: list[dict] = []
         self.outbound_agents: list[dict] = []
         self.agent_busy: set[str] = set()
+        # Operator dials wait for other calls to free a line, so they run off the ARI event lane.
+        self.operator_tasks: set[asyncio.Task] = set()
         self.inbound_agent_cursor: int = 0
         self.outbound_agent_cursor: int = 0
 
@@ -82,6 +116,15 @@ class FlowEngine(BaseScenario):
     def attach_dialer(self, dialer) -> None:
         self.dialer = dialer
 
+    def stats(self) -> dict:
+        return {
+            "turn_end": {reason: hist.snapshot() for reason, hist in self.turn_end_latency.items()},
+            "intent_sources": self.intent_sources.snapshot(),
+            "llm_batching": self.llm_batcher.stats() if self.llm_batcher else None,
+            "turn_stages": {stage: stats.snapshot() for stage, stats in self.stage_latency.items()},
+            "speculative_wins": self.speculative_wins.snapshot(),
+        }
+
     # -- Agent management --------------------------------------------------
 
     async def set_inbound_agents(self, agents: list) -> None:
@@ -117,6 +160,16 @@ class FlowEngine(BaseScenario):
                 result.append({"phone_number": phone, "id": agent_id})
         return result
 
+    def outbound_agent_load(self) -> Optional[tuple[int, int]]:
+        """(free, busy) outbound agents for predictive pacing; None without an agent roster."""
+        if not self.outbound_agents:
+            return None
+        busy = sum(1 for agent in self.outbound_agents if agent["phone_number"] in self.agent_busy)
+        return len(self.outbound_agents) - busy, busy
+
+    def _pacer(self):
+        return getattr(self.dialer, "pacer", None) if self.dialer else None
+
     def _next_available_agent(self, agent_type: str = "outbound") -> Optional[dict]:
         """Round-robin pick from the appropriate agent list, skipping busy."""
         agents = self.inbound_agents if agent_type == "inbound" else self.outbound_agents
@@ -202,6 +255,9 @@ class FlowEngine(BaseScenario):
         async with session.lock:
             session.metadata["answered_at"] = str(time.time())
         logger.info("Call answered for session %s (customer)", session.session_id)
+        pacer = self._pacer()
+        if pacer:
+            pacer.on_answered(session.session_id)
 
         # Start the outbound flow
         scenario = self._get_scenario(session)
@@ -253,6 +309,7 @@ class FlowEngine(BaseScenario):
             next_step_id = session.metadata.get("pending_record_next")
             on_empty_id = session.metadata.get("pending_record_on_empty")
             on_failure_id = session.metadata.get("pending_record_on_failure")
+        self._finish_vad_monitor(session, recording_name, observe=True)
 
         # Process in background
         asyncio.create_task(
@@ -272,6 +329,7 @@ class FlowEngine(BaseScenario):
                 return
             is_inbound = session.metadata.get("flow_inbound") == "1"
             on_failure_id = session.metadata.get("pending_record_on_failure")
+        self._finish_vad_monitor(session, recording_name, observe=False)
 
         logger.warning("Recording failed (phase=%s) for session %s cause=%s", phase, session.session_id, cause)
         scenario = self._get_scenario(session)
@@ -288,22 +346,7 @@ class FlowEngine(BaseScenario):
 
         operator_failed = session.operator_leg and session.operator_leg.state == LegState.FAILED
         if operator_failed:
-            retried = await self._retry_operator_mobile(session, reason)
-            if retried:
-                return
-            await self._stop_onhold_playbacks(session)
-            async with session.lock:
-                yes_intent = session.metadata.get("intent_yes") == "1"
-                is_inbound_direct = session.metadata.get("inbound_direct") == "1"
-            current_result = session.result
-            if is_inbound_direct:
-                result_value = "disconnected"
-            elif current_result and current_result.startswith("failed:operator"):
-                result_value = current_result
-            else:
-                result_value = "disconnected" if yes_intent else "hangup"
-            await self._set_result(session, result_value, force=True, report=True)
-            await self._hangup(session)
+            self._spawn_operator_task(self._handle_operator_failed(session, reason))
             return
 
         # Customer leg failed - classify based on cause codes
@@ -353,6 +396,11 @@ class FlowEngine(BaseScenario):
             operator_call_started = session.metadata.get("operator_call_started") == "1"
             is_inbound_direct = session.metadata.get("inbound_direct") == "1"
             cause = session.metadata.get("hangup_cause")
+        capture = self.captures.pop(session.session_id, None)
+        if capture:
+            capture.cancel()
+            await capture.close()
+        self._drop_pending_intent(session.session_id)
 
         if operator_connected:
             if is_inbound_direct:
@@ -478,6 +526,9 @@ class FlowEngine(BaseScenario):
             async with session.lock:
                 session.metadata["transfer_on_success"] = step.on_success or ""
                 session.metadata["transfer_on_failure"] = step.on_failure or ""
+            pacer = self._pacer()
+            if pacer:
+                pacer.on_transfer(session.session_id)
             await self._play_onhold(session)
             await self._connect_to_operator(session, agent_type=agent_type)
 
@@ -588,6 +639,8 @@ class FlowEngine(BaseScenario):
             session.metadata["pending_record_on_failure"] = step.on_failure or ""
             if session.metadata.get("hungup") == "1":
                 return
+        if scenario.stt.streaming and await self._start_streaming(session, step, scenario, inbound, channel_id):
+            return
         logger.info("Recording %s for session %s", phase, session.session_id)
         try:
             if session.bridge and session.bridge.bridge_id:
@@ -605,6 +658,8 @@ class FlowEngine(BaseScenario):
                     max_silence=scenario.stt.max_silence,
                 )
             await self.session_manager.register_recording(session.session_id, recording_name)
+            if scenario.stt.vad.enabled:
+                await self._start_vad_monitor(session, channel_id, recording_name, scenario)
         except Exception as exc:
             logger.exception("Failed to start recording for session %s: %s", session.session_id, exc)
             if step.on_failure:
@@ -612,6 +667,94 @@ class FlowEngine(BaseScenario):
                 if fail_step:
                     await self._execute_step(session, fail_step, inbound=inbound)
 
+    async def _start_vad_monitor(
+        self, session: Session, channel_id: str, recording_name: str, scenario: ScenarioConfig,
+    ) -> None:
+        monitor = VadRecordingMonitor(
+            self.ari_client,
+            self.settings.streaming,
+            session.session_id,
+            channel_id,
+            recording_name,
+            scenario.stt.vad,
+        )
+        try:
+            await monitor.start()
+        except Exception as exc:
+            # The recording still ends on maxSilenceSeconds.
+            logger.warning("VAD monitor failed for session %s: %s", session.session_id, exc)
+            return
+        self.captures[session.session_id] = monitor
+
+    def _finish_vad_monitor(self, session: Session, recording_name: str, observe: bool) -> None:
+        monitor = self.captures.get(session.session_id)
+        if not isinstance(monitor, VadRecordingMonitor) or monitor.recording_name != recording_name:
+            return
+        self.captures.pop(session.session_id, None)
+        last_voice_at = monitor.last_voice_at
+        if observe and last_voice_at is not None:
+            reason = "vad" if monitor.stopped else "silence"
+            latency = time.perf_counter() - last_voice_at
+            self.turn_end_latency[reason].observe(latency)
+            logger.debug(
+                "Turn end (%s) session %s: %.0f ms after last speech", reason, session.session_id, latency * 1000
+            )
+        asyncio.create_task(monitor.close())
+
+    async def _start_streaming(
+        self, session: Session, step, scenario: ScenarioConfig, inbound: bool, channel_id: str,
+    ) -> bool:
+        """Start a streaming capture; False means fall back to an ARI recording."""
+        capture = StreamingCapture(
+            self.ari_client,
+            self.stt_client,
+            self.settings.streaming,
+            session.session_id,
+            channel_id,
+            step.step,
+            scenario.stt,
+        )
+        try:
+            await capture.start()
+        except Exception as exc:
+            logger.warning(
+                "Streaming capture failed for session %s, using ARI recording: %s", session.session_id, exc
+            )
+            return False
+        self.captures[session.session_id] = capture
+        logger.info("Streaming %s for session %s", step.step, session.session_id)
+        asyncio.create_task(
+            self._process_stream(session, capture, scenario, inbound, step.next, step.on_empty, step.on_failure)
+        )
+        return True
+
+    async def _process_stream(
+        self, session: Session, capture: StreamingCapture, scenario: ScenarioConfig, inbound: bool,
+        next_step_id: Optional[str], on_empty_id: Optional[str], on_failure_id: Optional[str],
+    ) -> None:
+        try:
+            await capture.wait_for_end_of_speech()
+        finally:
+            await capture.close()
+            if self.captures.get(session.session_id) is capture:
+                self.captures.pop(session.session_id, None)
+        async with session.lock:
+            if session.metadata.get("hungup") == "1":
+                capture.cancel()
+                return
+
+        async def transcribe() -> Optional[str]:
+            result = await capture.transcript()
+            logger.info(
+                "Stream %s session %s ended (%s): %d segments, transcript ready %.0f ms after end of speech",
+                capture.phase, session.session_id, result.reason, result.segments, result.tail_latency * 1000,
+            )
+            return result.text if result.speech_detected else None
+
+        await self._handle_transcription(
+            session, scenario, capture.phase, inbound, transcribe, next_step_id, on_empty_id, on_failure_id,
+        )
+
     async def _process_recording(
         self, session: Session, recording_name: str, phase: str, inbound: bool,
         next_step_id: Optional[str], on_empty_id: Optional[str], on_failure_id: Optional[str],
@@ -620,6 +763,116 @@ class FlowEngine(BaseScenario):
         scenario = self._get_scenario(session)
         if not scenario:
             return
+
+        async def transcribe() -> Optional[str]:
+            with self.stage_latency["fetch"].time():
+                audio_bytes = await self.ari_client.fetch_stored_recording(recording_name)
+            with self.stage_latency["empty_check"].time():
+                empty = await self._is_empty_audio_async(audio_bytes)
+            if empty:
+                logger.info("Recording empty for session %s", session.session_id)
+                return None
+            if scenario.stt.speculative:
+                next_step = scenario.get_step(next_step_id, inbound=inbound) if next_step_id else None
+                prestart = next_step is not None and next_step.type == "classify_intent"
+                return await self._transcribe_speculative(session, scenario, phase, audio_bytes, prestart)
+            with self.stage_latency["stt"].time():
+                stt_result: STTResult = await self.stt_client.transcribe_audio(
+                    audio_bytes,
+                    hotwords=scenario.stt.hotwords,
+                    session_id=session.session_id,
+                    phase=phase,
+                )
+            return stt_result.text
+
+        await self._handle_transcription(
+            session, scenario, phase, inbound, transcribe, next_step_id, on_empty_id, on_failure_id,
+        )
+
+    async def _transcribe_speculative(
+        self, session: Session, scenario: ScenarioConfig, phase: str, audio_bytes: bytes,
+        prestart_intent: bool = False,
+    ) -> str:
+        """
+        Race raw and enhanced audio through STT. The first non-empty transcript
+        wins and the other request is cancelled; "" if both come back empty.
+        With `prestart_intent`, intent detection (fast path, then LLM) starts the
+        moment a branch wins, while the flow is still storing the transcript and
+        reaching its classify_intent step.
+        """
+        started = time.perf_counter()
+
+        async def branch(name: str, enhance: bool) -> str:
+            result: STTResult = await self.stt_client.transcribe_audio(
+                audio_bytes,
+                hotwords=scenario.stt.hotwords,
+                session_id=session.session_id,
+                phase=phase,
+                enhance=enhance,
+            )
+            self.stage_latency[f"stt_{name}"].observe(time.perf_counter() - started)
+            return (result.text or "").strip()
+
+        branches = {
+            asyncio.create_task(branch("raw", False)): "raw",
+            asyncio.create_task(branch("enhanced", True)): "enhanced",
+        }
+        pending = set(branches)
+        error: Optional[BaseException] = None
+        answered = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = None
+                for task in done:
+                    if task.exception():
+                        error = error or task.exception()
+                        continue
+                    answered = True
+                    if task.result() and winner is None:
+                        winner = task
+                if winner:
+                    if prestart_intent:
+                        self._prestart_intent(session, winner.result(), scenario)
+                        # Let detection run to its first await (fast path done, LLM request sent).
+                        await asyncio.sleep(0)
+                    elapsed = time.perf_counter() - started
+                    self.stage_latency["stt"].observe(elapsed)
+                    self.speculative_wins.inc(branches[winner])
+                    logger.debug(
+                        "Speculative STT session %s: %s won in %.0f ms",
+                        session.session_id, branches[winner], elapsed * 1000,
+                    )
+                    return winner.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        self.speculative_wins.inc("none")
+        if error and not answered:
+            raise error
+        return ""
+
+    def _prestart_intent(self, session: Session, transcript: str, scenario: ScenarioConfig) -> None:
+        """Begin intent detection now; the classify_intent step awaits it for the same transcript."""
+        self._drop_pending_intent(session.session_id)
+        task = asyncio.create_task(self._detect_intent(transcript, scenario))
+        # Mark the exception retrieved in case the flow never reaches classify_intent.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self.pending_intents[session.session_id] = (transcript, task)
+
+    def _drop_pending_intent(self, session_id: str) -> None:
+        pending = self.pending_intents.pop(session_id, None)
+        if pending:
+            pending[1].cancel()
+
+    async def _handle_transcription(
+        self, session: Session, scenario: ScenarioConfig, phase: str, inbound: bool, transcribe,
+        next_step_id: Optional[str], on_empty_id: Optional[str], on_failure_id: Optional[str],
+    ) -> None:
+        """
+        Run `transcribe` (returns text, or None for empty audio) behind the processing
+        prompt and continue the flow with the transcript.
+        """
         processing_prompt = None
         if next_step_id:
             next_step = scenario.get_step(next_step_id, inbound=inbound)
@@ -628,9 +881,8 @@ class FlowEngine(BaseScenario):
         if processing_prompt:
             await self._start_processing_playback(session, processing_prompt, scenario)
         try:
-            audio_bytes = await self.ari_client.fetch_stored_recording(recording_name)
-            if self._is_empty_audio(audio_bytes):
-                logger.info("Recording empty for session %s", session.session_id)
+            text = await transcribe()
+            if text is None:
                 await self._stop_processing_playback(session)
                 if on_empty_id:
                     step = scenario.get_step(on_empty_id, inbound=inbound)
@@ -638,13 +890,11 @@ class FlowEngine(BaseScenario):
                         await self._execute_step(session, step, inbound=inbound)
                 return
 
-            stt_result: STTResult = await self.stt_client.transcribe_audio(
-                audio_bytes, hotwords=scenario.stt.hotwords,
-            )
             async with session.lock:
                 if session.metadata.get("hungup") == "1":
+                    self._drop_pending_intent(session.session_id)
                     return
-            transcript = stt_result.text.strip()
+            transcript = text.strip()
             logger.info("STT (%s) session %s: %s", phase, session.session_id, transcript)
 
             if not transcript:
@@ -700,8 +950,15 @@ class FlowEngine(BaseScenario):
                 if fail_step:
                     await self._execute_step(session, fail_step, inbound=inbound)
             return
+        pending = self.pending_intents.pop(session.session_id, None)
         try:
-            intent = await self._detect_intent(transcript, scenario)
+            with self.stage_latency["intent"].time():
+                if pending and pending[0] == transcript:
+                    intent = await pending[1]
+                else:
+                    if pending:
+                        pending[1].cancel()
+                    intent = await self._detect_intent(transcript, scenario)
         except Exception as exc:
             logger.warning("Intent classification failed for session %s: %s", session.session_id, exc)
             if self._is_llm_quota_error(exc):
@@ -769,58 +1026,43 @@ class FlowEngine(BaseScenario):
 
     async def _detect_intent(self, transcript: str, scenario: ScenarioConfig) -> str:
         """Detect intent using LLM with fallback to token matching."""
-        text = transcript.lower()
-        text_compact = text.replace("\u200c", "").replace(" ", "")
+        # One normalization feeds the compiled matchers and the cache key.
+        normalized = normalize_persian(transcript)
 
         # Fast-path for clear yes tokens
-        for token in ("بله", "بلی", "بلى", "آره", "اره", "حتما", "حتماً"):
-            if token in text or token in text_compact:
-                return "yes"
+        if YES_FAST_PATH.match_normalized(normalized):
+            return "yes"
+
+        local = self._classify_locally(transcript, scenario)
+        if local:
+            return local
 
         if self.llm_client.api_key:
-            llm_config = scenario.llm
-            yes_examples = llm_config.fallback_tokens.get("yes", [])[:30]
-            no_examples = llm_config.fallback_tokens.get("no", [])[:20]
-            number_q_examples = llm_config.fallback_tokens.get("number_question", [
-                "شماره منو از کجا آوردی", "شماره منو از کجا آوردین",
-            ])
-
-            default_prompt = (
-                "Classify intent into one word: yes / no / number_question / unknown.\n"
-                "YES = interest or any question about price/place/time/links.\n"
-                f"Examples YES: {'; '.join(yes_examples)}.\n"
-                f"NO = reject/decline. Examples NO: {'; '.join(no_examples)}.\n"
-                f"NUMBER_QUESTION = asks where we got their number. Examples: {'; '.join(number_q_examples)}.\n"
-                f"User: {transcript}"
-            )
-            if llm_config.prompt_template:
-                try:
-                    prompt = llm_config.prompt_template.format(
-                        transcript=transcript,
-                        intent_categories=", ".join(llm_config.intent_categories),
-                        yes_examples="; ".join(yes_examples),
-                        no_examples="; ".join(no_examples),
-                        number_question_examples="; ".join(number_q_examples),
-                    )
-                except Exception as exc:
-                    logger.warning(
-                        "Failed to format LLM prompt template for scenario '%s': %s. Using default prompt.",
-                        scenario.name,
-                        exc,
-                    )
-                    prompt = default_prompt
-            else:
-                prompt = default_prompt
+            key = None
+            if self.intent_cache:
+                key = cache_key(scenario.name, self._intent_prompt_digest(scenario), normalized)
+                cached = await self.intent_cache.get(key)
+                if cached:
+                    return cached
+            prompt = self._build_intent_prompt(scenario, transcript)
 
             try:
-                result = await self.llm_client.chat(
-                    messages=[{"role": "user", "content": prompt}],
-                    model="gpt-4o-mini",
-                    temperature=0,
-                )
-                normalized = result.strip().lower()
-                intent = self._extract_intent_label(normalized)
+                if self.llm_batcher:
+                    # Same scenario prompt with the transcript left out, so concurrent calls share a batch.
+                    instructions = self._build_intent_prompt(scenario, "(numbered utterances below)")
+                    result = await self.llm_batcher.classify(instructions, transcript, prompt)
+                elif self.settings.gapgpt.stream:
+                    result = await self._stream_intent(prompt)
+                else:
+                    result = await self.llm_client.chat(
+                        messages=[{"role": "user", "content": prompt}],
+                        model="gpt-4o-mini",
+                        temperature=0,
+                    )
+                intent = self._extract_intent_label(result.strip().lower())
                 if intent:
+                    if key:
+                        await self.intent_cache.put(key, intent)
                     return intent
             except Exception as exc:
                 logger.warning("LLM intent fallback failed: %s", exc)
@@ -828,17 +1070,87 @@ class FlowEngine(BaseScenario):
                     raise
 
         # Token-based fallback
-        fallback = scenario.llm.fallback_tokens
-        for token in fallback.get("yes", []):
-            if token in text:
-                return "yes"
-        for token in fallback.get("no", []):
-            if token in text:
-                return "no"
-        for token in fallback.get("number_question", []):
-            if token in text:
-                return "number_question"
-        return "unknown"
+        return self.registry.get_matcher(scenario).match_normalized(normalized) or "unknown"
+
+    async def _stream_intent(self, prompt: str) -> str:
+        """Stream the LLM reply and stop reading as soon as it names a known label."""
+        text = ""
+        stream = self.llm_client.chat_stream(
+            messages=[{"role": "user", "content": prompt}],
+            model="gpt-4o-mini",
+            temperature=0,
+        )
+        async with contextlib.aclosing(stream):
+            async for chunk in stream:
+                text += chunk
+                label = self._early_intent_label(text)
+                if label:
+                    # Leaving the block closes the response; the remaining tokens are never read.
+                    self.intent_sources.inc("llm_early_label")
+                    return label
+        return text
+
+    def _early_intent_label(self, partial: str) -> Optional[str]:
+        lowered = partial.lower()
+        if "number_question" in lowered:
+            return "number_question"
+        match = _FIRST_WORD.match(lowered)
+        return self._extract_intent_label(match.group(1)) if match else None
+
+    def _classify_locally(self, transcript: str, scenario: ScenarioConfig) -> Optional[str]:
+        """On-box classifier answer when it clears the scenario threshold, else None."""
+        threshold = scenario.llm.local_threshold
+        if not self.local_classifier or threshold <= 0:
+            return None
+        label, confidence = self.local_classifier.predict(transcript)
+        if confidence >= threshold and label in scenario.llm.intent_categories:
+            self.intent_sources.inc("local")
+            return label
+        self.intent_sources.inc("local_escalated")
+        return None
+
+    def _intent_examples(self, scenario: ScenarioConfig) -> tuple[list[str], list[str], list[str]]:
+        llm_config = scenario.llm
+        yes_examples = llm_config.fallback_tokens.get("yes", [])[:30]
+        no_examples = llm_config.fallback_tokens.get("no", [])[:20]
+        number_q_examples = llm_config.fallback_tokens.get("number_question", [
+            "شماره منو از کجا آوردی", "شماره منو از کجا آوردین",
+        ])
+        return yes_examples, no_examples, number_q_examples
+
+    def _intent_prompt_digest(self, scenario: ScenarioConfig) -> str:
+        """Hash of everything but the transcript that goes into the intent prompt."""
+        parts = (scenario.llm.prompt_template, scenario.llm.intent_categories, self._intent_examples(scenario))
+        return template_hash(repr(parts))
+
+    def _build_intent_prompt(self, scenario: ScenarioConfig, transcript: str) -> str:
+        llm_config = scenario.llm
+        yes_examples, no_examples, number_q_examples = self._intent_examples(scenario)
+        default_prompt = (
+            "Classify intent into one word: yes / no / number_question / unknown.\n"
+            "YES = interest or any question about price/place/time/links.\n"
+            f"Examples YES: {'; '.join(yes_examples)}.\n"
+            f"NO = reject/decline. Examples NO: {'; '.join(no_examples)}.\n"
+            f"NUMBER_QUESTION = asks where we got their number. Examples: {'; '.join(number_q_examples)}.\n"
+            f"User: {transcript}"
+        )
+        if not llm_config.prompt_template:
+            return default_prompt
+        try:
+            return llm_config.prompt_template.format(
+                transcript=transcript,
+                intent_categories=", ".join(llm_config.intent_categories),
+                yes_examples="; ".join(yes_examples),
+                no_examples="; ".join(no_examples),
+                number_question_examples="; ".join(number_q_examples),
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to format LLM prompt template for scenario '%s': %s. Using default prompt.",
+                scenario.name,
+                exc,
+            )
+            return default_prompt
 
     def _extract_intent_label(self, normalized: str) -> Optional[str]:
         tokens = [tok.strip(" ,.;!?") for tok in normalized.split() if tok.strip(" ,.;!?")]
@@ -895,30 +1207,31 @@ class FlowEngine(BaseScenario):
         try:
             deadline = time.monotonic() + max(self.settings.operator.timeout, 5)
             while time.monotonic() < deadline:
-                line = self.dialer._available_line()
+                # Same reservation as queue originations: active slot plus line/global rate limits.
+                line = self.dialer._reserve_line()
                 if line:
-                    async with self.dialer.lock:
-                        stats = self.dialer.line_stats.get(line)
-                        if stats is None:
-                            return None
-                        stats["active"] += 1
-                        stats["attempts"].append(datetime.utcnow())
-                        stats["daily"] += 1
-                        stats["last_originated_ts"] = time.monotonic()
-                    self.dialer._record_attempt()
                     return line
                 await asyncio.sleep(0.05)
             return None
         finally:
             self.dialer.operator_priority_requests = max(0, self.dialer.operator_priority_requests - 1)
+            self.dialer.wake()
 
     async def _release_outbound_line(self, line: Optional[str]) -> None:
         if not line or not self.dialer:
             return
-        async with self.dialer.lock:
-            stats = self.dialer.line_stats.get(line)
-            if stats:
-                stats["active"] = max(stats.get("active", 0) - 1, 0)
+        self.dialer._release_line(line)
+
+    def _spawn_operator_task(self, coro) -> asyncio.Task:
+        """
+        Run an operator dial as its own task. Event handlers run in order on a
+        shared dispatcher lane; waiting there for a free line would also hold
+        the hangups of other calls on that lane, the events that free lines.
+        """
+        task = asyncio.create_task(coro)
+        self.operator_tasks.add(task)
+        task.add_done_callback(self.operator_tasks.discard)
+        return task
 
     async def _connect_to_operator(self, session: Session, agent_type: str = "outbound") -> None:
         async with session.lock:
@@ -933,7 +1246,9 @@ class FlowEngine(BaseScenario):
         if not customer_channel:
             logger.warning("No customer channel for operator connect session %s", session.session_id)
             return
+        self._spawn_operator_task(self._dial_operator(session, agent_type))
 
+    async def _dial_operator(self, session: Session, agent_type: str) -> None:
         endpoint = ""
         operator_mobile = None
         outbound_line = None
@@ -964,17 +1279,21 @@ class FlowEngine(BaseScenario):
 
         app_args = f"operator,{session.session_id},{endpoint}"
         async with session.lock:
-            session.metadata["operator_endpoint"] = endpoint
-            if operator_mobile:
-                session.metadata["operator_mobile"] = operator_mobile
-                session.metadata["operator_outbound_line"] = outbound_line
-                session.metadata["operator_agent_id"] = str(agent.get("id")) if agent and agent.get("id") else ""
-            caller_id = (
-                self.dialer._caller_id_for_line(outbound_line) if self.dialer and outbound_line
-                else self.settings.operator.caller_id
-            )
-            if session.metadata.get("hungup") == "1":
-                return
+            # The caller may have hung up (and been cleaned up) while we waited for a line.
+            hungup = session.metadata.get("hungup") == "1"
+            if not hungup:
+                session.metadata["operator_endpoint"] = endpoint
+                if operator_mobile:
+                    session.metadata["operator_mobile"] = operator_mobile
+                    session.metadata["operator_outbound_line"] = outbound_line
+                    session.metadata["operator_agent_id"] = str(agent.get("id")) if agent and agent.get("id") else ""
+        if hungup:
+            await self._release_outbound_line(outbound_line)
+            return
+        caller_id = (
+            self.dialer._caller_id_for_line(outbound_line) if self.dialer and outbound_line
+            else self.settings.operator.caller_id
+        )
 
         logger.info("Connecting session %s to operator %s", session.session_id, endpoint)
         try:
@@ -1001,11 +1320,30 @@ class FlowEngine(BaseScenario):
             elif scenario and "goodby" in scenario.prompts:
                 await self._play_prompt(session, "goodby", scenario)
 
+    async def _handle_operator_failed(self, session: Session, reason: str) -> None:
+        retried = await self._retry_operator_mobile(session, reason)
+        if retried:
+            return
+        await self._stop_onhold_playbacks(session)
+        async with session.lock:
+            yes_intent = session.metadata.get("intent_yes") == "1"
+            is_inbound_direct = session.metadata.get("inbound_direct") == "1"
+        current_result = session.result
+        if is_inbound_direct:
+            result_value = "disconnected"
+        elif current_result and current_result.startswith("failed:operator"):
+            result_value = current_result
+        else:
+            result_value = "disconnected" if yes_intent else "hangup"
+        await self._set_result(session, result_value, force=True, report=True)
+        await self._hangup(session)
+
     async def _retry_operator_mobile(self, session: Session, reason: str) -> bool:
         async with session.lock:
             tried = set((session.metadata.get("operator_tried") or "").split(",")) if session.metadata.get("operator_tried") else set()
             current_mobile = session.metadata.get("operator_mobile")
-            outbound_line = session.metadata.get("operator_outbound_line")
+            # Pop so a hangup while we wait for the next line does not release it twice.
+            outbound_line = session.metadata.pop("operator_outbound_line", None)
         if current_mobile:
             self.agent_busy.discard(current_mobile)
             tried.add(current_mobile)
@@ -1035,11 +1373,17 @@ class FlowEngine(BaseScenario):
         app_args = f"operator,{session.session_id},{endpoint}"
         caller_id = self.dialer._caller_id_for_line(outbound_line) if self.dialer else self.settings.operator.caller_id
         async with session.lock:
-            session.metadata["operator_mobile"] = next_mobile
-            session.metadata["operator_outbound_line"] = outbound_line
-            session.metadata["operator_endpoint"] = endpoint
-            session.metadata["operator_tried"] = ",".join(tried | {next_mobile})
-            session.metadata["operator_agent_id"] = str(agent.get("id")) if agent.get("id") else ""
+            hungup = session.metadata.get("hungup") == "1"
+            if not hungup:
+                session.metadata["operator_mobile"] = next_mobile
+                session.metadata["operator_outbound_line"] = outbound_line
+                session.metadata["operator_endpoint"] = endpoint
+                session.metadata["operator_tried"] = ",".join(tried | {next_mobile})
+                session.metadata["operator_agent_id"] = str(agent.get("id")) if agent.get("id") else ""
+        if hungup:
+            # The hangup path already settled the result.
+            await self._release_outbound_line(outbound_line)
+            return True
         logger.info("Retrying operator for session %s via %s", session.session_id, endpoint)
         try:
             await self.ari_client.originate_call(
@@ -1050,6 +1394,8 @@ class FlowEngine(BaseScenario):
             return True
         except Exception as exc:
             logger.exception("Operator retry failed for session %s: %s", session.session_id, exc)
+            async with session.lock:
+                session.metadata.pop("operator_outbound_line", None)
             await self._release_outbound_line(outbound_line)
             return False
 
@@ -1200,21 +1546,12 @@ class FlowEngine(BaseScenario):
     # -- Utilities ---------------------------------------------------------
 
     def _is_empty_audio(self, audio_bytes: bytes) -> bool:
-        if not audio_bytes or len(audio_bytes) < 800:
-            return True
-        try:
-            with wave.open(io.BytesIO(audio_bytes), "rb") as w:
-                frames = w.getnframes()
-                rate = w.getframerate()
-                sampwidth = w.getsampwidth() or 2
-                data = w.readframes(frames)
-            duration = frames / rate if rate else 0
-            rms = audioop.rms(data, sampwidth) if frames else 0
-            max_amp = 2 ** (8 * sampwidth - 1)
-            norm = rms / max_amp if max_amp else 0
-            return duration < 0.1 or norm < 0.001
-        except Exception:
-            return False
+        return audio_enhance.is_empty_wav(audio_bytes)
+
+    async def _is_empty_audio_async(self, audio_bytes: bytes) -> bool:
+        if self.audio_workers:
+            return await self.audio_workers.is_empty_audio(audio_bytes)
+        return self._is_empty_audio(audio_bytes)
 
     def _build_log(self, name: str, filename: str) -> logging.Logger:
         lg = logging.getLogger(name)
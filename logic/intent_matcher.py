@@ -0,0 +1,103 @@
+"""
+Compiled multi-pattern intent matcher (Aho-Corasick over normalized Persian).
+
+Replaces per-call `for token in tokens: if token in text` loops: every token of
+every intent is compiled into one automaton, and a transcript is scanned once.
+Short tokens (<= `whole_word_max_len` letters, e.g. "نه") only match as whole
+words so they do not fire inside longer words ("خونه"); ZWNJ normalizes to a
+space, so "نه‌خیر" still has "نه" as a word. When several intents match, the
+one earliest in `priority` wins.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.text_normalize import normalize_persian
+
+
+# Clear "yes" replies that skip the LLM entirely.
+YES_FAST_PATH_TOKENS = ("بله", "بلی", "بلى", "آره", "اره", "حتما", "حتماً")
+DEFAULT_PRIORITY = ("yes", "no", "number_question")
+
+
+class IntentMatcher:
+    def __init__(
+        self,
+        groups: Dict[str, Iterable[str]],
+        priority: Optional[Iterable[str]] = None,
+        whole_word_max_len: int = 3,
+    ):
+        order = list(priority or DEFAULT_PRIORITY)
+        order += [intent for intent in groups if intent not in order]
+        self.intents: List[str] = [intent for intent in order if intent in groups]
+        # Per state: transitions, failure link, outputs as (rank, length, whole_word).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int, bool]]] = [[]]
+        self.size = 0
+        for rank, intent in enumerate(self.intents):
+            for token in groups[intent]:
+                token = str(token)
+                # STT writes "می‌خوام" both with and without ZWNJ; match either spelling.
+                for pattern in {normalize_persian(token), normalize_persian(token.replace("\u200c", ""))}:
+                    if pattern:
+                        self._add(pattern, rank, len(pattern.replace(" ", "")) <= whole_word_max_len)
+        self._build_links()
+
+    @classmethod
+    def from_fallback_tokens(cls, fallback_tokens: Dict[str, List[str]]) -> "IntentMatcher":
+        return cls(fallback_tokens, priority=DEFAULT_PRIORITY)
+
+    def _add(self, pattern: str, rank: int, whole_word: bool) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((rank, len(pattern), whole_word))
+        self.size += 1
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def match(self, text: str) -> Optional[str]:
+        return self.match_normalized(normalize_persian(text))
+
+    def match_normalized(self, text: str) -> Optional[str]:
+        """Highest-priority intent with a token in `text` (already normalized), else None."""
+        best = len(self.intents)
+        goto, fail, out = self._goto, self._fail, self._out
+        last = len(text) - 1
+        state = 0
+        for idx, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for rank, length, whole_word in out[state]:
+                if rank >= best:
+                    continue
+                if whole_word:
+                    start = idx - length + 1
+                    if (start > 0 and text[start - 1] != " ") or (idx < last and text[idx + 1] != " "):
+                        continue
+                best = rank
+                if best == 0:
+                    return self.intents[0]
+        return self.intents[best] if best < len(self.intents) else None
+
+
+YES_FAST_PATH = IntentMatcher({"yes": YES_FAST_PATH_TOKENS})
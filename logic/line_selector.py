@@ -0,0 +1,104 @@
+"""
+Indexed outbound-line selection.
+
+`LineSelector` keeps two heaps instead of scanning every line per origination:
+lines that may originate now, keyed by their load tuple, and lines waiting on
+a rate window, keyed by the monotonic time they become eligible. Lines
+blocked on something only an event can change (busy, inbound waiting) sit in
+neither until `touch()`ed.
+
+Invalidation is lazy: every `touch()` bumps the line's version and pushes a
+fresh entry, and stale entries are skipped when they reach the top. The top
+ready entry is re-evaluated before it is returned, so load keys that drifted
+as rate windows expired are corrected on the way. pick/touch are O(log n).
+"""
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# evaluate(line) -> (delay, load): delay in seconds (0 = now) or None when blocked.
+LineState = Tuple[Optional[float], tuple]
+
+
+class LineSelector:
+    def __init__(self, evaluate: Callable[[str], LineState], clock: Callable[[], float] = time.monotonic):
+        self.evaluate = evaluate
+        self.clock = clock
+        self._versions: Dict[str, int] = {}
+        self._ready: List[tuple] = []  # (load, seq, line, version)
+        self._waiting: List[tuple] = []  # (eligible_at, seq, line, version)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def reset(self, lines: Iterable[str]) -> None:
+        """Rebuild the index for exactly `lines`."""
+        self._versions = {}
+        self._ready = []
+        self._waiting = []
+        for line in lines:
+            self.touch(line)
+
+    def remove(self, line: str) -> None:
+        self._versions.pop(line, None)
+
+    def touch(self, line: str) -> None:
+        """Re-evaluate `line` after anything that may change its eligibility or load."""
+        version = self._versions.get(line, 0) + 1
+        self._versions[line] = version
+        delay, load = self.evaluate(line)
+        if delay is None:
+            return
+        if delay <= 0:
+            heapq.heappush(self._ready, (load, next(self._seq), line, version))
+        else:
+            heapq.heappush(self._waiting, (self.clock() + delay, next(self._seq), line, version))
+        self._maybe_compact()
+
+    def pick(self) -> Optional[str]:
+        """Least-loaded line that may originate now, or None. Does not reserve it."""
+        self._promote_due(self.clock())
+        ready = self._ready
+        while ready:
+            load, _, line, version = ready[0]
+            if self._versions.get(line) != version:
+                heapq.heappop(ready)
+                continue
+            delay, current = self.evaluate(line)
+            if delay is not None and delay <= 0 and current == load:
+                return line
+            heapq.heappop(ready)
+            self.touch(line)
+        return None
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until some line may originate (0 = now); None if every line is blocked."""
+        if self.pick() is not None:
+            return 0.0
+        waiting = self._waiting
+        while waiting:
+            eligible_at, _, line, version = waiting[0]
+            if self._versions.get(line) == version:
+                return max(0.0, eligible_at - self.clock())
+            heapq.heappop(waiting)
+        return None
+
+    def _promote_due(self, now: float) -> None:
+        waiting = self._waiting
+        while waiting and waiting[0][0] <= now:
+            _, _, line, version = heapq.heappop(waiting)
+            if self._versions.get(line) == version:
+                self.touch(line)
+
+    def _maybe_compact(self) -> None:
+        # Stale entries are normally dropped when they surface; bound the garbage anyway.
+        limit = 4 * len(self._versions) + 64
+        if len(self._ready) + len(self._waiting) <= limit:
+            return
+        versions = self._versions
+        self._ready = [entry for entry in self._ready if versions.get(entry[2]) == entry[3]]
+        self._waiting = [entry for entry in self._waiting if versions.get(entry[2]) == entry[3]]
+        heapq.heapify(self._ready)
+        heapq.heapify(self._waiting)
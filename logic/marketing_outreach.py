@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import time
-from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Awaitable, Callable, Optional
@@ -15,6 +14,7 @@ from core.ari_client import AriClient
 from integrations.panel.client import PanelClient
 from llm.client import GapGPTClient
 from logic.base import BaseScenario
+from logic.intent_matcher import IntentMatcher
 from sessions.session import CallLeg, LegDirection, LegState, Session
 from sessions.session_manager import SessionManager
 from stt_tts.vira_stt import STTResult, ViraSTTClient
@@ -22,6 +22,8 @@ from stt_tts.vira_stt import STTResult, ViraSTTClient
 
 logger = logging.getLogger(__name__)
 
+_YES_FAST_PATH = IntentMatcher({"yes": ("بله", "آره")})
+
 
 class MarketingScenario(BaseScenario):
     """
@@ -182,30 +184,20 @@ class MarketingScenario(BaseScenario):
         try:
             deadline = time.monotonic() + max(self.settings.operator.timeout, 5)
             while time.monotonic() < deadline:
-                line = self.dialer._available_line()  # reuse dialer logic
+                # Same reservation as queue originations: active slot plus line/global rate limits.
+                line = self.dialer._reserve_line()
                 if line:
-                    async with self.dialer.lock:
-                        stats = self.dialer.line_stats.get(line)
-                        if stats is None:
-                            return None
-                        stats["active"] += 1
-                        stats["attempts"].append(datetime.utcnow())
-                        stats["daily"] += 1
-                        stats["last_originated_ts"] = time.monotonic()
-                    self.dialer._record_attempt()
                     return line
                 await asyncio.sleep(0.05)
             return None
         finally:
             self.dialer.operator_priority_requests = max(0, self.dialer.operator_priority_requests - 1)
+            self.dialer.wake()
 
     async def _release_outbound_line(self, line: Optional[str]) -> None:
         if not line or not self.dialer:
             return
-        async with self.dialer.lock:
-            stats = self.dialer.line_stats.get(line)
-            if stats:
-                stats["active"] = max(stats.get("active", 0) - 1, 0)
+        self.dialer._release_line(line)
 
     async def on_outbound_channel_created(self, session: Session) -> None:
         logger.debug("Outbound channel ready for session %s", session.session_id)
@@ -767,9 +759,8 @@ class MarketingScenario(BaseScenario):
                 "برای کسی دیگه می‌خوام", "بفرستید کسی دیگه خواست شماره تون رو میدم",
             }
         # Fast-path: if transcript already contains a clear yes token, skip LLM.
-        for token in ("بله", "آره"):
-            if token in transcript:
-                return "yes"
+        if _YES_FAST_PATH.match(transcript):
+            return "yes"
         if self.llm_client.api_key:
             # Provide intent examples to the LLM so it understands what we treat as yes/no.
             positive_examples = list(yes_tokens)[:30]  # keep prompt concise
@@ -0,0 +1,207 @@
+"""
+Predictive pacing for outbound dialing.
+
+Instead of dialing as fast as line limits allow, keep just enough calls in
+flight that the transfers they are expected to produce match the outbound
+agents that will be free for them.
+
+The pacer learns, over the last `window` calls:
+- answer rate: answered / originated
+- transfer rate: reached `transfer_to_operator` / answered
+- ring time (originate -> answer), talk time (answer -> transfer) and agent
+  handle time (transfer -> hangup)
+
+Each in-flight call is expected to reach an agent with probability
+answer_rate * transfer_rate while ringing, or transfer_rate once answered.
+The sum of those is the Poisson mean of upcoming transfers. A new call is
+allowed only if, with it, the expected share of transfers finding no free
+agent (the abandon ratio) stays at or below `target_abandon`. Free agents
+include busy agents expected to hang up before a new call would reach the
+transfer step. Until `min_samples` calls have completed, every in-flight
+call is assumed to transfer, which is conservative. One call is always
+allowed while an agent is free and nothing is in flight.
+"""
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from config.settings import PacingSettings
+from utils.metrics import Counters
+
+
+# () -> (free, busy) outbound agents, or None when there is no agent roster to pace against.
+AgentLoad = Callable[[], Optional[Tuple[int, int]]]
+
+
+def expected_overflow_ratio(mean: float, agents: int) -> float:
+    """E[(X - agents)+] / E[X] for X ~ Poisson(mean): the share of transfers finding no agent."""
+    if mean <= 0:
+        return 0.0
+    # E[(X - F)+] = E[X] - F + E[(F - X)+]
+    below = 0.0
+    pmf = math.exp(-mean)
+    for k in range(agents):
+        below += (agents - k) * pmf
+        pmf *= mean / (k + 1)
+    return max(0.0, mean - agents + below) / mean
+
+
+def max_transfer_mean(agents: int, target_abandon: float) -> float:
+    """Largest Poisson mean of upcoming transfers whose overflow ratio stays within target_abandon."""
+    if agents <= 0:
+        return 0.0
+    low, high = 0.0, float(agents) * 2 + 10
+    for _ in range(40):
+        mid = (low + high) / 2
+        if expected_overflow_ratio(mid, agents) <= target_abandon:
+            low = mid
+        else:
+            high = mid
+    return low
+
+
+class _Rolling:
+    """Mean of the last `size` samples."""
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(value)
+        self.total += value
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def mean(self, default: float = 0.0) -> float:
+        return self.total / len(self.samples) if self.samples else default
+
+
+class PredictivePacer:
+    def __init__(self, settings: PacingSettings, agent_load: AgentLoad, clock: Callable[[], float] = time.monotonic):
+        self.settings = settings
+        self.agent_load = agent_load
+        self.clock = clock
+        window = max(1, settings.window)
+        self.answered = _Rolling(window)  # 1 answered / 0 not, per originated call
+        self.transferred = _Rolling(window)  # 1 transferred / 0 not, per answered call
+        self.ring_time = _Rolling(window)
+        self.talk_time = _Rolling(window)
+        self.handle_time = _Rolling(window)
+        # session_id -> (state, since): "ringing" from originate, "answered" from answer
+        self.pipeline: Dict[str, Tuple[str, float]] = {}
+        self.transfers: Dict[str, float] = {}  # session_id -> transfer time, until hangup
+        self.pending = 0  # reserved originations whose session does not exist yet (count as ringing)
+        self.decisions = Counters()
+
+    # -- call events -------------------------------------------------------
+
+    def reserve(self) -> None:
+        """A call is committed before its session exists; counts as ringing until `on_originated`."""
+        self.pending += 1
+
+    def on_originated(self, session_id: str) -> None:
+        self.pending = max(0, self.pending - 1)
+        self.pipeline[session_id] = ("ringing", self.clock())
+
+    def on_answered(self, session_id: str) -> None:
+        entry = self.pipeline.get(session_id)
+        if not entry or entry[0] != "ringing":
+            return
+        now = self.clock()
+        self.answered.add(1.0)
+        self.ring_time.add(now - entry[1])
+        self.pipeline[session_id] = ("answered", now)
+
+    def on_transfer(self, session_id: str) -> None:
+        entry = self.pipeline.pop(session_id, None)
+        if not entry or entry[0] != "answered":
+            return
+        now = self.clock()
+        self.transferred.add(1.0)
+        self.talk_time.add(now - entry[1])
+        self.transfers[session_id] = now
+
+    def on_finished(self, session_id: str) -> None:
+        entry = self.pipeline.pop(session_id, None)
+        if entry:
+            if entry[0] == "ringing":
+                self.answered.add(0.0)
+            else:
+                self.transferred.add(0.0)
+        transferred_at = self.transfers.pop(session_id, None)
+        if transferred_at is not None:
+            self.handle_time.add(self.clock() - transferred_at)
+
+    def discard(self, session_id: Optional[str] = None) -> None:
+        """Forget a call that never reached the network (originate failed)."""
+        if session_id is None:
+            self.pending = max(0, self.pending - 1)
+        else:
+            self.pipeline.pop(session_id, None)
+
+    # -- model -------------------------------------------------------------
+
+    def warmed_up(self) -> bool:
+        return len(self.answered) >= self.settings.min_samples
+
+    def rates(self) -> Tuple[float, float]:
+        """(answer rate, transfer rate); both 1.0 until warmed up."""
+        if not self.warmed_up():
+            return 1.0, 1.0
+        return self.answered.mean(), self.transferred.mean(1.0)
+
+    def time_to_transfer(self) -> float:
+        return self.ring_time.mean() + self.talk_time.mean()
+
+    def expected_transfers(self) -> float:
+        answer_rate, transfer_rate = self.rates()
+        ringing = sum(1 for state, _ in self.pipeline.values() if state == "ringing")
+        answered = len(self.pipeline) - ringing
+        ringing += self.pending
+        return ringing * answer_rate * transfer_rate + answered * transfer_rate
+
+    def available_agents(self, free: int, busy: int) -> int:
+        """Free agents plus busy ones expected back before a new call would reach transfer."""
+        if not busy or not self.warmed_up() or not len(self.handle_time):
+            return free
+        share = min(1.0, self.time_to_transfer() / max(self.handle_time.mean(), 1e-6))
+        return free + int(busy * share)
+
+    def allow(self) -> bool:
+        """True when one more origination keeps the expected abandon ratio within target."""
+        load = self.agent_load()
+        if load is None:
+            self.decisions.inc("unpaced")
+            return True
+        free, busy = load
+        answer_rate, transfer_rate = self.rates()
+        agents = self.available_agents(free, busy)
+        budget = max_transfer_mean(agents, self.settings.target_abandon)
+        in_flight = len(self.pipeline) + self.pending
+        # Always keep one call going while an agent is free, whatever the target.
+        allowed = (agents > 0 and in_flight == 0) or (
+            self.expected_transfers() + answer_rate * transfer_rate <= budget
+        )
+        self.decisions.inc("allow" if allowed else "hold")
+        return allowed
+
+    def stats(self) -> dict:
+        answer_rate, transfer_rate = self.rates()
+        load = self.agent_load()
+        return {
+            "warmed_up": self.warmed_up(),
+            "answer_rate": round(answer_rate, 3),
+            "transfer_rate": round(transfer_rate, 3),
+            "ring_time": round(self.ring_time.mean(), 2),
+            "talk_time": round(self.talk_time.mean(), 2),
+            "handle_time": round(self.handle_time.mean(), 2),
+            "in_flight": len(self.pipeline) + self.pending,
+            "expected_transfers": round(self.expected_transfers(), 2),
+            "agents": {"free": load[0], "busy": load[1]} if load else None,
+            "decisions": self.decisions.snapshot(),
+        }
@@ -0,0 +1,145 @@
+"""
+Background panel prefetcher for the dialer's contact queue.
+
+Runs beside the dial loop so `next-batch` round-trips never stall
+origination. The queue is kept double-buffered: once it drops below the low-
+water mark (numbers expected to be dialed before the next regular poll, from
+the observed consumption rate) a batch is fetched, sized to refill two such
+intervals or the dialer's current capacity, whichever is larger. Regular polls
+every DIALER_DEFAULT_RETRY seconds (or the panel's retry_after) still refresh
+lines, agents and scenarios when the queue is full.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Deque
+
+from integrations.panel.client import PanelClient
+from utils.metrics import Counters, LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+# Window over which the dial rate is measured.
+CONSUMPTION_WINDOW_SECONDS = 60.0
+# Minimum spacing between low-water refills, so an empty-handed panel is not hammered.
+MIN_REFILL_SPACING_SECONDS = 1.0
+
+
+class PanelPrefetcher:
+    def __init__(self, dialer, panel_client: PanelClient, clock: Callable[[], float] = time.monotonic):
+        self.dialer = dialer
+        self.panel_client = panel_client
+        self.clock = clock
+        self.next_poll = 0.0  # next regular poll (metadata refresh / retry_after)
+        self.earliest_refill = 0.0  # next low-water refill allowed
+        self.call_allowed = False
+        self.last_batch_size = 0
+        self.consumed: Deque[float] = deque()
+        self.counters = Counters()
+        self.fetch_latency = LatencyStats()
+        self._signal = asyncio.Event()
+
+    # -- signals from the dialer -------------------------------------------
+
+    def notify(self) -> None:
+        self._signal.set()
+
+    def on_consumed(self) -> None:
+        """The dial loop took a contact from the queue."""
+        self.consumed.append(self.clock())
+        self.notify()
+
+    def on_starved(self) -> None:
+        """The dial loop found the queue empty while it could have dialed."""
+        self.counters.inc("starved")
+        self.notify()
+
+    # -- sizing --------------------------------------------------------------
+
+    def consumption_rate(self) -> float:
+        """Contacts dialed per second over the last minute."""
+        cutoff = self.clock() - CONSUMPTION_WINDOW_SECONDS
+        while self.consumed and self.consumed[0] < cutoff:
+            self.consumed.popleft()
+        return len(self.consumed) / CONSUMPTION_WINDOW_SECONDS
+
+    def low_water(self) -> int:
+        """Queue depth expected to be consumed before the next regular poll (at least 1)."""
+        interval = max(1, self.dialer.settings.dialer.default_retry)
+        return max(1, math.ceil(self.consumption_rate() * interval))
+
+    def queue_depth(self) -> int:
+        return len(self.dialer.contacts)
+
+    def needs_refill(self) -> bool:
+        if not self.call_allowed or self.dialer.paused_by_failures or self.dialer.static_mode_enabled:
+            return False
+        return self.queue_depth() < self.low_water()
+
+    async def batch_size(self) -> int:
+        capacity = await self.dialer._available_capacity()
+        target = max(2 * self.low_water(), capacity)
+        return max(1, target - self.queue_depth())
+
+    # -- loop ------------------------------------------------------------------
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            self._signal.clear()
+            now = self.clock()
+            refill = self.needs_refill() and now >= self.earliest_refill
+            if now >= self.next_poll or refill:
+                try:
+                    await self.poll(refill)
+                except Exception as exc:
+                    # get_next_batch already turns HTTP errors into call_allowed=False.
+                    self.counters.inc("errors")
+                    logger.exception("Panel prefetch failed: %s", exc)
+                    self.next_poll = self.clock() + self.dialer.settings.dialer.default_retry
+                continue
+            deadline = self.next_poll
+            if self.needs_refill():
+                deadline = min(deadline, self.earliest_refill)
+            try:
+                await asyncio.wait_for(self._signal.wait(), max(0.0, deadline - now))
+            except asyncio.TimeoutError:
+                pass
+
+    async def poll(self, refill: bool = False) -> None:
+        size = await self.batch_size() if refill or self.needs_refill() else None
+        with self.fetch_latency.time():
+            batch = await self.panel_client.get_next_batch(size=size)
+        now = self.clock()
+        self.counters.inc("refills" if refill else "polls")
+        self.call_allowed = batch.call_allowed
+        queued = await self.dialer._apply_panel_batch(batch)
+        self.last_batch_size = len(batch.numbers)
+        self.counters.inc("numbers", len(batch.numbers))
+        if not batch.call_allowed:
+            self.counters.inc("not_allowed")
+            retry = batch.retry_after_seconds or self.dialer.settings.dialer.default_retry
+            self.next_poll = now + retry
+            self.earliest_refill = self.next_poll
+            return
+        self.next_poll = now + self.dialer.settings.dialer.default_retry
+        if not batch.numbers:
+            # Panel has nothing for us right now; wait for the regular poll.
+            self.counters.inc("empty")
+            self.earliest_refill = self.next_poll
+        else:
+            self.earliest_refill = now + MIN_REFILL_SPACING_SECONDS
+        if queued < len(batch.numbers):
+            self.counters.inc("deduped", len(batch.numbers) - queued)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "low_water": self.low_water(),
+            "consumption_rate": round(self.consumption_rate(), 3),
+            "last_batch_size": self.last_batch_size,
+            "counters": self.counters.snapshot(),
+            "fetch_latency": self.fetch_latency.snapshot(),
+        }
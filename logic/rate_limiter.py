@@ -0,0 +1,190 @@
+"""
+Rate-limiting primitives for the dialer.
+
+All limiters are synchronous and non-blocking and share one interface:
+`delay()` answers "how long until the next event is allowed" (0 = now,
+`math.inf` = not until something external changes) and `record()` counts an
+event. Both are O(1) (amortised for the sliding window). The caller decides
+how to wait, which keeps the check and the reservation in one step with no
+await in between.
+
+`RateLimits` groups the limiters of one scope (global, a line, a trunk...)
+and `ScopedRateLimits` creates such groups lazily per scope key.
+"""
+import math
+import time
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Deque, Dict, Hashable, Optional
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, holding at most `burst`
+    (defaults to max(1, rate)). A rate of 0 or less means unlimited.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float = 1.0) -> float:
+        """Seconds until `amount` tokens are available (0 = now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(self.clock())
+        missing = amount - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill(self.clock())
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+    def record(self, amount: float = 1.0) -> None:
+        """Take tokens unconditionally (may go negative, delaying later callers)."""
+        if self.rate <= 0:
+            return
+        self._refill(self.clock())
+        self.tokens -= amount
+
+
+class SlidingWindowCounter:
+    """
+    At most `limit` events in any `window` seconds. Only the last `limit`
+    timestamps are kept, so the next free slot is always `events[0] + window`.
+    A limit of 0 or less allows nothing (`delay()` is `math.inf`).
+    """
+
+    def __init__(self, limit: int, window: float, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.events: Deque[float] = deque(maxlen=max(limit, 1))
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window
+        events = self.events
+        while events and events[0] <= cutoff:
+            events.popleft()
+
+    def count(self) -> int:
+        """Events inside the current window (capped at `limit`)."""
+        self._prune(self.clock())
+        return len(self.events)
+
+    def remaining(self) -> int:
+        return max(0, self.limit - self.count())
+
+    def delay(self) -> float:
+        if self.limit <= 0:
+            return math.inf
+        now = self.clock()
+        self._prune(now)
+        if len(self.events) < self.limit:
+            return 0.0
+        return max(0.0, self.events[0] + self.window - now)
+
+    def record(self) -> None:
+        if self.limit > 0:
+            self.events.append(self.clock())
+
+
+class DailyCounter:
+    """
+    At most `limit` events per local calendar day; resets at midnight. A limit
+    of 0 or less allows nothing (`delay()` is `math.inf`).
+    """
+
+    def __init__(self, limit: int, now: Callable[[], datetime] = datetime.now):
+        self.limit = limit
+        self.now = now
+        self.day: date = now().date()
+        self.used = 0
+
+    def _roll(self, current: datetime) -> None:
+        if current.date() != self.day:
+            self.day = current.date()
+            self.used = 0
+
+    def count(self) -> int:
+        self._roll(self.now())
+        return self.used
+
+    def remaining(self) -> int:
+        return max(0, self.limit - self.count())
+
+    def delay(self) -> float:
+        if self.limit <= 0:
+            return math.inf
+        current = self.now()
+        self._roll(current)
+        if self.used < self.limit:
+            return 0.0
+        midnight = datetime.combine(self.day + timedelta(days=1), dtime.min)
+        return max(0.0, (midnight - current).total_seconds())
+
+    def record(self) -> None:
+        self._roll(self.now())
+        self.used += 1
+
+
+class RateLimits:
+    """Named limiters of one scope, checked and recorded together."""
+
+    def __init__(self, **limiters):
+        self.limiters: Dict[str, object] = limiters
+
+    def __getitem__(self, name: str):
+        return self.limiters[name]
+
+    def delay(self) -> float:
+        """Seconds until every limiter allows an event (max of their delays)."""
+        delay = 0.0
+        for limiter in self.limiters.values():
+            delay = max(delay, limiter.delay())
+            if delay == math.inf:
+                break
+        return delay
+
+    def record(self) -> None:
+        for limiter in self.limiters.values():
+            limiter.record()
+
+    def try_acquire(self) -> bool:
+        if self.delay() > 0:
+            return False
+        self.record()
+        return True
+
+
+class ScopedRateLimits:
+    """Lazily built `RateLimits` per scope key (a line number, a trunk name...)."""
+
+    def __init__(self, factory: Callable[[], RateLimits]):
+        self.factory = factory
+        self.scopes: Dict[Hashable, RateLimits] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.scopes
+
+    def get(self, key: Hashable) -> RateLimits:
+        limits = self.scopes.get(key)
+        if limits is None:
+            limits = self.scopes[key] = self.factory()
+        return limits
+
+    def drop(self, key: Hashable) -> None:
+        self.scopes.pop(key, None)
@@ -8,7 +8,8 @@ from typing import Dict, List, Optional
 
 import yaml
 
-from config.flow_definition import FlowStep, LLMConfig, ScenarioConfig, STTConfig
+from config.flow_definition import FlowStep, LLMConfig, ScenarioConfig, STTConfig, VADConfig
+from logic.intent_matcher import IntentMatcher
 
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,20 @@ def _parse_flow_steps(raw_steps: list) -> List[FlowStep]:
     return steps
 
 
+def _parse_vad(raw: dict) -> VADConfig:
+    """Parse the optional `stt.vad` block; missing keys keep VADConfig defaults."""
+    defaults = VADConfig()
+    return VADConfig(
+        enabled=bool(raw.get("enabled", defaults.enabled)),
+        stop_recording=bool(raw.get("stop_recording", defaults.stop_recording)),
+        backend=str(raw.get("backend", defaults.backend)).strip().lower(),
+        mode=int(raw.get("mode", defaults.mode)),
+        threshold_db=float(raw.get("threshold_db", defaults.threshold_db)),
+        min_speech_ms=int(raw.get("min_speech_ms", defaults.min_speech_ms)),
+        end_silence_ms=int(raw.get("end_silence_ms", defaults.end_silence_ms)),
+    )
+
+
 def _parse_scenario(data: dict) -> ScenarioConfig:
     """Parse a single YAML scenario dict into a ScenarioConfig."""
     sc = data.get("scenario", data)
@@ -75,6 +90,9 @@ def _parse_scenario(data: dict) -> ScenarioConfig:
         hotwords=stt_raw.get("hotwords", []),
         max_duration=stt_raw.get("max_duration", 10),
         max_silence=stt_raw.get("max_silence", 2),
+        streaming=bool(stt_raw.get("streaming", False)),
+        speculative=bool(stt_raw.get("speculative", False)),
+        vad=_parse_vad(stt_raw.get("vad") or {}),
     )
 
     # LLM config
@@ -93,6 +111,7 @@ def _parse_scenario(data: dict) -> ScenarioConfig:
         prompt_template=llm_raw.get("prompt_template", ""),
         intent_categories=llm_raw.get("intent_categories", ["yes", "no", "number_question", "unknown"]),
         fallback_tokens=fallback_tokens,
+        local_threshold=float(llm_raw.get("local_threshold", 0.0) or 0.0),
     )
 
     # Flows
@@ -118,6 +137,8 @@ class ScenarioRegistry:
 
     def __init__(self, scenarios_dir: str = "config/scenarios", company: str = ""):
         self._scenarios: Dict[str, ScenarioConfig] = {}
+        # Compiled fallback-token matchers, built once per scenario at load.
+        self._matchers: Dict[str, IntentMatcher] = {}
         self._enabled: List[str] = []
         self._outbound_cursor: int = 0
         self._inbound_cursor: int = 0
@@ -147,6 +168,7 @@ class ScenarioRegistry:
                     )
                     continue
                 self._scenarios[config.name] = config
+                self._matchers[config.name] = IntentMatcher.from_fallback_tokens(config.llm.fallback_tokens)
                 self._enabled.append(config.name)
                 logger.info("Loaded scenario '%s' from %s (%d outbound steps, %d inbound steps)",
                            config.name, yaml_file.name, len(config.flow), len(config.inbound_flow))
@@ -156,6 +178,14 @@ class ScenarioRegistry:
     def get(self, name: str) -> Optional[ScenarioConfig]:
         return self._scenarios.get(name)
 
+    def get_matcher(self, scenario: ScenarioConfig) -> IntentMatcher:
+        """Compiled fallback-token matcher for a scenario (built on first use if not loaded here)."""
+        matcher = self._matchers.get(scenario.name)
+        if matcher is None:
+            matcher = IntentMatcher.from_fallback_tokens(scenario.llm.fallback_tokens)
+            self._matchers[scenario.name] = matcher
+        return matcher
+
     def get_all(self) -> Dict[str, ScenarioConfig]:
         return dict(self._scenarios)
 
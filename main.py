@@ -7,15 +7,23 @@ from pathlib import Path
 from config import get_settings
 from core.ari_client import AriClient
 from core.ari_ws import AriWebSocketClient
-from llm.client import GapGPTClient
+from core.warmup import Readiness, warm_up
+from llm.client import ChatBatcher, GapGPTClient
+from llm.intent_cache import IntentCache
+from llm.local_classifier import LocalIntentClassifier
 from logic.dialer import Dialer
 from logic.flow_engine import FlowEngine
+from logic.pacing import PredictivePacer
 from logic.scenario_registry import ScenarioRegistry
 from integrations.panel.client import PanelClient
+from integrations.panel.outbox import ReportOutbox
 from sessions.session_manager import SessionManager
+from stt_tts.audio_workers import AudioWorkerPool
+from stt_tts.audit_sink import AuditSink
 from stt_tts.vira_stt import ViraSTTClient
 from stt_tts.vira_tts import ViraTTSClient
 from utils.audio_sync import ensure_audio_assets
+from utils.timer_wheel import TimerWheel
 
 ALLOWED_LOG_PREFIXES = (
     "app",
@@ -72,6 +80,18 @@ async def async_main() -> None:
     tts_semaphore = asyncio.Semaphore(settings.concurrency.max_parallel_tts)
     llm_semaphore = asyncio.Semaphore(settings.concurrency.max_parallel_llm)
 
+    audio_workers: AudioWorkerPool | None = None
+    if settings.concurrency.audio_workers > 0:
+        audio_workers = AudioWorkerPool(
+            max_workers=settings.concurrency.audio_workers,
+            max_pending=settings.concurrency.audio_worker_queue,
+        )
+        await audio_workers.start()
+        logger.info("Audio worker pool started with %d processes", audio_workers.max_workers)
+
+    audit_sink = AuditSink(settings.audit)
+    audit_sink.start()
+
     ari_client = AriClient(
         settings.ari,
         timeout=settings.timeouts.ari_timeout,
@@ -82,6 +102,8 @@ async def async_main() -> None:
         timeout=settings.timeouts.stt_timeout,
         max_connections=settings.concurrency.http_max_connections,
         semaphore=stt_semaphore,
+        audio_workers=audio_workers,
+        audit_sink=audit_sink,
     )
     tts_client = ViraTTSClient(
         settings.vira,
@@ -95,6 +117,27 @@ async def async_main() -> None:
         max_connections=settings.concurrency.http_max_connections,
         semaphore=llm_semaphore,
     )
+    llm_batcher: ChatBatcher | None = None
+    if settings.gapgpt.batch_window_ms > 0:
+        llm_batcher = ChatBatcher(
+            llm_client,
+            window_ms=settings.gapgpt.batch_window_ms,
+            max_items=settings.gapgpt.batch_max_items,
+        )
+    intent_cache: IntentCache | None = None
+    if settings.intent_cache.max_entries > 0:
+        intent_cache = IntentCache(
+            max_entries=settings.intent_cache.max_entries,
+            ttl_seconds=settings.intent_cache.ttl_seconds,
+            path=settings.intent_cache.path or None,
+        )
+    local_classifier: LocalIntentClassifier | None = None
+    if settings.intent_classifier.path:
+        try:
+            local_classifier = LocalIntentClassifier.load(settings.intent_classifier.path)
+            logger.info("Loaded local intent classifier (%s) labels=%s", settings.intent_classifier.path, local_classifier.labels)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Local intent classifier disabled (%s): %s", settings.intent_classifier.path, exc)
     panel_client: PanelClient | None = None
     if settings.panel.base_url and settings.panel.api_token:
         panel_client = PanelClient(
@@ -104,7 +147,10 @@ async def async_main() -> None:
             timeout=settings.timeouts.http_timeout,
             max_connections=settings.concurrency.http_max_connections,
             default_retry=settings.dialer.default_retry,
+            outbox=ReportOutbox(settings.panel.outbox_path or None, max_size=settings.panel.outbox_max),
+            report_concurrency=settings.panel.report_concurrency,
         )
+        panel_client.start()
     # Initialize multi-scenario architecture
     logger.info("Loading scenarios from %s", settings.scenarios_dir)
     scenario_registry = ScenarioRegistry(
@@ -130,9 +176,20 @@ async def async_main() -> None:
         session_manager=session_manager,
         registry=scenario_registry,
         panel_client=panel_client,
+        audio_workers=audio_workers,
+        intent_cache=intent_cache,
+        local_classifier=local_classifier,
+        llm_batcher=llm_batcher,
     )
     session_manager.scenario_handler = flow_engine
 
+    pacer: PredictivePacer | None = None
+    if settings.pacing.enabled:
+        pacer = PredictivePacer(settings.pacing, flow_engine.outbound_agent_load)
+
+    # One timer wheel for per-session deadlines (origination timeouts, ...)
+    timer_wheel = TimerWheel()
+
     # Initialize Dialer with scenario registry
     dialer = Dialer(
         settings,
@@ -140,6 +197,8 @@ async def async_main() -> None:
         session_manager,
         scenario_registry=scenario_registry,
         panel_client=panel_client,
+        pacer=pacer,
+        timers=timer_wheel,
     )
     session_manager.attach_dialer(dialer)
     flow_engine.attach_dialer(dialer)
@@ -178,7 +237,12 @@ async def async_main() -> None:
             else:
                 logger.warning("Scenario registration failed for %d scenarios", len(scenarios))
 
-    ws_client = AriWebSocketClient(settings.ari, session_manager.handle_event)
+    ws_client = AriWebSocketClient(
+        settings.ari,
+        session_manager.handle_event,
+        event_types=SessionManager.HANDLED_EVENTS,
+        ari_client=ari_client,
+    )
 
     stop_event = asyncio.Event()
     loop = asyncio.get_running_loop()
@@ -189,16 +253,29 @@ async def async_main() -> None:
             # Signals not available on some platforms (e.g., Windows).
             pass
 
-    logger.info("Starting ARI WebSocket listener and dialer")
-    tasks = [
-        asyncio.create_task(ws_client.run()),
-        asyncio.create_task(dialer.run(stop_event)),
-    ]
+    readiness = Readiness(settings.warmup.readiness_file)
+    logger.info("Starting ARI WebSocket listener")
+    tasks = [asyncio.create_task(ws_client.run())]
     try:
+        # Dialing stays gated until upstream pools are warm and the event subscription is live.
+        results = []
+        if settings.warmup.connections > 0:
+            results = await warm_up(
+                settings, ari_client, ws_client, scenario_registry,
+                stt_client, tts_client, llm_client, panel_client,
+            )
+        if readiness.mark(results):
+            logger.info("Service ready; starting dialer")
+        else:
+            logger.warning("Warm-up incomplete (%s); starting dialer anyway", readiness.snapshot()["checks"])
+        if not stop_event.is_set():
+            tasks.append(asyncio.create_task(dialer.run(stop_event)))
         await stop_event.wait()
     finally:
+        readiness.clear()
         await ws_client.stop()
         await dialer.stop()
+        await timer_wheel.stop()
         for task in tasks:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
@@ -208,8 +285,12 @@ async def async_main() -> None:
             tts_client.close(),
             llm_client.close(),
             panel_client.close() if panel_client else asyncio.sleep(0),
+            audio_workers.close() if audio_workers else asyncio.sleep(0),
+            audit_sink.close(),
             return_exceptions=True,
         )
+        if intent_cache:
+            intent_cache.close()
         logger.info("Shutdown complete")
 
 
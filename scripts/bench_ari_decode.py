@@ -0,0 +1,106 @@
+"""
+Measure ARI message decoding cost with and without early type filtering.
+
+Usage: python scripts/bench_ari_decode.py [--messages 50000] [--noise 0.6]
+
+Builds a realistic message mix (StasisStart/StasisEnd, ChannelStateChange,
+Playback*/Recording* plus a --noise share of ChannelVarset/ChannelDialplan
+events nobody handles) and times three pipelines over it: stdlib `json.loads`
+on everything, `core.ari_events.loads` (orjson/msgspec when installed) on
+everything, and the `AriWebSocketClient` path that sniffs the type first and
+decodes only events in `SessionManager.HANDLED_EVENTS`.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.ari_events import JSON_BACKEND, loads, sniff_type  # noqa: E402
+from sessions.session_manager import SessionManager  # noqa: E402
+
+
+def _channel(n: int) -> dict:
+    return {
+        "id": f"1700000000.{n}",
+        "name": f"PJSIP/trunk-{n:08x}",
+        "state": "Up",
+        "caller": {"name": "", "number": f"0912{n:07d}"},
+        "connected": {"name": "", "number": ""},
+        "dialplan": {"context": "outbound", "exten": "s", "priority": 1, "app_name": "Stasis", "app_data": "salehi"},
+        "creationtime": "2026-10-16T10:00:00.000+0330",
+        "language": "fa",
+    }
+
+
+def _messages(count: int, noise: float, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    handled = ["StasisStart", "StasisEnd", "ChannelStateChange", "PlaybackStarted", "PlaybackFinished", "RecordingFinished"]
+    messages = []
+    for i in range(count):
+        n = rng.randrange(1000)
+        if rng.random() < noise:
+            kind = rng.choice(["ChannelVarset", "ChannelDialplan"])
+            event = {"type": kind, "variable": "CDR(userfield)", "value": "x" * 16}
+        else:
+            kind = rng.choice(handled)
+            event = {"type": kind, "args": ["outbound", f"session-{n}"]}
+            if kind.startswith(("Playback", "Recording")):
+                item = "playback" if kind.startswith("Playback") else "recording"
+                event[item] = {"id": f"{item}-{n}", "target_uri": f"channel:1700000000.{n}", "state": "done"}
+        event.update({"timestamp": "2026-10-16T10:00:00.000+0330", "application": "salehi", "asterisk_id": "00:00:00:00:00:01"})
+        event["channel"] = _channel(n)
+        messages.append(json.dumps(event))
+    return messages
+
+
+def _decode_all(decode, messages: list) -> None:
+    for message in messages:
+        decode(message)
+
+
+def _sniff_then_decode(messages: list) -> None:
+    wanted = SessionManager.HANDLED_EVENTS
+    for message in messages:
+        event_type = sniff_type(message)
+        if event_type is not None and event_type not in wanted:
+            continue
+        loads(message)
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--noise", type=float, default=0.6, help="share of unhandled events")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = _messages(args.messages, args.noise)
+    print(f"messages={len(messages)} noise={args.noise:.0%} backend={JSON_BACKEND}")
+    header = f"{'pipeline':<28}{'msgs/s':>12}{'us/msg':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, fn in (
+        ("json.loads all", lambda: _decode_all(json.loads, messages)),
+        (f"{JSON_BACKEND} all", lambda: _decode_all(loads, messages)),
+        (f"sniff + {JSON_BACKEND} handled", lambda: _sniff_then_decode(messages)),
+    ):
+        elapsed = _best(fn, args.repeat)
+        print(f"{name:<28}{len(messages) / elapsed:>12,.0f}{elapsed / len(messages) * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
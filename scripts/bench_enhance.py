@@ -0,0 +1,86 @@
+"""
+Compare the in-process NumPy enhancement against the ffmpeg subprocess chain.
+
+Usage: python scripts/bench_enhance.py [--runs 20]
+
+The bundled prompts under assets/audio/*/src/*.mp3 are decoded (via ffmpeg) to
+8 kHz mono WAV, which is what Asterisk stores for recordings. Without ffmpeg a
+synthetic 8 kHz clip is used and only the NumPy path is timed.
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from stt_tts import audio_enhance  # noqa: E402
+
+
+def _decode_prompt(mp3_path: Path) -> bytes:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = Path(tmpdir) / "prompt.wav"
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", str(mp3_path), "-ac", "1", "-ar", "8000", "-c:a", "pcm_s16le", str(out)],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return out.read_bytes()
+
+
+def _synthetic_clip(seconds: float = 5.0) -> bytes:
+    import numpy as np
+
+    rate = 8000
+    t = np.arange(int(rate * seconds)) / rate
+    voiced = (t % 1.0) < 0.6
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 660 * t)
+    noise = 0.02 * np.random.default_rng(0).standard_normal(len(t))
+    return audio_enhance.encode_wav((tone * voiced + noise).astype(np.float32), rate)
+
+
+def _time(fn, audio: bytes, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(audio)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    has_ffmpeg = bool(shutil.which("ffmpeg"))
+    clips: list[tuple[str, bytes]] = []
+    if has_ffmpeg:
+        for mp3 in sorted(ROOT.glob("assets/audio/*/src/*.mp3")):
+            clips.append((f"{mp3.parent.parent.name}/{mp3.stem}", _decode_prompt(mp3)))
+    else:
+        print("ffmpeg not found: timing NumPy only on a synthetic 5 s clip\n")
+        clips.append(("synthetic-5s", _synthetic_clip()))
+
+    header = f"{'clip':<22}{'seconds':>8}{'numpy p50 ms':>14}{'ffmpeg p50 ms':>15}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, audio in clips:
+        samples, rate = audio_enhance.decode_wav(audio)
+        numpy_ms = statistics.median(_time(audio_enhance.enhance_wav, audio, args.runs))
+        ffmpeg_col, speedup_col = "n/a", "n/a"
+        if has_ffmpeg:
+            ffmpeg_ms = statistics.median(_time(audio_enhance.enhance_wav_ffmpeg, audio, args.runs))
+            ffmpeg_col = f"{ffmpeg_ms:.1f}"
+            speedup_col = f"{ffmpeg_ms / numpy_ms:.1f}x" if numpy_ms else "n/a"
+        print(f"{name:<22}{len(samples) / rate:>8.2f}{numpy_ms:>14.1f}{ffmpeg_col:>15}{speedup_col:>9}")
+
+
+if __name__ == "__main__":
+    main()
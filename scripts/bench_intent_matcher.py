@@ -0,0 +1,96 @@
+"""
+Compare the compiled IntentMatcher against the old per-token substring loops.
+
+Usage: python scripts/bench_intent_matcher.py [--runs 2000]
+
+Runs the fallback tokens of every scenario under config/scenarios, then
+synthetic token lists of growing size (real tokens padded with generated
+phrases), against a fixed set of transcripts.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.intent_matcher import IntentMatcher  # noqa: E402
+from logic.scenario_registry import ScenarioRegistry  # noqa: E402
+from utils.text_normalize import normalize_persian  # noqa: E402
+
+TRANSCRIPTS = [
+    "سلام ببخشید شما از کجا شماره منو آوردین",
+    "نه ممنون فعلا نیازی ندارم",
+    "آره حتما بفرمایید در خدمتم",
+    "الان سر کارم بعدا تماس بگیرید لطفا",
+    "قیمتش چنده و کلاس ها کجا برگزار میشه",
+    "خونه نیستم",
+]
+_LETTERS = "ابپتسجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+
+
+def _loop_match(fallback: dict, text: str) -> str:
+    """The pre-matcher FlowEngine fallback: substring loops in priority order."""
+    for intent in ("yes", "no", "number_question"):
+        for token in fallback.get(intent, []):
+            if token in text:
+                return intent
+    return "unknown"
+
+
+def _padded(fallback: dict, size: int) -> dict:
+    rng = random.Random(size)
+    groups = {intent: list(tokens) for intent, tokens in fallback.items()}
+    intents = list(groups)
+    while sum(len(tokens) for tokens in groups.values()) < size:
+        word = "".join(rng.choice(_LETTERS) for _ in range(rng.randint(4, 9)))
+        groups[rng.choice(intents)].append(f"{word} {rng.choice(_LETTERS)}{rng.choice(_LETTERS)}ز")
+    return groups
+
+
+def _time(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for text in TRANSCRIPTS:
+            fn(text)
+        samples.append((time.perf_counter() - start) * 1e6 / len(TRANSCRIPTS))
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = ScenarioRegistry(str(ROOT / "config" / "scenarios"))
+    cases = []
+    for name, scenario in registry.get_all().items():
+        cases.append((name, scenario.llm.fallback_tokens))
+    base = cases[0][1] if cases else {"yes": ["بله"], "no": ["نه"], "number_question": ["شماره"]}
+    for size in (50, 500, 5000):
+        cases.append((f"synthetic-{size}", _padded(base, size)))
+
+    # Normalization is computed once per transcript and shared with the intent-cache key.
+    normalize_us = _time(normalize_persian, args.runs)
+    normalized = {text: normalize_persian(text) for text in TRANSCRIPTS}
+    print(f"normalize_persian: {normalize_us:.1f} us per transcript (shared with the cache key)\n")
+
+    header = f"{'tokens':<18}{'count':>7}{'loop us':>10}{'matcher us':>12}{'build ms':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, groups in cases:
+        count = sum(len(tokens) for tokens in groups.values())
+        start = time.perf_counter()
+        matcher = IntentMatcher.from_fallback_tokens(groups)
+        build_ms = (time.perf_counter() - start) * 1000
+        loop_us = _time(lambda text: _loop_match(groups, text.lower()), args.runs)
+        matcher_us = _time(lambda text: matcher.match_normalized(normalized[text]), args.runs)
+        print(f"{name:<18}{count:>7}{loop_us:>10.1f}{matcher_us:>12.1f}{build_ms:>10.1f}{loop_us / matcher_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
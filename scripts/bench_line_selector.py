@@ -0,0 +1,96 @@
+"""
+Compare the heap-indexed LineSelector against the old linear line scan.
+
+Usage: python scripts/bench_line_selector.py [--ops 2000]
+
+Builds a real Dialer with N lines (10 to 2000), gives every line some load,
+then times a steady-state cycle: pick the best line, take a concurrency slot
+on it, and free a slot on another line (a call completing). The linear scan
+re-evaluates every line for each pick, as `_available_line` used to.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.dialer import Dialer  # noqa: E402
+
+
+def _dialer(lines: int) -> Dialer:
+    settings = SimpleNamespace(
+        dialer=SimpleNamespace(
+            static_contacts=[],
+            outbound_numbers=[f"0210{n:06d}" for n in range(lines)],
+            max_concurrent_calls=4,
+            max_calls_per_minute=10**6,
+            max_calls_per_day=10**6,
+            max_originations_per_second=0,
+            max_inflight_originations=8,
+        ),
+        sms=SimpleNamespace(api_key="", sender=""),
+    )
+    dialer = Dialer(settings, MagicMock(), MagicMock())
+    rng = random.Random(lines)
+    for line, stats in dialer.line_stats.items():
+        stats["active"] = rng.randint(0, 3)
+        dialer.line_selector.touch(line)
+    return dialer
+
+
+def _linear_pick(dialer: Dialer):
+    """The pre-index `_available_line`: evaluate every enabled line, keep the least loaded."""
+    best = None
+    best_load = None
+    for line in dialer.enabled_lines:
+        delay, load = dialer._line_state(line)
+        if delay != 0.0:
+            continue
+        if best_load is None or load < best_load:
+            best, best_load = line, load
+    return best
+
+
+def _run(dialer: Dialer, pick, ops: int) -> float:
+    rng = random.Random(0)
+    lines = list(dialer.line_stats)
+    samples = []
+    for _ in range(ops):
+        start = time.perf_counter()
+        line = pick()
+        if line:
+            dialer.line_stats[line]["active"] += 1
+            dialer.line_selector.touch(line)
+        freed = rng.choice(lines)
+        stats = dialer.line_stats[freed]
+        if stats["active"]:
+            stats["active"] -= 1
+            dialer.line_selector.touch(freed)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    header = f"{'lines':>7}{'linear us':>12}{'heap us':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for lines in (10, 100, 500, 1000, 2000):
+        linear_dialer = _dialer(lines)
+        linear_us = _run(linear_dialer, lambda: _linear_pick(linear_dialer), args.ops)
+        heap_dialer = _dialer(lines)
+        heap_us = _run(heap_dialer, heap_dialer._available_line, args.ops)
+        print(f"{lines:>7}{linear_us:>12.1f}{heap_us:>10.1f}{linear_us / heap_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare the rate-limiter module against the old per-line datetime deques.
+
+Usage: python scripts/bench_rate_limiter.py [--runs 200] [--per-minute 10]
+
+For each line count, every line is pre-filled with `--per-minute` recent
+attempts (the busy steady state) and we time one full scan that computes the
+next eligible time over all lines, plus a single check+record.
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from logic.rate_limiter import DailyCounter, RateLimits, SlidingWindowCounter  # noqa: E402
+
+PER_DAY = 200
+
+
+def _old_stats(per_minute: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "attempts": deque(now - timedelta(seconds=55 - i) for i in range(per_minute)),
+        "daily": per_minute,
+        "daily_marker": date.today(),
+        "last_originated_ts": time.monotonic() - 5,
+    }
+
+
+def _old_line_delay(stats: dict, per_minute: int) -> float:
+    """The pre-module dialer check: prune datetimes, then spacing/minute/day."""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(minutes=1)
+    attempts = stats["attempts"]
+    while attempts and attempts[0] < cutoff:
+        attempts.popleft()
+    if stats["daily_marker"] != date.today():
+        stats["daily_marker"] = date.today()
+        stats["daily"] = 0
+    delay = max(0.0, stats["last_originated_ts"] + 1.0 - time.monotonic())
+    if len(attempts) >= per_minute:
+        expires = attempts[len(attempts) - per_minute] + timedelta(minutes=1)
+        delay = max(delay, (expires - now).total_seconds())
+    if stats["daily"] >= PER_DAY:
+        midnight = datetime.combine(date.today() + timedelta(days=1), dtime.min)
+        delay = max(delay, (midnight - datetime.now()).total_seconds())
+    return delay
+
+
+def _old_record(stats: dict) -> None:
+    stats["attempts"].append(datetime.utcnow())
+    stats["daily"] += 1
+    stats["last_originated_ts"] = time.monotonic()
+
+
+def _new_limits(per_minute: int) -> RateLimits:
+    limits = RateLimits(
+        spacing=SlidingWindowCounter(1, 1.0),
+        minute=SlidingWindowCounter(per_minute, 60.0),
+        day=DailyCounter(PER_DAY),
+    )
+    now = time.monotonic()
+    limits["spacing"].events.append(now - 5)
+    limits["minute"].events.extend(now - 55 + i for i in range(per_minute))
+    limits["day"].used = per_minute
+    return limits
+
+
+def _time(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--per-minute", type=int, default=10)
+    args = parser.parse_args()
+    per_minute = args.per_minute
+
+    old_one, new_one = _old_stats(per_minute), _new_limits(per_minute)
+    old_check_us = _time(lambda: (_old_line_delay(old_one, per_minute), _old_record(old_one)), args.runs * 10)
+    new_check_us = _time(lambda: (new_one.delay(), new_one.record()), args.runs * 10)
+    print(f"single check+record: old {old_check_us:.2f} us, new {new_check_us:.2f} us\n")
+
+    header = f"{'lines':>7}{'old scan us':>14}{'new scan us':>14}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for lines in (10, 100, 1000):
+        old = [_old_stats(per_minute) for _ in range(lines)]
+        new = [_new_limits(per_minute) for _ in range(lines)]
+        old_us = _time(lambda: min(_old_line_delay(stats, per_minute) for stats in old), args.runs)
+        new_us = _time(lambda: min(limits.delay() for limits in new), args.runs)
+        print(f"{lines:>7}{old_us:>14.1f}{new_us:>14.1f}{old_us / new_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare session cleanup via per-session reverse indexes against the old full scan.
+
+Usage: python scripts/bench_session_cleanup.py [--rounds 200]
+
+Fills a SessionManager with N live sessions (10 to 5000), each owning two
+channels, a protocol id, four playbacks and two recordings, then times the
+registry part of `_cleanup_session` for one session: the old version scanned
+every mapping dict for entries pointing at it; `_unindex_session` removes only
+the keys the session owns. Each cleaned session is replaced so N stays flat.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sessions.session_manager import SessionManager  # noqa: E402
+
+
+async def _add_session(manager: SessionManager, n: int):
+    session = await manager.create_outbound_session(f"0912{n:07d}")
+    sid = session.session_id
+    manager._index_channel(sid, f"chan-{n}-a")
+    manager._index_channel(sid, f"chan-{n}-b")
+    await manager.register_protocol_id(sid, f"proto-{n}")
+    for k in range(4):
+        await manager.register_playback(sid, f"play-{n}-{k}")
+    for k in range(2):
+        await manager.register_recording(sid, f"rec-{n}-{k}")
+    return session
+
+
+def _scan_unindex(manager: SessionManager, session) -> None:
+    """The pre-index cleanup: scan every mapping for this session's entries."""
+    for index in (
+        manager.channel_to_session,
+        manager.playback_to_session,
+        manager.recording_to_session,
+        manager.protocol_id_to_session,
+    ):
+        for key, session_id in list(index.items()):
+            if session_id == session.session_id:
+                del index[key]
+    manager.sessions.pop(session.session_id, None)
+
+
+async def _run(sessions: int, rounds: int, unindex) -> float:
+    manager = SessionManager(MagicMock(), scenario_handler=None)
+    live = [await _add_session(manager, n) for n in range(sessions)]
+    samples = []
+    for r in range(rounds):
+        session = live[r % sessions]
+        start = time.perf_counter()
+        unindex(manager, session)
+        samples.append((time.perf_counter() - start) * 1e6)
+        live[r % sessions] = await _add_session(manager, sessions + r)
+    return statistics.median(samples)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    header = f"{'sessions':>9}{'mappings':>10}{'scan us':>10}{'index us':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for sessions in (10, 100, 1000, 5000):
+        scan_us = await _run(sessions, args.rounds, _scan_unindex)
+        index_us = await _run(sessions, args.rounds, SessionManager._unindex_session)
+        print(f"{sessions:>9}{sessions * 9:>10}{scan_us:>10.1f}{index_us:>10.1f}{scan_us / index_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Measure SessionManager event throughput under an ARI event storm.
+
+Usage: python scripts/bench_session_events.py [--sessions 1000] [--events 20] [--workers 32]
+
+Starts N outbound sessions through StasisStart (fake ARI, no-op scenario
+hooks that yield once, like real handlers), then dispatches a storm of
+ChannelStateChange, PlaybackStarted/PlaybackFinished and RecordingFinished
+events and reports events per second, twice: each event as its own task
+(raw handler throughput) and through `core.event_dispatcher.EventDispatcher`
+(ordered per channel on --workers lanes, as `AriWebSocketClient` runs it).
+Run it on two revisions to compare registry changes.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.event_dispatcher import EventDispatcher  # noqa: E402
+from sessions.session_manager import SessionManager  # noqa: E402
+
+
+class NoopScenario:
+    async def _hook(self, *args, **kwargs) -> None:
+        await asyncio.sleep(0)
+
+    on_outbound_channel_created = on_call_answered = on_playback_finished = on_recording_finished = _hook
+
+
+async def _setup(sessions: int) -> SessionManager:
+    ari = MagicMock()
+    ari.create_bridge = AsyncMock(return_value={"id": "bridge"})
+    ari.add_channel_to_bridge = AsyncMock()
+    manager = SessionManager(ari, scenario_handler=NoopScenario())
+    for n in range(sessions):
+        session = await manager.create_outbound_session(f"0912{n:07d}")
+        await manager.handle_event({
+            "type": "StasisStart",
+            "args": ["outbound", session.session_id],
+            "channel": {"id": f"chan-{n}", "state": "Ring", "caller": {}, "dialplan": {}},
+        })
+        for k in range(2):
+            await manager.register_playback(session.session_id, f"play-{n}-{k}")
+        await manager.register_recording(session.session_id, f"rec-{n}")
+    return manager
+
+
+def _events(sessions: int, per_session: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    events = []
+    for _ in range(sessions * per_session):
+        n = rng.randrange(sessions)
+        k = rng.randrange(2)
+        kind = rng.randrange(4)
+        if kind == 0:
+            events.append({"type": "ChannelStateChange", "channel": {"id": f"chan-{n}", "state": "Ringing"}})
+        elif kind == 1:
+            events.append({"type": "PlaybackStarted", "playback": {"id": f"play-{n}-{k}"}, "channel": {"id": f"chan-{n}"}})
+        elif kind == 2:
+            events.append({"type": "PlaybackFinished", "playback": {"id": f"play-{n}-{k}"}})
+        else:
+            events.append({"type": "RecordingFinished", "recording": {"name": f"rec-{n}"}})
+    return events
+
+
+async def _storm(manager: SessionManager, events: list) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(asyncio.create_task(manager.handle_event(event)) for event in events))
+    return len(events) / (time.perf_counter() - start)
+
+
+async def _dispatched_storm(dispatcher: EventDispatcher, events: list) -> float:
+    start = time.perf_counter()
+    for event in events:
+        await dispatcher.dispatch(event)
+    await dispatcher.join()
+    return len(events) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=20, help="events per session")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    manager = await _setup(args.sessions)
+    events = _events(args.sessions, args.events)
+    print(f"sessions={args.sessions} events={len(events)} repeat={args.repeat}")
+    rates = sorted([await _storm(manager, events) for _ in range(args.repeat)])
+    print(f"task per event    events/s median={rates[len(rates) // 2]:,.0f} best={rates[-1]:,.0f}")
+
+    dispatcher = EventDispatcher(manager.handle_event, workers=args.workers, queue_size=len(events))
+    rates = sorted([await _dispatched_storm(dispatcher, events) for _ in range(args.repeat)])
+    stats = dispatcher.stats()
+    await dispatcher.stop()
+    print(
+        f"dispatcher x{args.workers:<4} events/s median={rates[len(rates) // 2]:,.0f} best={rates[-1]:,.0f} "
+        f"lane high-water={stats['high_water']}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
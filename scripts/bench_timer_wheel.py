@@ -0,0 +1,86 @@
+"""
+Compare origination timeouts as sleeping tasks against the shared timer wheel.
+
+Usage: python scripts/bench_timer_wheel.py [--timers 20000] [--answered 0.8]
+
+Arms N timeouts (30 s each, as `ORIGINATION_TIMEOUT`), then cancels the
+--answered share, as answered or hung-up calls do. The old way was one
+`asyncio.Task` sleeping per origination (cancelled by hand or left to wake
+up and find nothing to do); `utils.timer_wheel.TimerWheel` keeps one driver
+task and O(1) schedule/cancel. Reports arm and cancel cost per timer and the
+tasks alive while the timers are pending.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.timer_wheel import TimerWheel  # noqa: E402
+
+TIMEOUT = 30.0
+
+
+async def _noop(session_id: str) -> None:
+    return None
+
+
+async def _sleeper(session_id: str) -> None:
+    await asyncio.sleep(TIMEOUT)
+    await _noop(session_id)
+
+
+async def _tasks(count: int, answered: int) -> tuple:
+    start = time.perf_counter()
+    tasks = {f"s{n}": asyncio.create_task(_sleeper(f"s{n}")) for n in range(count)}
+    await asyncio.sleep(0)  # let every task reach its sleep, as in production
+    armed = time.perf_counter() - start
+    alive = len(asyncio.all_tasks())
+    start = time.perf_counter()
+    for n in range(answered):
+        tasks.pop(f"s{n}").cancel()
+    await asyncio.sleep(0)
+    cancelled = time.perf_counter() - start
+    for task in tasks.values():
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return armed, cancelled, alive
+
+
+async def _wheel(count: int, answered: int) -> tuple:
+    wheel = TimerWheel()
+    start = time.perf_counter()
+    for n in range(count):
+        wheel.schedule((f"s{n}", "origination"), TIMEOUT, _noop, f"s{n}")
+    await asyncio.sleep(0)
+    armed = time.perf_counter() - start
+    alive = len(asyncio.all_tasks())
+    start = time.perf_counter()
+    for n in range(answered):
+        wheel.cancel((f"s{n}", "origination"))
+    cancelled = time.perf_counter() - start
+    await wheel.stop()
+    return armed, cancelled, alive
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timers", type=int, default=20000)
+    parser.add_argument("--answered", type=float, default=0.8, help="share cancelled before the timeout")
+    args = parser.parse_args()
+    answered = int(args.timers * args.answered)
+
+    header = f"{'mode':<14}{'arm us':>9}{'cancel us':>11}{'live tasks':>12}"
+    print(f"timers={args.timers} answered={answered}")
+    print(header)
+    print("-" * len(header))
+    for name, run in (("task per call", _tasks), ("timer wheel", _wheel)):
+        armed, cancelled, alive = await run(args.timers, answered)
+        print(f"{name:<14}{armed / args.timers * 1e6:>9.2f}{cancelled / max(answered, 1) * 1e6:>11.2f}{alive:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
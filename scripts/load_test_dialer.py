@@ -0,0 +1,164 @@
+"""
+Load-test the dialer's origination pipeline against a fake ARI server.
+
+Usage: python scripts/load_test_dialer.py [--latencies 0.01,0.05,0.1,0.2,0.4]
+       [--inflight 1,8,32] [--cps 20] [--lines 50] [--duration 5]
+
+Starts a local HTTP server that answers `POST /channels` after a fixed delay
+(the simulated ARI round-trip), points a real AriClient at it and runs the
+Dialer with an unbounded contact queue. Calls never complete, so per-line
+concurrency/minute/day caps are set high and only the 1 s per-line spacing,
+MAX_ORIGINATIONS_PER_SECOND (`--cps`) and MAX_INFLIGHT_ORIGINATIONS limit the
+rate. `--inflight 1` reproduces the old inline originate. The first
+1.5 s (token-bucket burst) are excluded from the measurement.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config.settings import AriSettings  # noqa: E402
+from core.ari_client import AriClient  # noqa: E402
+from logic.dialer import Dialer  # noqa: E402
+
+WARMUP_SECONDS = 1.5
+
+
+class FakeAri:
+    """Minimal keep-alive HTTP/1.1 server answering every request after `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.originations = 0
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/ari"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                method, path = request_line.decode("latin-1").split()[:2]
+                if method == "POST" and path.startswith("/ari/channels"):
+                    self.originations += 1
+                body = json.dumps({"id": f"chan-{self.originations}"}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+class _Sessions:
+    scenario_handler = None
+
+    def __init__(self):
+        self.count = 0
+
+    async def create_outbound_session(self, contact_number, metadata=None):
+        self.count += 1
+        return SimpleNamespace(session_id=f"load-{self.count}")
+
+    async def register_protocol_id(self, session_id, protocol_id):
+        return None
+
+    async def get_session(self, session_id):
+        return None
+
+
+async def run_case(latency: float, inflight: int, cps: float, lines: int, duration: float) -> dict:
+    ari = FakeAri(latency)
+    base_url = await ari.start()
+    ari_client = AriClient(AriSettings(base_url=base_url, ws_url="", app_name="load", username="u", password="p"))
+    settings = SimpleNamespace(
+        dialer=SimpleNamespace(
+            static_contacts=[],
+            outbound_numbers=[f"0210000{n:04d}" for n in range(lines)],
+            outbound_trunk="load",
+            default_caller_id="1000",
+            max_concurrent_calls=10**6,
+            max_calls_per_minute=10**6,
+            max_calls_per_day=10**6,
+            max_originations_per_second=cps,
+            max_inflight_originations=inflight,
+            origination_timeout=3600,
+            default_retry=60,
+        ),
+        sms=SimpleNamespace(api_key="", sender=""),
+        company="load",
+    )
+    dialer = Dialer(settings, ari_client, _Sessions())
+    await dialer.add_contacts([f"0912{n:07d}" for n in range(int((cps or lines) * duration * 2) + 10)])
+    stop = asyncio.Event()
+    runner = asyncio.create_task(dialer.run(stop))
+    # Skip the initial token-bucket burst; report the steady-state rate.
+    await asyncio.sleep(WARMUP_SECONDS)
+    baseline = ari.originations
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    completed = ari.originations - baseline
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await runner
+    await dialer.timers.stop()
+    await ari_client.close()
+    await ari.stop()
+    return {"achieved": completed / elapsed, "ceiling": min(cps or float("inf"), lines, inflight / latency)}
+
+
+async def main_async(args) -> None:
+    latencies = [float(value) for value in args.latencies.split(",")]
+    inflights = [int(value) for value in args.inflight.split(",")]
+    print(f"target cps={args.cps} lines={args.lines} duration={args.duration}s\n")
+    header = f"{'ARI ms':>8}{'inflight':>10}{'achieved cps':>14}{'ceiling':>10}"
+    print(header)
+    print("-" * len(header))
+    for latency in latencies:
+        for inflight in inflights:
+            result = await run_case(latency, inflight, args.cps, args.lines, args.duration)
+            print(f"{latency * 1000:>8.0f}{inflight:>10}{result['achieved']:>14.1f}{result['ceiling']:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latencies", default="0.01,0.05,0.1,0.2,0.4", help="Comma-separated ARI delays in seconds")
+    parser.add_argument("--inflight", default="1,8,32", help="Comma-separated MAX_INFLIGHT_ORIGINATIONS values")
+    parser.add_argument("--cps", type=float, default=20.0, help="MAX_ORIGINATIONS_PER_SECOND")
+    parser.add_argument("--lines", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Train the local intent classifier from transcript logs and report accuracy/latency.
+
+Usage:
+    python scripts/train_intent_classifier.py [--logs logs] [--out models/intent_classifier.npz]
+    python scripts/train_intent_classifier.py --report-only [--model models/intent_classifier.npz]
+
+Training holds out ~20% of distinct transcripts (by hash) for the report; the
+saved model is then refit on everything. --report-only evaluates an existing
+model against all logged transcripts. Point INTENT_CLASSIFIER_PATH at the
+output and set `llm.local_threshold` per scenario to enable the tier.
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from llm.local_classifier import (  # noqa: E402
+    LocalIntentClassifier,
+    evaluate,
+    load_labeled_logs,
+    split_holdout,
+)
+
+
+def _print_report(title: str, report: dict) -> None:
+    print(f"\n{title}: {report['samples']} transcripts")
+    if not report["samples"]:
+        return
+    print(f"overall accuracy {report['accuracy']:.3f}; "
+          f"predict p50 {report['latency_us_p50']:.0f} us, p99 {report['latency_us_p99']:.0f} us")
+    header = f"{'threshold':>10}{'local share':>13}{'local accuracy':>16}"
+    print(header)
+    print("-" * len(header))
+    for threshold, row in report["thresholds"].items():
+        accuracy = "n/a" if row["accuracy"] is None else f"{row['accuracy']:.3f}"
+        print(f"{threshold:>10.2f}{row['coverage']:>13.1%}{accuracy:>16}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", default=str(ROOT / "logs"))
+    parser.add_argument("--out", default=str(ROOT / "models" / "intent_classifier.npz"))
+    parser.add_argument("--model", help="model to evaluate with --report-only (default: --out)")
+    parser.add_argument("--report-only", action="store_true")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--max-features", type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = load_labeled_logs(args.logs)
+    print(f"Loaded {len(samples)} labeled transcripts from {args.logs}: {dict(Counter(l for _, l in samples))}")
+    if not samples:
+        sys.exit("No transcripts found; nothing to train on.")
+
+    if args.report_only:
+        model = LocalIntentClassifier.load(args.model or args.out)
+        _print_report("All logged transcripts", evaluate(model, samples))
+        return
+
+    train, test = split_holdout(samples, args.holdout)
+    if test and len({label for _, label in train}) > 1:
+        start = time.perf_counter()
+        model = LocalIntentClassifier(max_features=args.max_features).fit(train, epochs=args.epochs)
+        print(f"Trained on {len(train)} in {time.perf_counter() - start:.1f} s")
+        _print_report("Held-out transcripts", evaluate(model, test))
+
+    model = LocalIntentClassifier(max_features=args.max_features).fit(samples, epochs=args.epochs)
+    model.save(args.out)
+    print(f"\nSaved model ({len(model.vocab)} features, labels {model.labels}) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -56,6 +56,12 @@ class Session:
     responses: List[Dict[str, str]] = field(default_factory=list)
     result: Optional[str] = None
     processed_recordings: Set[str] = field(default_factory=set)
+    # Reverse index of SessionManager lookup keys owned by this session, so cleanup
+    # only touches its own entries.
+    channel_keys: Set[str] = field(default_factory=set, repr=False, compare=False)
+    playback_keys: Set[str] = field(default_factory=set, repr=False, compare=False)
+    recording_keys: Set[str] = field(default_factory=set, repr=False, compare=False)
+    protocol_keys: Set[str] = field(default_factory=set, repr=False, compare=False)
     lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
 
     def add_channel(self, channel_id: str) -> None:
@@ -25,6 +25,12 @@ logger = logging.getLogger(__name__)
 class SessionManager:
     """
     Manages sessions, bridges, and routing of ARI events into scenario logic.
+
+    The registry dicts (`sessions`, `*_to_session`, `waiting_inbound`) are only
+    touched from the event loop in sections without an `await`, so reads and
+    updates need no lock. Per-session state is guarded by `Session.lock`; the
+    waiting-inbound promotion, which spans an await on the dialer, holds a
+    per-line lock from `_waiting_lock`.
     """
 
     def __init__(
@@ -44,7 +50,6 @@ class SessionManager:
         self.recording_to_session: Dict[str, str] = {}
         # Track pre-Stasis channels by protocol_id (for early failure detection)
         self.protocol_id_to_session: Dict[str, str] = {}
-        self.lock = asyncio.Lock()
         # Inbound is allowed for all; we keep the set for mapping/priority.
         self.inbound_lines = [self._normalize_number(n) for n in (allowed_inbound_numbers or []) if n]
         self.allowed_inbound_numbers = {norm for norm in self.inbound_lines if norm}
@@ -54,6 +59,7 @@ class SessionManager:
         self._ensure_hangup_log_handler()
         self.dialer = None
         self.waiting_inbound: Dict[str, Deque[Tuple[str, str]]] = {}
+        self.waiting_locks: Dict[str, asyncio.Lock] = {}
 
     def update_inbound_lines(self, lines: list[str]) -> None:
         """
@@ -91,62 +97,84 @@ class SessionManager:
         session = Session(session_id=session_id, metadata={"contact_number": contact_number})
         if metadata:
             session.metadata.update(metadata)
-        async with self.lock:
-            self.sessions[session_id] = session
+        self.sessions[session_id] = session
         logger.info("Created outbound session %s for %s", session_id, contact_number)
         return session
 
     async def get_session(self, session_id: str) -> Optional[Session]:
-        async with self.lock:
-            return self.sessions.get(session_id)
+        return self.sessions.get(session_id)
+
+    def _map_key(self, index: Dict[str, str], keys_attr: str, key: str, session_id: str) -> None:
+        """Point `key` at `session_id` in `index` and in the owning session's key set; do not await between lookup and update."""
+        previous = index.get(key)
+        if previous and previous != session_id:
+            owner = self.sessions.get(previous)
+            if owner:
+                getattr(owner, keys_attr).discard(key)
+        index[key] = session_id
+        session = self.sessions.get(session_id)
+        if session:
+            getattr(session, keys_attr).add(key)
+
+    def _unindex_session(self, session: Session) -> None:
+        """Drop the session and every lookup key it owns; do not await between lookup and update."""
+        for index, keys in (
+            (self.channel_to_session, session.channel_keys),
+            (self.playback_to_session, session.playback_keys),
+            (self.recording_to_session, session.recording_keys),
+            (self.protocol_id_to_session, session.protocol_keys),
+        ):
+            for key in keys:
+                if index.get(key) == session.session_id:
+                    del index[key]
+            keys.clear()
+        self.sessions.pop(session.session_id, None)
 
-    async def _index_channel(self, session_id: str, channel_id: str) -> None:
-        async with self.lock:
-            self.channel_to_session[channel_id] = session_id
+    def _index_channel(self, session_id: str, channel_id: str) -> None:
+        self._map_key(self.channel_to_session, "channel_keys", channel_id, session_id)
 
     async def register_protocol_id(self, session_id: str, protocol_id: str) -> None:
         """Register protocol_id for early failure detection before channel enters Stasis."""
-        async with self.lock:
-            self.protocol_id_to_session[protocol_id] = session_id
+        self._map_key(self.protocol_id_to_session, "protocol_keys", protocol_id, session_id)
         logger.debug("Registered protocol_id=%s for session=%s", protocol_id, session_id)
 
-    async def _get_session_by_channel(self, channel_id: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.channel_to_session.get(channel_id)
-            if session_id:
-                return self.sessions.get(session_id)
+    def _get_session_by_channel(self, channel_id: str) -> Optional[Session]:
+        session_id = self.channel_to_session.get(channel_id)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
+    # ARI event type -> handler. Other types are ignored; AriWebSocketClient drops
+    # them before decoding and subscribes to only these via the app event filter.
+    EVENT_HANDLERS = {
+        "StasisStart": "_handle_stasis_start",
+        "ChannelStateChange": "_handle_channel_state_change",
+        "ChannelHangupRequest": "_handle_hangup_request",
+        "ChannelDestroyed": "_handle_channel_destroyed",
+        "PlaybackStarted": "_handle_playback_started",
+        "PlaybackFinished": "_handle_playback_finished",
+        "RecordingFinished": "_handle_recording_finished",
+        "RecordingFailed": "_handle_recording_failed",
+        "StasisEnd": "_handle_stasis_end",
+        # Visibility into pre-Stasis dial failures (cause/dialstatus may appear here).
+        "Dial": "_handle_dial_event",
+    }
+    HANDLED_EVENTS = frozenset(EVENT_HANDLERS)
+
     async def handle_event(self, event: dict) -> None:
         event_type = event.get("type")
         if not event_type:
             return
-
-        if event_type == "StasisStart":
-            await self._handle_stasis_start(event)
-        elif event_type == "ChannelStateChange":
-            await self._handle_channel_state_change(event)
-        elif event_type == "ChannelHangupRequest":
-            if not (event.get("channel") or {}).get("id") in self.channel_to_session:
-                logger.debug("HangupRequest before session map: %s", event)
-            await self._handle_hangup(event)
-        elif event_type == "ChannelDestroyed":
-            await self._handle_channel_destroyed(event)
-        elif event_type == "PlaybackStarted":
-            await self._handle_playback_started(event)
-        elif event_type == "PlaybackFinished":
-            await self._handle_playback_finished(event)
-        elif event_type == "RecordingFinished":
-            await self._handle_recording_finished(event)
-        elif event_type == "RecordingFailed":
-            await self._handle_recording_failed(event)
-        elif event_type == "StasisEnd":
-            await self._handle_stasis_end(event)
-        elif event_type == "Dial":
-            # Visibility into pre-Stasis dial failures (cause/dialstatus may appear here).
-            await self._handle_dial_event(event)
-        else:
+        handler = self.EVENT_HANDLERS.get(event_type)
+        if not handler:
             logger.debug("Unhandled event type: %s", event_type)
+            return
+        await getattr(self, handler)(event)
+
+    async def _handle_hangup_request(self, event: dict) -> None:
+        if not (event.get("channel") or {}).get("id") in self.channel_to_session:
+            logger.debug("HangupRequest before session map: %s", event)
+        await self._handle_hangup(event)
 
     async def _ensure_bridge(self, session: Session) -> None:
         async with session.lock:
@@ -164,15 +192,17 @@ class SessionManager:
         channel_id = channel.get("id")
         channel_state = channel.get("state")
         args = event.get("args", [])
+        if self._is_media_helper(channel, args):
+            # Snoop/externalMedia legs of a streaming capture are owned by FlowEngine.
+            return
         direction = self._detect_direction(args)
 
         if direction == LegDirection.OUTBOUND and len(args) >= 2:
             session_id = args[1]
-            session = await self.get_session(session_id)
+            session = self.sessions.get(session_id)
             if not session:
                 session = Session(session_id=session_id)
-                async with self.lock:
-                    self.sessions[session_id] = session
+                self.sessions[session_id] = session
             async with session.lock:
                 session.outbound_leg = CallLeg(
                     channel_id=channel_id,
@@ -180,7 +210,7 @@ class SessionManager:
                     endpoint=session.metadata.get("contact_number", "unknown"),
                 )
                 session.status = SessionStatus.RINGING
-            await self._index_channel(session_id, channel_id)
+            self._index_channel(session_id, channel_id)
             await self._ensure_bridge(session)
             if session.bridge and channel_id:
                 await self.ari_client.add_channel_to_bridge(session.bridge.bridge_id, channel_id)
@@ -193,7 +223,7 @@ class SessionManager:
         elif direction == LegDirection.OPERATOR and len(args) >= 2:
             session_id = args[1]
             endpoint = args[2] if len(args) >= 3 else "operator"
-            session = await self.get_session(session_id)
+            session = self.sessions.get(session_id)
             if not session:
                 # Customer leg is already gone; tear down this orphan operator leg.
                 logger.info("Operator leg %s has no session %s; hanging up", channel_id, session_id)
@@ -209,7 +239,7 @@ class SessionManager:
                     endpoint=endpoint,
                 )
                 session.status = SessionStatus.RINGING
-            await self._index_channel(session_id, channel_id)
+            self._index_channel(session_id, channel_id)
             await self._ensure_bridge(session)
             if session.bridge and channel_id:
                 await self.ari_client.add_channel_to_bridge(session.bridge.bridge_id, channel_id)
@@ -274,15 +304,14 @@ class SessionManager:
                         logger.debug("Assigned inbound scenario '%s' to session %s", scenario_name, session_id)
 
                 caller_num = session.metadata.get("caller_number")
-            async with self.lock:
-                self.sessions[session_id] = session
+            self.sessions[session_id] = session
             await self._update_contact_number(session, caller_num)
-            await self._index_channel(session_id, channel_id)
+            self._index_channel(session_id, channel_id)
             await self._ensure_bridge(session)
             if session.bridge and channel_id:
                 await self.ari_client.add_channel_to_bridge(session.bridge.bridge_id, channel_id)
             if waiting_for_slot:
-                await self._queue_waiting_inbound(inbound_line, session_id, channel_id)
+                self._queue_waiting_inbound(inbound_line, session_id, channel_id)
                 return
             await self._accept_inbound(session, channel_id, channel_state)
 
@@ -290,7 +319,7 @@ class SessionManager:
         channel = event.get("channel", {})
         channel_id = channel.get("id")
         channel_state = channel.get("state")
-        session = await self._get_session_by_channel(channel_id)
+        session = self._get_session_by_channel(channel_id)
         if not session:
             logger.info("Channel state change for unknown channel %s payload=%s", channel_id, event)
             return
@@ -312,8 +341,11 @@ class SessionManager:
                 if leg.direction == LegDirection.OPERATOR:
                     session.result = session.result or "failed:operator_failed"
 
-        if channel_state == "Up" and self.scenario_handler:
-            await self.scenario_handler.on_call_answered(session, leg)
+        if channel_state == "Up":
+            if self.dialer:
+                self.dialer.on_call_answered(session.session_id)
+            if self.scenario_handler:
+                await self.scenario_handler.on_call_answered(session, leg)
         elif channel_state in {"Busy", "Failed"} and self.scenario_handler:
             await self.scenario_handler.on_call_failed(session, reason=channel_state)
         else:
@@ -341,14 +373,13 @@ class SessionManager:
         cause_txt = event.get("cause_txt") or channel.get("cause_txt")
 
         # Try to find session by channel_id first
-        session = await self._get_session_by_channel(channel_id)
+        session = self._get_session_by_channel(channel_id)
 
         # If not found and we have protocol_id, try to find via protocol_id mapping
         if not session and protocol_id:
-            async with self.lock:
-                session_id = self.protocol_id_to_session.get(protocol_id)
+            session_id = self.protocol_id_to_session.get(protocol_id)
             if session_id:
-                session = await self.get_session(session_id)
+                session = self.sessions.get(session_id)
                 if session:
                     logger.info("Matched pre-Stasis hangup via protocol_id=%s to session=%s cause=%s",
                                protocol_id, session_id, cause)
@@ -424,7 +455,7 @@ class SessionManager:
     async def _handle_channel_destroyed(self, event: dict) -> None:
         channel = event.get("channel", {})
         channel_id = channel.get("id")
-        session = await self._get_session_by_channel(channel_id)
+        session = self._get_session_by_channel(channel_id)
         if not session:
             return
         leg = self._find_leg(session, channel_id)
@@ -439,9 +470,9 @@ class SessionManager:
         playback_id = playback.get("id")
         channel = event.get("channel", {})
         channel_id = channel.get("id")
-        session = await self._get_session_by_channel(channel_id) if channel_id else None
+        session = self._get_session_by_channel(channel_id) if channel_id else None
         if not session and playback_id:
-            session = await self._get_session_by_playback(playback_id)
+            session = self._get_session_by_playback(playback_id)
         if not session or not self.scenario_handler:
             return
         await self.scenario_handler.on_playback_finished(session, playback_id)
@@ -452,11 +483,10 @@ class SessionManager:
         channel = event.get("channel", {})
         channel_id = channel.get("id")
         if playback_id and channel_id:
-            async with self.lock:
-                if playback_id not in self.playback_to_session:
-                    session_id = self.channel_to_session.get(channel_id)
-                    if session_id:
-                        self.playback_to_session[playback_id] = session_id
+            if playback_id not in self.playback_to_session:
+                session_id = self.channel_to_session.get(channel_id)
+                if session_id:
+                    self._map_key(self.playback_to_session, "playback_keys", playback_id, session_id)
 
     async def _handle_dial_event(self, event: dict) -> None:
         """
@@ -478,13 +508,12 @@ class SessionManager:
             phone_number = dialstring.split("@")[0]
 
             # Search through active sessions for matching contact_number
-            async with self.lock:
-                for sid, session in self.sessions.items():
-                    contact_num = session.metadata.get("contact_number", "")
-                    # Match phone number (handle potential formatting differences)
-                    if contact_num and phone_number in contact_num:
-                        session_id = sid
-                        break
+            for sid, session in self.sessions.items():
+                contact_num = session.metadata.get("contact_number", "")
+                # Match phone number (handle potential formatting differences)
+                if contact_num and phone_number in contact_num:
+                    session_id = sid
+                    break
 
         if not session_id:
             logger.debug("Dial event without matching session: dialstring=%s phone=%s",
@@ -493,11 +522,9 @@ class SessionManager:
 
         # Also register the peer channel's protocol_id and id for hangup tracking
         if peer_protocol_id:
-            async with self.lock:
-                self.protocol_id_to_session[peer_protocol_id] = session_id
+            self._map_key(self.protocol_id_to_session, "protocol_keys", peer_protocol_id, session_id)
         if peer_id:
-            async with self.lock:
-                self.channel_to_session[peer_id] = session_id
+            self._map_key(self.channel_to_session, "channel_keys", peer_id, session_id)
 
         # NOTE: We cannot capture early cause codes from PROGRESS events because
         # ARI does not expose the SIP Reason header (cause=1,17,20,etc) in Dial events.
@@ -506,7 +533,7 @@ class SessionManager:
 
         # Check for failure dialstatus
         if dialstatus in {"BUSY", "NOANSWER", "CONGESTION", "CHANUNAVAIL"}:
-            session = await self.get_session(session_id)
+            session = self.sessions.get(session_id)
             if session:
                 # Extract SIP cause code from Reason header if present
                 cause = peer.get("cause")
@@ -539,7 +566,7 @@ class SessionManager:
     async def _handle_stasis_end(self, event: dict) -> None:
         channel = event.get("channel", {})
         channel_id = channel.get("id")
-        session = await self._get_session_by_channel(channel_id)
+        session = self._get_session_by_channel(channel_id)
         if session:
             await self._cleanup_session(session)
 
@@ -570,23 +597,10 @@ class SessionManager:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
-        async with self.lock:
-            for channel_id, session_id in list(self.channel_to_session.items()):
-                if session_id == session.session_id:
-                    del self.channel_to_session[channel_id]
-            for playback_id, session_id in list(self.playback_to_session.items()):
-                if session_id == session.session_id:
-                    del self.playback_to_session[playback_id]
-            for recording_name, session_id in list(self.recording_to_session.items()):
-                if session_id == session.session_id:
-                    del self.recording_to_session[recording_name]
-            for protocol_id, session_id in list(self.protocol_id_to_session.items()):
-                if session_id == session.session_id:
-                    del self.protocol_id_to_session[protocol_id]
-            self.sessions.pop(session.session_id, None)
+        self._unindex_session(session)
 
         # If this session was waiting for capacity, clear its marker.
-        waiting_line = await self._remove_from_waiting(session.session_id)
+        waiting_line = self._remove_from_waiting(session.session_id)
         if waiting_line and self.dialer:
             await self.dialer.cancel_waiting_inbound(waiting_line)
 
@@ -619,16 +633,14 @@ class SessionManager:
         logger.info("Cleaned session %s", session.session_id)
 
     async def active_sessions_count(self) -> int:
-        async with self.lock:
-            return len(self.sessions)
+        return len(self.sessions)
 
     async def inbound_active_count(self) -> int:
         """
         Count inbound sessions that are still ringing or active.
         Used to share concurrency limits with outbound calls.
         """
-        async with self.lock:
-            sessions = list(self.sessions.values())
+        sessions = list(self.sessions.values())
         active_states = {SessionStatus.RINGING, SessionStatus.ACTIVE}
         return sum(
             1
@@ -647,6 +659,12 @@ class SessionManager:
             return LegDirection.OPERATOR
         return LegDirection.INBOUND
 
+    @staticmethod
+    def _is_media_helper(channel: dict, args: list) -> bool:
+        if args and args[0] == "stream":
+            return True
+        return (channel.get("name") or "").startswith("UnicastRTP/")
+
     def attach_dialer(self, dialer) -> None:
         """
         Provide dialer access so inbound calls can share per-line concurrency with outbound.
@@ -697,10 +715,9 @@ class SessionManager:
                 if pai:
                     session.metadata["p_asserted_identity"] = pai
 
-    async def _queue_waiting_inbound(self, line: str, session_id: str, channel_id: str) -> None:
-        async with self.lock:
-            queue = self.waiting_inbound.setdefault(line, deque())
-            queue.append((session_id, channel_id))
+    def _queue_waiting_inbound(self, line: str, session_id: str, channel_id: str) -> None:
+        queue = self.waiting_inbound.setdefault(line, deque())
+        queue.append((session_id, channel_id))
 
     async def _get_header(self, channel_id: str, name: str) -> Optional[str]:
         """
@@ -710,41 +727,47 @@ class SessionManager:
             channel_id, f"PJSIP_HEADER(read,{name})"
         )
 
-    async def _remove_from_waiting(self, session_id: str) -> Optional[str]:
-        async with self.lock:
-            for line, queue in list(self.waiting_inbound.items()):
-                for sid, ch_id in list(queue):
-                    if sid == session_id:
-                        try:
-                            queue.remove((sid, ch_id))
-                        except ValueError:
-                            pass
-                        if not queue:
-                            del self.waiting_inbound[line]
-                        return line
+    def _remove_from_waiting(self, session_id: str) -> Optional[str]:
+        for line, queue in list(self.waiting_inbound.items()):
+            for sid, ch_id in list(queue):
+                if sid == session_id:
+                    try:
+                        queue.remove((sid, ch_id))
+                    except ValueError:
+                        pass
+                    if not queue:
+                        del self.waiting_inbound[line]
+                    return line
         return None
 
+    def _waiting_lock(self, line: str) -> asyncio.Lock:
+        lock = self.waiting_locks.get(line)
+        if lock is None:
+            lock = self.waiting_locks[line] = asyncio.Lock()
+        return lock
+
     async def _try_start_waiting_inbound(self, line: str) -> None:
         if not self.dialer:
             return
         while True:
-            async with self.lock:
+            # Peek, promote and pop as one step per line, so two hangups on the
+            # same line cannot both promote the head of the queue.
+            async with self._waiting_lock(line):
                 queue = self.waiting_inbound.get(line)
                 item: Optional[Tuple[str, str]] = queue[0] if queue else None
-            if not item:
-                return
-            session_id, channel_id = item
-            promoted = await self.dialer.try_register_waiting_inbound(session_id, line)
-            if not promoted:
-                # Still full; keep waiting.
-                return
-            async with self.lock:
+                if not item:
+                    return
+                session_id, channel_id = item
+                promoted = await self.dialer.try_register_waiting_inbound(session_id, line)
+                if not promoted:
+                    # Still full; keep waiting.
+                    return
                 queue = self.waiting_inbound.get(line)
-                if queue and queue and queue[0][0] == session_id:
+                if queue and queue[0][0] == session_id:
                     queue.popleft()
                     if not queue:
                         del self.waiting_inbound[line]
-            session = await self.get_session(session_id)
+            session = self.sessions.get(session_id)
             if not session:
                 # Session gone; try next if any.
                 await self.dialer.on_session_completed(session_id)
@@ -835,29 +858,27 @@ class SessionManager:
             async with session.lock:
                 leg.state = LegState.ANSWERED
                 session.status = SessionStatus.ACTIVE
+            if self.dialer:
+                self.dialer.on_call_answered(session.session_id)
             if self.scenario_handler:
                 await self.scenario_handler.on_call_answered(session, leg)
 
     async def register_playback(self, session_id: str, playback_id: str) -> None:
-        async with self.lock:
-            self.playback_to_session[playback_id] = session_id
+        self._map_key(self.playback_to_session, "playback_keys", playback_id, session_id)
 
-    async def _get_session_by_playback(self, playback_id: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.playback_to_session.get(playback_id)
-            if session_id:
-                return self.sessions.get(session_id)
+    def _get_session_by_playback(self, playback_id: str) -> Optional[Session]:
+        session_id = self.playback_to_session.get(playback_id)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
     async def register_recording(self, session_id: str, recording_name: str) -> None:
-        async with self.lock:
-            self.recording_to_session[recording_name] = session_id
+        self._map_key(self.recording_to_session, "recording_keys", recording_name, session_id)
 
-    async def _get_session_by_recording(self, recording_name: str) -> Optional[Session]:
-        async with self.lock:
-            session_id = self.recording_to_session.get(recording_name)
-            if session_id:
-                return self.sessions.get(session_id)
+    def _get_session_by_recording(self, recording_name: str) -> Optional[Session]:
+        session_id = self.recording_to_session.get(recording_name)
+        if session_id:
+            return self.sessions.get(session_id)
         return None
 
     async def _handle_recording_finished(self, event: dict) -> None:
@@ -865,9 +886,9 @@ class SessionManager:
         recording_name = recording.get("name")
         channel = event.get("channel", {})
         channel_id = channel.get("id")
-        session = await self._get_session_by_channel(channel_id) if channel_id else None
+        session = self._get_session_by_channel(channel_id) if channel_id else None
         if not session and recording_name:
-            session = await self._get_session_by_recording(recording_name)
+            session = self._get_session_by_recording(recording_name)
         if session and self.scenario_handler and hasattr(self.scenario_handler, "on_recording_finished"):
             await self.scenario_handler.on_recording_finished(session, recording_name)
 
@@ -877,8 +898,8 @@ class SessionManager:
         cause = recording.get("cause", "unknown")
         channel = event.get("channel", {})
         channel_id = channel.get("id")
-        session = await self._get_session_by_channel(channel_id) if channel_id else None
+        session = self._get_session_by_channel(channel_id) if channel_id else None
         if not session and recording_name:
-            session = await self._get_session_by_recording(recording_name)
+            session = self._get_session_by_recording(recording_name)
         if session and self.scenario_handler and hasattr(self.scenario_handler, "on_recording_failed"):
             await self.scenario_handler.on_recording_failed(session, recording_name, cause)
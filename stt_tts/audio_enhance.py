@@ -0,0 +1,281 @@
+"""
+In-memory audio enhancement for STT uploads.
+
+NumPy port of the former ffmpeg chain
+`highpass=f=120,lowpass=f=3800,afftdn=nf=-25,loudnorm=I=-19:TP=-2:LRA=8`:
+biquad high/low-pass, spectral-subtraction denoise and one-pass RMS/peak
+normalization, working directly on the WAV bytes fetched from ARI.
+The ffmpeg chain is kept as a fallback backend.
+"""
+import audioop
+import io
+import logging
+import subprocess
+import tempfile
+import wave
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+    NUMPY_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+TARGET_RATE = 16000
+HIGHPASS_HZ = 120.0
+LOWPASS_HZ = 3800.0
+# Spectral subtraction: never attenuate a bin by more than this.
+MAX_REDUCTION_DB = 12.0
+# Percentile of per-bin magnitude over time used as the stationary noise estimate.
+NOISE_PERCENTILE = 10.0
+TARGET_RMS_DBFS = -19.0
+PEAK_DBFS = -2.0
+MAX_GAIN_DB = 20.0
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is not installed")
+
+
+def decode_wav(audio_bytes: bytes) -> Tuple["np.ndarray", int]:
+    """Decode PCM WAV bytes into mono float32 samples in [-1, 1] and the sample rate."""
+    _require_numpy()
+    with wave.open(io.BytesIO(audio_bytes), "rb") as w:
+        channels = w.getnchannels()
+        sampwidth = w.getsampwidth()
+        rate = w.getframerate()
+        raw = w.readframes(w.getnframes())
+    if sampwidth == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sampwidth == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sampwidth == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sampwidth}")
+    if channels > 1:
+        usable = len(samples) - len(samples) % channels
+        samples = samples[:usable].reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def encode_wav(samples: "np.ndarray", rate: int) -> bytes:
+    """Encode float samples as 16-bit mono PCM WAV bytes."""
+    _require_numpy()
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def resample(samples: "np.ndarray", src_rate: int, dst_rate: int) -> "np.ndarray":
+    """Band-limited FFT resampling (zero-pads or truncates the spectrum)."""
+    _require_numpy()
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    spectrum = np.fft.rfft(samples)
+    bins_out = n_out // 2 + 1
+    if bins_out <= len(spectrum):
+        spectrum = spectrum[:bins_out]
+    else:
+        spectrum = np.concatenate([spectrum, np.zeros(bins_out - len(spectrum), dtype=spectrum.dtype)])
+    out = np.fft.irfft(spectrum, n_out) * (n_out / len(samples))
+    return out.astype(np.float32)
+
+
+def biquad_coefficients(kind: str, freq: float, rate: int, q: float = 0.7071) -> Tuple[Tuple[float, float, float], Tuple[float, float]]:
+    """
+    RBJ audio-EQ-cookbook biquad coefficients for "highpass"/"lowpass".
+    Returns normalized (b0, b1, b2), (a1, a2).
+    """
+    _require_numpy()
+    w0 = 2.0 * np.pi * freq / rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2.0 * q)
+    if kind == "highpass":
+        b = ((1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2)
+    elif kind == "lowpass":
+        b = ((1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2)
+    else:
+        raise ValueError(f"Unsupported biquad kind: {kind}")
+    a0 = 1 + alpha
+    a = (-2 * cos_w0, 1 - alpha)
+    return (b[0] / a0, b[1] / a0, b[2] / a0), (a[0] / a0, a[1] / a0)
+
+
+def apply_biquads(samples: "np.ndarray", rate: int, filters: list) -> "np.ndarray":
+    """
+    Apply a cascade of biquads as one FFT multiply by their combined transfer
+    function. The signal is zero-padded so the IIR tail does not wrap around.
+    """
+    _require_numpy()
+    if len(samples) == 0 or not filters:
+        return samples
+    n = len(samples)
+    n_fft = 1 << int(np.ceil(np.log2(n + rate // 10)))
+    z1 = np.exp(-1j * np.pi * np.arange(n_fft // 2 + 1) / (n_fft // 2))
+    z2 = z1 * z1
+    response = np.ones(n_fft // 2 + 1, dtype=np.complex128)
+    for kind, freq in filters:
+        if freq <= 0 or freq >= rate / 2:
+            continue
+        (b0, b1, b2), (a1, a2) = biquad_coefficients(kind, freq, rate)
+        response *= (b0 + b1 * z1 + b2 * z2) / (1 + a1 * z1 + a2 * z2)
+    out = np.fft.irfft(np.fft.rfft(samples, n_fft) * response, n_fft)[:n]
+    return out.astype(np.float32)
+
+
+def spectral_subtract(
+    samples: "np.ndarray",
+    rate: int,
+    max_reduction_db: float = MAX_REDUCTION_DB,
+    noise_percentile: float = NOISE_PERCENTILE,
+) -> "np.ndarray":
+    """
+    Stationary-noise spectral subtraction over a sqrt-Hann STFT (50% overlap).
+    The noise profile is a low percentile of each bin over the whole clip, so
+    nothing is trimmed from the start of the call.
+    """
+    _require_numpy()
+    frame = 512 if rate >= 16000 else 256
+    hop = frame // 2
+    if len(samples) < frame * 2:
+        return samples
+    pad = (-(len(samples) - frame) % hop) + hop
+    padded = np.concatenate([np.zeros(hop, dtype=np.float32), samples, np.zeros(pad, dtype=np.float32)])
+    window = np.sqrt(np.hanning(frame + 1)[:-1]).astype(np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame)[::hop] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+    magnitude = np.abs(spectrum)
+    noise = np.percentile(magnitude, noise_percentile, axis=0)
+    floor = 10 ** (-max_reduction_db / 20.0)
+    gain = np.maximum(1.0 - noise / np.maximum(magnitude, 1e-9), floor)
+    cleaned = np.fft.irfft(spectrum * gain, frame, axis=1) * window
+    # Overlap-add: with a 50% hop each output block is the tail of one frame plus the head of the next.
+    n_frames = cleaned.shape[0]
+    out = np.zeros((n_frames + 1, hop), dtype=np.float32)
+    out[:-1] += cleaned[:, :hop]
+    out[1:] += cleaned[:, hop:]
+    return out.ravel()[hop:hop + len(samples)]
+
+
+def normalize(
+    samples: "np.ndarray",
+    target_rms_dbfs: float = TARGET_RMS_DBFS,
+    peak_dbfs: float = PEAK_DBFS,
+    max_gain_db: float = MAX_GAIN_DB,
+) -> "np.ndarray":
+    """One-pass gain toward a target RMS, capped by the peak ceiling and a max boost."""
+    _require_numpy()
+    if len(samples) == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = float(np.max(np.abs(samples)))
+    if rms <= 1e-9 or peak <= 1e-9:
+        return samples
+    gain = 10 ** (target_rms_dbfs / 20.0) / rms
+    gain = min(gain, 10 ** (peak_dbfs / 20.0) / peak, 10 ** (max_gain_db / 20.0))
+    return (samples * gain).astype(np.float32)
+
+
+def enhance_samples(samples: "np.ndarray", rate: int, target_rate: int = TARGET_RATE) -> "np.ndarray":
+    samples = resample(samples, rate, target_rate)
+    samples = apply_biquads(samples, target_rate, [("highpass", HIGHPASS_HZ), ("lowpass", LOWPASS_HZ)])
+    samples = spectral_subtract(samples, target_rate)
+    return normalize(samples)
+
+
+def enhance_wav(audio_bytes: bytes, target_rate: int = TARGET_RATE) -> bytes:
+    """Full enhancement pipeline: WAV bytes in, 16 kHz mono 16-bit WAV bytes out."""
+    samples, rate = decode_wav(audio_bytes)
+    return encode_wav(enhance_samples(samples, rate, target_rate), target_rate)
+
+
+def is_empty_wav(audio_bytes: bytes) -> bool:
+    """Empty/too-short audio (<800 bytes, <0.1 s or normalized RMS <0.001) counts as caller hangup."""
+    if not audio_bytes or len(audio_bytes) < 800:
+        return True
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as w:
+            frames = w.getnframes()
+            rate = w.getframerate()
+            sampwidth = w.getsampwidth() or 2
+            data = w.readframes(frames)
+        duration = frames / rate if rate else 0
+        rms = audioop.rms(data, sampwidth) if frames else 0
+        max_amp = 2 ** (8 * sampwidth - 1)
+        norm = rms / max_amp if max_amp else 0
+        return duration < 0.1 or norm < 0.001
+    except Exception:
+        return False
+
+
+def enhance_wav_ffmpeg(audio_bytes: bytes) -> Optional[bytes]:
+    """Legacy ffmpeg enhancement; returns None when ffmpeg is missing or fails."""
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inp = Path(tmpdir) / "in.wav"
+            outp = Path(tmpdir) / "out.wav"
+            inp.write_bytes(audio_bytes)
+            cmd = [
+                "ffmpeg",
+                "-y",
+                "-i",
+                str(inp),
+                "-ac",
+                "1",
+                "-ar",
+                str(TARGET_RATE),
+                "-af",
+                "highpass=f=120,lowpass=f=3800,afftdn=nf=-25,"
+                "loudnorm=I=-19:TP=-2:LRA=8",
+                str(outp),
+            ]
+            result = subprocess.run(cmd, capture_output=True, check=False)
+            if result.returncode != 0:
+                logger.debug("ffmpeg enhance failed; using raw audio. stderr=%s", result.stderr.decode(errors="ignore"))
+                return None
+            return outp.read_bytes()
+    except FileNotFoundError:
+        logger.debug("ffmpeg not found; using raw audio")
+    except Exception as exc:
+        logger.debug("Audio enhancement failed; using raw audio: %s", exc)
+    return None
+
+
+def enhance_with_backend(audio_bytes: bytes, backend: str = "numpy") -> Optional[bytes]:
+    """
+    Enhance with the configured backend ("numpy", "ffmpeg" or "none").
+    NumPy failures fall back to ffmpeg; None means "send the raw audio".
+    """
+    backend = (backend or "numpy").lower()
+    if backend in ("none", "off", "raw"):
+        return None
+    if backend == "numpy":
+        if NUMPY_AVAILABLE:
+            try:
+                return enhance_wav(audio_bytes)
+            except Exception as exc:
+                logger.debug("NumPy enhancement failed; falling back to ffmpeg: %s", exc)
+        else:
+            logger.debug("numpy not installed; falling back to ffmpeg enhancement")
+    return enhance_wav_ffmpeg(audio_bytes)
+
+
+def resample_wav(audio_bytes: bytes, target_rate: int = TARGET_RATE) -> bytes:
+    """Resample WAV bytes to mono 16-bit PCM at target_rate."""
+    samples, rate = decode_wav(audio_bytes)
+    return encode_wav(resample(samples, rate, target_rate), target_rate)
+
@@ -0,0 +1,107 @@
+"""
+Dedicated process pool for CPU-bound audio DSP.
+
+Empty-audio detection, enhancement and resampling run in
+worker processes so they never hold the event loop (ARI event handling) or
+the default thread executor (audio sync, to_thread callers).
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from stt_tts import audio_enhance
+from utils.metrics import LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup_job() -> bool:
+    return audio_enhance.NUMPY_AVAILABLE
+
+
+class AudioWorkerPool:
+    """
+    Size-bounded ProcessPoolExecutor with back-pressure.
+
+    At most `max_pending` jobs are admitted (queued in the executor or running);
+    further callers wait on a semaphore instead of piling work into the pool.
+    `queue_depth` / `stats()` expose the gauge.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._executor = self._build_executor()
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_depth = 0
+        self.wait_latency = LatencyStats()
+        self.run_latency = LatencyStats()
+
+    def _build_executor(self) -> ProcessPoolExecutor:
+        # spawn: never fork a process that is running an event loop.
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting + self.in_flight
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "max_depth": self.max_depth,
+            "wait": self.wait_latency.snapshot(),
+            "run": self.run_latency.snapshot(),
+        }
+
+    async def start(self) -> None:
+        """Spawn the workers up front so the first call does not pay process start-up."""
+        await asyncio.gather(*(self.run(_warmup_job) for _ in range(self.max_workers)))
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_depth = max(self.max_depth, self.queue_depth)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        started_at = time.perf_counter()
+        self.wait_latency.observe(started_at - queued_at)
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                return await loop.run_in_executor(self._executor, fn, *args)
+            except BrokenProcessPool:
+                logger.warning("Audio worker pool broken; restarting %d workers", self.max_workers)
+                self._executor = self._build_executor()
+                return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+            self.run_latency.observe(time.perf_counter() - started_at)
+
+    async def is_empty_audio(self, audio_bytes: bytes) -> bool:
+        return await self.run(audio_enhance.is_empty_wav, audio_bytes)
+
+    async def enhance(self, audio_bytes: bytes, backend: str) -> Optional[bytes]:
+        return await self.run(audio_enhance.enhance_with_backend, audio_bytes, backend)
+
+    async def resample(self, audio_bytes: bytes, target_rate: int = audio_enhance.TARGET_RATE) -> bytes:
+        return await self.run(audio_enhance.resample_wav, audio_bytes, target_rate)
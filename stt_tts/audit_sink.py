@@ -0,0 +1,168 @@
+"""
+Asynchronous, batched writer for enhanced-audio audit copies.
+
+STT calls hand the enhanced WAV to `AuditSink.submit`, which only samples and
+enqueues. A background task drains the bounded queue in batches on a
+dedicated I/O thread and prunes the directory by age and total size, so spool
+disk stalls never add to STT latency.
+"""
+import asyncio
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from config.settings import AuditSettings
+from utils.metrics import Counters
+
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class AuditItem:
+    audio: bytes
+    session_id: Optional[str]
+    phase: Optional[str]
+    created_at: datetime
+
+
+class AuditSink:
+    def __init__(self, settings: AuditSettings, batch_size: int = 16, flush_interval: float = 1.0):
+        self.settings = settings
+        self.outdir = Path(settings.directory)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[AuditItem] = asyncio.Queue(maxsize=max(1, settings.queue_size))
+        self.counters = Counters()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-sink")
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.sample_rate > 0
+
+    def start(self) -> None:
+        if self.enabled and not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Best-effort final flush of whatever is still queued.
+        remaining = self._drain(self.queue.qsize())
+        if remaining:
+            await asyncio.get_running_loop().run_in_executor(self._io, self._write_batch, remaining)
+        self._io.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        data = self.counters.snapshot()
+        data["queued"] = self.queue.qsize()
+        return data
+
+    def submit(self, audio: bytes, session_id: Optional[str] = None, phase: Optional[str] = None) -> bool:
+        """Sample and enqueue without waiting; returns False when skipped or dropped."""
+        if not self.enabled or not audio:
+            return False
+        if self.settings.sample_rate < 1 and random.random() >= self.settings.sample_rate:
+            self.counters.inc("sampled_out")
+            return False
+        try:
+            self.queue.put_nowait(AuditItem(audio, session_id, phase, datetime.utcnow()))
+        except asyncio.QueueFull:
+            self.counters.inc("dropped")
+            return False
+        self.counters.inc("queued")
+        return True
+
+    def _drain(self, limit: int) -> List[AuditItem]:
+        items: List[AuditItem] = []
+        while len(items) < limit:
+            try:
+                items.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[AuditItem] = []
+            try:
+                first = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+                batch = [first] + self._drain(self.batch_size - 1)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if batch:
+                    await loop.run_in_executor(self._io, self._write_batch, batch)
+                if time.monotonic() - self._last_prune >= self.settings.prune_interval:
+                    self._last_prune = time.monotonic()
+                    await loop.run_in_executor(self._io, self.prune)
+            except Exception as exc:
+                logger.warning("Audit sink flush failed: %s", exc)
+
+    def _filename(self, item: AuditItem) -> str:
+        ts = item.created_at.strftime("%Y%m%dT%H%M%S%f")
+        if not item.session_id:
+            return f"enhanced-{ts}.wav"
+        parts = [item.session_id, item.phase or "audio"]
+        return _UNSAFE_CHARS.sub("_", "-".join(parts)) + ".wav"
+
+    def _write_batch(self, batch: List[AuditItem]) -> None:
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        for item in batch:
+            target = self.outdir / self._filename(item)
+            # A phase can be recorded more than once per session (retry loops).
+            n = 1
+            while target.exists():
+                n += 1
+                target = target.with_name(f"{target.stem.split('~')[0]}~{n}.wav")
+            try:
+                target.write_bytes(item.audio)
+                self.counters.inc("written")
+            except Exception as exc:
+                self.counters.inc("write_errors")
+                logger.debug("Failed to persist enhanced audio copy %s: %s", target, exc)
+
+    def prune(self) -> int:
+        """Delete files older than max_age, then the oldest until under max_bytes."""
+        if not self.outdir.is_dir():
+            return 0
+        files = []
+        for path in self.outdir.glob("*.wav"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        removed = 0
+        now = time.time()
+        max_age = self.settings.max_age_hours * 3600
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            too_old = max_age > 0 and now - mtime > max_age
+            too_big = self.settings.max_bytes > 0 and total > self.settings.max_bytes
+            if not (too_old or too_big):
+                continue
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError as exc:
+                logger.debug("Failed to prune audit file %s: %s", path, exc)
+        if removed:
+            self.counters.inc("pruned", removed)
+            logger.info("Pruned %d enhanced audio copies from %s", removed, self.outdir)
+        return removed
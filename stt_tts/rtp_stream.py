@@ -0,0 +1,181 @@
+"""
+Minimal RTP over UDP for ARI external media.
+
+`RtpReceiver` binds a local UDP socket that an ARI externalMedia channel
+streams to and hands decoded PCM frames (float32, -1..1) to a callback.
+`LocalRtpSender` is the stand-in for Asterisk used by tests and local runs:
+it packetizes PCM into 20 ms RTP frames and sends them to a receiver.
+"""
+import asyncio
+import logging
+import random
+import struct
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+RTP_HEADER_LEN = 12
+# ARI externalMedia `format` -> sample rate. slin is sent big-endian (network order).
+CODEC_RATES = {"slin16": 16000, "slin": 8000, "ulaw": 8000}
+_PAYLOAD_TYPES = {"slin16": 118, "slin": 10, "ulaw": 0}
+# Gaps larger than this are treated as a new stream, not packet loss.
+MAX_FILL_PACKETS = 50
+
+
+def _ulaw_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    magnitude = (((u & 0x0F) << 3) + 0x84) << exponent
+    linear = np.where(u & 0x80, 0x84 - magnitude, magnitude - 0x84)
+    return (linear / 32768.0).astype(np.float32)
+
+
+_ULAW_DECODE = _ulaw_table()
+
+
+def codec_rate(codec: str) -> int:
+    try:
+        return CODEC_RATES[codec]
+    except KeyError:
+        raise ValueError(f"Unsupported external media codec: {codec}") from None
+
+
+def decode_payload(payload: bytes, codec: str) -> np.ndarray:
+    if codec == "ulaw":
+        return _ULAW_DECODE[np.frombuffer(payload, dtype=np.uint8)]
+    usable = len(payload) - len(payload) % 2
+    return np.frombuffer(payload[:usable], dtype=">i2").astype(np.float32) / 32768.0
+
+
+def encode_payload(samples: np.ndarray, codec: str) -> bytes:
+    pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype(np.int32)
+    if codec != "ulaw":
+        return pcm.astype(">i2").tobytes()
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), 32635) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def parse_rtp(packet: bytes) -> Optional[Tuple[int, int, bytes]]:
+    """Return (sequence, timestamp, payload) or None for non-RTP datagrams."""
+    if len(packet) < RTP_HEADER_LEN or packet[0] >> 6 != 2:
+        return None
+    first = packet[0]
+    offset = RTP_HEADER_LEN + 4 * (first & 0x0F)
+    if first & 0x10:  # header extension
+        if len(packet) < offset + 4:
+            return None
+        ext_words = struct.unpack_from("!H", packet, offset + 2)[0]
+        offset += 4 + 4 * ext_words
+    end = len(packet)
+    if first & 0x20:  # padding
+        end -= packet[-1]
+    if offset > end:
+        return None
+    seq, ts = struct.unpack_from("!HI", packet, 2)
+    return seq, ts, packet[offset:end]
+
+
+def build_rtp(seq: int, ts: int, ssrc: int, payload: bytes, payload_type: int) -> bytes:
+    return struct.pack("!BBHII", 0x80, payload_type & 0x7F, seq & 0xFFFF, ts & 0xFFFFFFFF, ssrc) + payload
+
+
+class RtpReceiver(asyncio.DatagramProtocol):
+    """
+    UDP endpoint for one externalMedia channel.
+    Late/duplicate packets are dropped and short gaps are filled with silence so
+    downstream frame timing (VAD, endpointing) stays aligned with wall-clock audio.
+    """
+
+    def __init__(self, codec: str, on_frame: Callable[[np.ndarray], None]):
+        self.codec = codec
+        self.rate = codec_rate(codec)
+        self.on_frame = on_frame
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.port: Optional[int] = None
+        self.last_seq: Optional[int] = None
+        self.packets = 0
+        self.lost = 0
+        self.dropped = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        self.port = self.transport.get_extra_info("sockname")[1]
+        return self.port
+
+    def close(self) -> None:
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        parsed = parse_rtp(data)
+        if not parsed:
+            return
+        seq, _, payload = parsed
+        frame = decode_payload(payload, self.codec)
+        if self.last_seq is not None:
+            delta = (seq - self.last_seq) & 0xFFFF
+            if delta == 0 or delta > 0x8000:
+                self.dropped += 1
+                return
+            if 1 < delta <= MAX_FILL_PACKETS:
+                self.lost += delta - 1
+                gap = np.zeros(len(frame), dtype=np.float32)
+                for _ in range(delta - 1):
+                    self._emit(gap)
+        self.last_seq = seq
+        self.packets += 1
+        self._emit(frame)
+
+    def _emit(self, frame: np.ndarray) -> None:
+        try:
+            self.on_frame(frame)
+        except Exception as exc:
+            logger.exception("RTP frame handler failed: %s", exc)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug("RTP receiver error on port %s: %s", self.port, exc)
+
+
+class LocalRtpSender:
+    """Stand-in for an Asterisk externalMedia channel: streams PCM as 20 ms RTP packets."""
+
+    def __init__(self, codec: str = "slin16", frame_ms: int = 20):
+        self.codec = codec
+        self.rate = codec_rate(codec)
+        self.frame_len = self.rate * frame_ms // 1000
+        self.frame_interval = frame_ms / 1000.0
+        self.payload_type = _PAYLOAD_TYPES[codec]
+        self.ssrc = random.getrandbits(32)
+        self.seq = random.getrandbits(16)
+        self.ts = random.getrandbits(32)
+
+    async def send(self, host: str, port: int, samples: np.ndarray, speed: float = 1.0) -> int:
+        """
+        Send samples to host:port, paced at `speed` x real time (0 = as fast as possible).
+        Returns the number of packets sent.
+        """
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+        sent = 0
+        try:
+            start = loop.time()
+            for offset in range(0, len(samples), self.frame_len):
+                frame = samples[offset:offset + self.frame_len]
+                transport.sendto(build_rtp(self.seq, self.ts, self.ssrc, encode_payload(frame, self.codec), self.payload_type))
+                self.seq = (self.seq + 1) & 0xFFFF
+                self.ts = (self.ts + len(frame)) & 0xFFFFFFFF
+                sent += 1
+                delay = start + sent * self.frame_interval / speed - loop.time() if speed > 0 else 0.0
+                # Always yield so a receiver on the same loop drains its socket buffer.
+                await asyncio.sleep(max(0.0, delay))
+        finally:
+            transport.close()
+        return sent
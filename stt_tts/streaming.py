@@ -0,0 +1,354 @@
+"""
+Live caller audio for the `record` step.
+
+Instead of waiting for ARI `RecordingFinished` and uploading the whole file,
+the caller's audio is tapped with a snoop channel (spy=in) bridged to an ARI
+externalMedia channel that sends RTP to a local UDP socket. An energy
+endpointer splits the stream at pauses; closed segments are transcribed while
+the caller keeps talking, so by end of speech only the last short tail is
+still in flight. Vira STT is a batch API, so "incremental" means per segment.
+VadRecordingMonitor uses the same tap to stop a regular ARI recording at end
+of utterance (stt.vad).
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from config.flow_definition import STTConfig, VADConfig
+from config.settings import StreamingSettings
+from stt_tts import audio_enhance
+from stt_tts.rtp_stream import RtpReceiver
+from stt_tts.vad import UtteranceEndDetector, VoiceActivityDetector
+
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechEndpointer:
+    """
+    Segments a live stream using a VoiceActivityDetector.
+
+    push() returns ("segment", audio) when a pause closes a segment of at least
+    `min_segment_ms`, and ("end", audio) once `end_silence_ms` of silence
+    follows speech (empty when nothing was said since the last segment).
+    A short pre-roll is kept so word onsets are not clipped.
+    """
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        start_ms: int = 100,
+        pause_ms: int = 350,
+        end_silence_ms: int = 700,
+        min_segment_ms: int = 1000,
+        preroll_ms: int = 200,
+    ):
+        self.vad = vad
+        frame_ms = vad.frame_ms
+        self.frame_len = vad.frame_len
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.pause_frames = max(1, pause_ms // frame_ms)
+        self.end_frames = max(self.pause_frames, end_silence_ms // frame_ms)
+        self.min_segment_frames = max(1, min_segment_ms // frame_ms)
+        self.preroll: deque = deque(maxlen=max(self.start_frames, preroll_ms // frame_ms))
+        self.segment: List[np.ndarray] = []
+        self.segment_voiced = 0
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.voiced_run = 0
+        self.silence_run = 0
+        self.in_speech = False
+        self.speech_detected = False
+        self.done = False
+
+    def _take_segment(self) -> np.ndarray:
+        # A tail that is only trailing silence is not worth an STT call.
+        voiced = self.segment_voiced > 0
+        audio = np.concatenate(self.segment) if self.segment and voiced else np.zeros(0, dtype=np.float32)
+        self.segment = []
+        self.segment_voiced = 0
+        return audio
+
+    def push(self, samples: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+        events: List[Tuple[str, np.ndarray]] = []
+        if self.done:
+            return events
+        data = np.concatenate([self.pending, samples]) if len(self.pending) else samples
+        n_frames = len(data) // self.frame_len
+        usable = n_frames * self.frame_len
+        self.pending = data[usable:]
+        if not n_frames:
+            return events
+        frames = data[:usable].reshape(n_frames, self.frame_len)
+        for frame, voiced in zip(frames, self.vad.classify(frames)):
+            if not self.in_speech:
+                self.preroll.append(frame)
+                self.voiced_run = self.voiced_run + 1 if voiced else 0
+                if self.voiced_run >= self.start_frames:
+                    self.in_speech = self.speech_detected = True
+                    self.segment = list(self.preroll)
+                    self.segment_voiced = self.voiced_run
+                    self.preroll.clear()
+                    self.silence_run = 0
+                continue
+            self.segment.append(frame)
+            self.segment_voiced += int(voiced)
+            self.silence_run = 0 if voiced else self.silence_run + 1
+            if self.silence_run >= self.end_frames:
+                events.append(("end", self._take_segment()))
+                self.done = True
+                break
+            if self.silence_run == self.pause_frames and len(self.segment) >= self.min_segment_frames:
+                events.append(("segment", self._take_segment()))
+        return events
+
+    def flush(self) -> np.ndarray:
+        """Close the stream (max duration / timeout) and return any unsent speech."""
+        self.done = True
+        return self._take_segment()
+
+
+class MediaTap:
+    """
+    Caller-audio tap: snoop channel (spy=in) + externalMedia channel in a private
+    bridge, with RTP delivered to a local RtpReceiver that calls `on_frame`.
+    """
+
+    def __init__(
+        self,
+        ari_client,
+        settings: StreamingSettings,
+        session_id: str,
+        channel_id: str,
+        label: str,
+        on_frame: Callable[[np.ndarray], None],
+    ):
+        self.ari_client = ari_client
+        self.settings = settings
+        self.session_id = session_id
+        self.channel_id = channel_id
+        self.label = label
+        self.receiver = RtpReceiver(settings.codec, on_frame)
+        self.snoop_id: Optional[str] = None
+        self.media_id: Optional[str] = None
+        self.bridge_id: Optional[str] = None
+
+    @property
+    def rate(self) -> int:
+        return self.receiver.rate
+
+    async def start(self) -> None:
+        port = await self.receiver.start(self.settings.bind_host, 0)
+        try:
+            snoop = await self.ari_client.snoop_channel(
+                self.channel_id, app_args=f"stream,{self.session_id}", spy="in"
+            )
+            self.snoop_id = snoop.get("id")
+            media = await self.ari_client.external_media(
+                f"{self.settings.advertise_host}:{port}", fmt=self.settings.codec
+            )
+            self.media_id = media.get("id")
+            bridge = await self.ari_client.create_bridge(name=f"stream-{self.label}-{self.session_id}")
+            self.bridge_id = bridge.get("id")
+            for channel_id in (self.snoop_id, self.media_id):
+                await self.ari_client.add_channel_to_bridge(self.bridge_id, channel_id)
+        except Exception:
+            await self.close()
+            raise
+        logger.debug("Media tap %s for session %s on UDP port %s", self.label, self.session_id, port)
+
+    async def close(self) -> None:
+        self.receiver.close()
+        for channel_id in (self.snoop_id, self.media_id):
+            if channel_id:
+                try:
+                    await self.ari_client.hangup_channel(channel_id)
+                except Exception as exc:
+                    logger.debug("Failed to hangup media tap leg %s: %s", channel_id, exc)
+        if self.bridge_id:
+            try:
+                await self.ari_client.delete_bridge(self.bridge_id)
+            except Exception as exc:
+                logger.debug("Failed to delete media tap bridge %s: %s", self.bridge_id, exc)
+        self.snoop_id = self.media_id = self.bridge_id = None
+
+
+def build_vad(rate: int, config: VADConfig) -> VoiceActivityDetector:
+    return VoiceActivityDetector(
+        rate, mode=config.mode, threshold_db=config.threshold_db, backend=config.backend
+    )
+
+
+@dataclass
+class StreamResult:
+    text: str
+    speech_detected: bool
+    segments: int
+    reason: str
+    # Seconds between end of speech and the final transcript being available.
+    tail_latency: float = 0.0
+
+
+class StreamingCapture:
+    """One streamed `record` step: media tap + endpointer + per-segment STT."""
+
+    def __init__(
+        self,
+        ari_client,
+        stt_client,
+        settings: StreamingSettings,
+        session_id: str,
+        channel_id: str,
+        phase: str,
+        stt_config: STTConfig,
+    ):
+        self.stt_client = stt_client
+        self.session_id = session_id
+        self.phase = phase
+        self.stt_config = stt_config
+        self.tap = MediaTap(ari_client, settings, session_id, channel_id, phase, self._on_frame)
+        self.endpointer = SpeechEndpointer(
+            build_vad(self.tap.rate, stt_config.vad),
+            end_silence_ms=stt_config.vad.end_silence_ms,
+        )
+        self.tasks: List[asyncio.Task] = []
+        self.reason = ""
+        self.ended_at: Optional[float] = None
+        self._done = asyncio.Event()
+        self._watchdog: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self.tap.start()
+        self._watchdog = asyncio.create_task(self._watch())
+
+    def _on_frame(self, samples: np.ndarray) -> None:
+        if self._done.is_set():
+            return
+        for kind, audio in self.endpointer.push(samples):
+            self._submit(audio)
+            if kind == "end":
+                self._finish("speech_end")
+
+    def _submit(self, audio: np.ndarray) -> None:
+        if len(audio) < self.tap.rate // 10:
+            return
+        index = len(self.tasks) + 1
+        self.tasks.append(asyncio.create_task(self._transcribe(index, audio)))
+
+    async def _transcribe(self, index: int, audio: np.ndarray) -> str:
+        wav = audio_enhance.encode_wav(audio, self.tap.rate)
+        result = await self.stt_client.transcribe_audio(
+            wav,
+            hotwords=self.stt_config.hotwords,
+            session_id=self.session_id,
+            phase=f"{self.phase}-{index}",
+        )
+        return result.text.strip()
+
+    def _finish(self, reason: str) -> None:
+        if self._done.is_set():
+            return
+        self.reason = reason
+        self.ended_at = time.perf_counter()
+        self._done.set()
+
+    async def _watch(self) -> None:
+        """Mirror ARI record limits: max_silence before any speech, max_duration overall."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while not self._done.is_set():
+            elapsed = loop.time() - started
+            if elapsed >= self.stt_config.max_duration:
+                self._submit(self.endpointer.flush())
+                self._finish("max_duration")
+            elif not self.endpointer.speech_detected and elapsed >= self.stt_config.max_silence:
+                self.endpointer.flush()
+                self._finish("no_speech")
+            else:
+                await asyncio.sleep(0.05)
+
+    async def wait_for_end_of_speech(self) -> None:
+        await self._done.wait()
+
+    async def transcript(self) -> StreamResult:
+        """Wait for all segment uploads; STT errors propagate to the caller."""
+        await self._done.wait()
+        texts = await asyncio.gather(*self.tasks)
+        tail = time.perf_counter() - self.ended_at if self.ended_at else 0.0
+        return StreamResult(
+            text=" ".join(t for t in texts if t),
+            speech_detected=self.endpointer.speech_detected,
+            segments=len(self.tasks),
+            reason=self.reason,
+            tail_latency=tail,
+        )
+
+    async def close(self) -> None:
+        self._finish(self.reason or "closed")
+        if self._watchdog and self._watchdog is not asyncio.current_task():
+            self._watchdog.cancel()
+        await self.tap.close()
+
+    def cancel(self) -> None:
+        """Drop in-flight segment uploads (caller hung up)."""
+        for task in self.tasks:
+            task.cancel()
+
+
+class VadRecordingMonitor:
+    """
+    Runs next to an ARI recording: watches a media tap with the VAD and, at end of
+    utterance, stops the recording instead of waiting for Asterisk's
+    maxSilenceSeconds. With `stop_recording: false` it only measures (shadow mode).
+    """
+
+    def __init__(
+        self,
+        ari_client,
+        settings: StreamingSettings,
+        session_id: str,
+        channel_id: str,
+        recording_name: str,
+        config: VADConfig,
+    ):
+        self.ari_client = ari_client
+        self.recording_name = recording_name
+        self.config = config
+        self.tap = MediaTap(ari_client, settings, session_id, channel_id, recording_name, self._on_frame)
+        self.detector = UtteranceEndDetector(
+            build_vad(self.tap.rate, config),
+            min_speech_ms=config.min_speech_ms,
+            end_silence_ms=config.end_silence_ms,
+        )
+        self.stopped = False
+        self._stop_task: Optional[asyncio.Task] = None
+
+    @property
+    def last_voice_at(self) -> Optional[float]:
+        return self.detector.last_voice_at if self.detector.speech_detected else None
+
+    async def start(self) -> None:
+        await self.tap.start()
+
+    def _on_frame(self, samples: np.ndarray) -> None:
+        if self.detector.push(samples) and self.config.stop_recording:
+            self.stopped = True
+            self._stop_task = asyncio.create_task(self._stop())
+
+    async def _stop(self) -> None:
+        try:
+            await self.ari_client.stop_recording(self.recording_name)
+        except Exception as exc:
+            # Recording may already have ended on silence/duration.
+            logger.debug("VAD stop of recording %s failed: %s", self.recording_name, exc)
+
+    async def close(self) -> None:
+        await self.tap.close()
+
+    def cancel(self) -> None:
+        if self._stop_task:
+            self._stop_task.cancel()
@@ -0,0 +1,130 @@
+"""
+Frame-level voice-activity detection for live call audio.
+
+The default backend is a vectorized energy + zero-crossing-rate classifier
+with an adaptive noise floor; `mode` 0..3 follows the WebRTC convention
+(higher = more aggressive about calling frames non-speech). When the optional
+`webrtcvad` package is installed, backend="webrtc" uses it instead.
+"""
+import logging
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:  # Optional: pip install webrtcvad
+    import webrtcvad
+
+    WEBRTC_AVAILABLE = True
+except ImportError:
+    WEBRTC_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# mode -> (energy margin over the noise floor in dB, max ZCR for low-energy speech)
+MODE_PARAMS = {
+    0: (6.0, 0.45),
+    1: (8.0, 0.40),
+    2: (10.0, 0.35),
+    3: (13.0, 0.30),
+}
+
+
+def frame_features(frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame level (dBFS) and zero-crossing rate for an (n_frames, frame_len) array."""
+    level_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return level_db, zcr
+
+
+class VoiceActivityDetector:
+    def __init__(
+        self,
+        rate: int,
+        frame_ms: int = 20,
+        mode: int = 2,
+        threshold_db: float = -45.0,
+        backend: str = "energy",
+    ):
+        self.rate = rate
+        self.frame_ms = frame_ms
+        self.frame_len = rate * frame_ms // 1000
+        self.mode = min(3, max(0, int(mode)))
+        self.margin_db, self.max_zcr = MODE_PARAMS[self.mode]
+        self.threshold_db = threshold_db
+        self.noise_db: Optional[float] = None
+        self._webrtc = None
+        if backend == "webrtc":
+            if WEBRTC_AVAILABLE and rate in (8000, 16000, 32000, 48000) and frame_ms in (10, 20, 30):
+                self._webrtc = webrtcvad.Vad(self.mode)
+            else:
+                logger.warning("webrtcvad unavailable for %d Hz/%d ms; using energy VAD", rate, frame_ms)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Return a bool speech flag per row of an (n_frames, frame_len) float array."""
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+        if self._webrtc is not None:
+            pcm = np.clip(frames * 32768.0, -32768, 32767).astype("<i2")
+            return np.array([self._webrtc.is_speech(row.tobytes(), self.rate) for row in pcm], dtype=bool)
+
+        level_db, zcr = frame_features(frames)
+        if self.noise_db is None:
+            self.noise_db = float(np.min(level_db))
+        floor = self.noise_db
+        loud = level_db > max(self.threshold_db, floor + self.margin_db)
+        # Low-energy frames with noise-like ZCR are rejected; clearly loud frames pass regardless.
+        voiced = loud & ((zcr < self.max_zcr) | (level_db > floor + 2 * self.margin_db))
+        if not voiced.all():
+            target = float(np.median(level_db[~voiced]))
+            # Track the floor quickly downward, slowly upward.
+            rate = 0.3 if target < floor else 0.05
+            self.noise_db = floor + rate * (target - floor)
+        return voiced
+
+
+class UtteranceEndDetector:
+    """
+    Signals end of utterance: at least `min_speech_ms` of speech followed by
+    `end_silence_ms` of non-speech. `last_voice_at` is the perf_counter time of
+    the most recent speech frame, used to measure how long a turn ran past it.
+    """
+
+    def __init__(self, vad: VoiceActivityDetector, min_speech_ms: int = 200, end_silence_ms: int = 700):
+        self.vad = vad
+        self.min_speech_frames = max(1, min_speech_ms // vad.frame_ms)
+        self.end_frames = max(1, end_silence_ms // vad.frame_ms)
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.speech_frames = 0
+        self.silence_run = 0
+        self.last_voice_at: Optional[float] = None
+        self.ended = False
+
+    @property
+    def speech_detected(self) -> bool:
+        return self.speech_frames >= self.min_speech_frames
+
+    def push(self, samples: np.ndarray) -> bool:
+        """Feed audio; returns True exactly once, when the utterance ends."""
+        if self.ended:
+            return False
+        data = np.concatenate([self.pending, samples]) if len(self.pending) else samples
+        n_frames = len(data) // self.vad.frame_len
+        usable = n_frames * self.vad.frame_len
+        self.pending = data[usable:]
+        if not n_frames:
+            return False
+        voiced = self.vad.classify(data[:usable].reshape(n_frames, self.vad.frame_len))
+        if voiced.any():
+            self.last_voice_at = time.perf_counter()
+            self.speech_frames += int(voiced.sum())
+            # Silence run restarts after the last voiced frame of this batch.
+            self.silence_run = n_frames - 1 - int(np.flatnonzero(voiced)[-1])
+        else:
+            self.silence_run += n_frames
+        if self.speech_detected and self.silence_run >= self.end_frames:
+            self.ended = True
+            return True
+        return False
@@ -1,16 +1,24 @@
 import asyncio
+import io
 import logging
+import time
 from dataclasses import dataclass
-import subprocess
-import tempfile
-from pathlib import Path
-from datetime import datetime
-import os
 from typing import Optional
 
-import requests
+import httpx
 
 from config.settings import ViraSettings
+from stt_tts import audio_enhance
+from stt_tts.audit_sink import AuditSink
+from stt_tts.audio_workers import AudioWorkerPool
+from utils.metrics import Counters, LatencyStats
+
+try:  # HTTP/2 needs the optional `h2` package.
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +35,7 @@ class STTResult:
 class ViraSTTClient:
     """
     Async Vira STT wrapper with concurrency control.
+    Uploads go through a shared keep-alive httpx.AsyncClient (HTTP/2 when `h2` is installed).
     """
 
     def __init__(
@@ -35,28 +44,56 @@ class ViraSTTClient:
         timeout: float = 30.0,
         max_connections: int = 100,
         semaphore: Optional[asyncio.Semaphore] = None,
+        audio_workers: Optional[AudioWorkerPool] = None,
+        audit_sink: Optional[AuditSink] = None,
     ):
         self.settings = settings
+        self.audio_workers = audio_workers
+        self.audit_sink = audit_sink
         self.timeout = timeout
         self.semaphore = semaphore or asyncio.Semaphore(10)
-        if not settings.verify_ssl:
-            try:
-                import urllib3
-
-                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            except Exception:
-                pass
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=limits,
+            verify=settings.verify_ssl,
+            http2=_HTTP2_AVAILABLE,
+        )
+        # Per-request metrics: queue wait for the semaphore, upload round-trip, status counts.
+        self.wait_latency = LatencyStats()
+        self.request_latency = LatencyStats()
+        self.status_counts = Counters()
 
     async def close(self) -> None:
-        return
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "wait": self.wait_latency.snapshot(),
+            "request": self.request_latency.snapshot(),
+            "status": self.status_counts.snapshot(),
+            "http2": _HTTP2_AVAILABLE,
+        }
 
     async def transcribe_audio(
         self,
         audio_bytes: bytes,
         language_model: str = "default",
         hotwords: Optional[list[str]] = None,
+        session_id: Optional[str] = None,
+        phase: Optional[str] = None,
+        enhance: bool = True,
     ) -> STTResult:
-        audio_bytes = await asyncio.to_thread(self._enhance_audio, audio_bytes)
+        if enhance:
+            enhanced = await self._enhance_async(audio_bytes)
+            # Only audit real enhancer output; on failure the raw audio goes to STT unarchived.
+            if enhanced is not None:
+                audio_bytes = enhanced
+                if self.audit_sink:
+                    self.audit_sink.submit(audio_bytes, session_id=session_id, phase=phase)
         token = self.settings.stt_token
         if not token:
             logger.warning("Vira STT token is missing; STT call skipped.")
@@ -66,30 +103,46 @@ class ViraSTTClient:
             "gateway-token": token,
             "accept": "application/json",
         }
-        files = {
-            "audio": ("audio.wav", audio_bytes, "audio/wav"),
+        data: dict = {
+            "model": language_model,
+            "srt": "false",
+            "inverseNormalizer": "false",
+            "timestamp": "false",
+            "spokenPunctuation": "false",
+            "punctuation": "false",
+            "numSpeakers": "0",
+            "diarize": "false",
         }
-        data_list = [
-            ("model", language_model),
-            ("srt", "false"),
-            ("inverseNormalizer", "false"),
-            ("timestamp", "false"),
-            ("spokenPunctuation", "false"),
-            ("punctuation", "false"),
-            ("numSpeakers", "0"),
-            ("diarize", "false"),
-        ]
         if hotwords:
-            for word in hotwords:
-                data_list.append(("hotwords[]", word))
+            data["hotwords[]"] = list(hotwords)
+        # A file-like body lets httpx stream the multipart upload in chunks.
+        files = {"audio": ("audio.wav", io.BytesIO(audio_bytes), "audio/wav")}
 
+        queued_at = time.perf_counter()
         async with self.semaphore:
-            response = await asyncio.to_thread(
-                self._post_sync,
-                headers,
-                data_list,
-                audio_bytes,
-            )
+            started_at = time.perf_counter()
+            self.wait_latency.observe(started_at - queued_at)
+            try:
+                response = await self.client.post(
+                    self.settings.stt_url,
+                    headers=headers,
+                    data=data,
+                    files=files,
+                    timeout=self.timeout,
+                )
+            except Exception:
+                self.status_counts.inc("error")
+                raise
+            finally:
+                self.request_latency.observe(time.perf_counter() - started_at)
+        self.status_counts.inc(str(response.status_code))
+        logger.debug(
+            "Vira STT %s in %.0f ms (bytes=%d, http=%s)",
+            response.status_code,
+            (time.perf_counter() - started_at) * 1000,
+            len(audio_bytes),
+            response.http_version,
+        )
         if response.status_code >= 400:
             try:
                 logger.error(
@@ -132,58 +185,16 @@ class ViraSTTClient:
 
         return STTResult(status=status, text=text, request_id=request_id, trace_id=trace_id)
 
-    def _enhance_audio(self, audio_bytes: bytes) -> bytes:
+    async def _enhance_async(self, audio_bytes: bytes) -> Optional[bytes]:
+        if not self.audio_workers:
+            return await asyncio.to_thread(self._enhance_audio, audio_bytes)
+        return await self.audio_workers.enhance(audio_bytes, self.settings.enhance_backend)
+
+    def _enhance_audio(self, audio_bytes: bytes) -> Optional[bytes]:
         """
         Light denoise/normalize without trimming the start of the call.
-        Requires ffmpeg; on failure returns original audio.
+        Uses the in-process NumPy pipeline; ffmpeg is the fallback (or the
+        primary when STT_ENHANCE_BACKEND=ffmpeg). Returns None when enhancement
+        failed or is disabled (the caller then sends the original audio).
         """
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                inp = Path(tmpdir) / "in.wav"
-                outp = Path(tmpdir) / "out.wav"
-                inp.write_bytes(audio_bytes)
-                cmd = [
-                    "ffmpeg",
-                    "-y",
-                    "-i",
-                    str(inp),
-                    "-ac",
-                    "1",
-                    "-ar",
-                    "16000",
-                    "-af",
-                    "highpass=f=120,lowpass=f=3800,afftdn=nf=-25,"
-                    "loudnorm=I=-19:TP=-2:LRA=8",
-                    str(outp),
-                ]
-                result = subprocess.run(cmd, capture_output=True, check=False)
-                if result.returncode != 0:
-                    logger.debug("ffmpeg enhance failed; using raw audio. stderr=%s", result.stderr.decode(errors="ignore"))
-                    return audio_bytes
-                enhanced = outp.read_bytes()
-                # Save a copy for audit/listening
-                try:
-                    outdir = Path("/var/spool/asterisk/recording/enhanced")
-                    outdir.mkdir(parents=True, exist_ok=True)
-                    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
-                    outfile = outdir / f"enhanced-{ts}.wav"
-                    outfile.write_bytes(enhanced)
-                except Exception as exc:
-                    logger.debug("Failed to persist enhanced audio copy: %s", exc)
-                return enhanced
-        except FileNotFoundError:
-            logger.debug("ffmpeg not found; using raw audio")
-        except Exception as exc:
-            logger.debug("Audio enhancement failed; using raw audio: %s", exc)
-        return audio_bytes
-
-    def _post_sync(self, headers: dict, data_list: list, audio_bytes: bytes) -> requests.Response:
-        files = {"audio": ("audio.wav", audio_bytes, "audio/wav")}
-        return requests.post(
-            self.settings.stt_url,
-            headers=headers,
-            data=data_list,
-            files=files,
-            timeout=self.timeout,
-            verify=self.settings.verify_ssl,
-        )
+        return audio_enhance.enhance_with_backend(audio_bytes, self.settings.enhance_backend)
@@ -0,0 +1,98 @@
+"""Shared pytest fixtures."""
+
+import logging
+from logging.handlers import RotatingFileHandler
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.flow_engine import FlowEngine
+from logic.scenario_registry import ScenarioRegistry
+
+
+class FakeClock:
+    """Monotonic clock stand-in; tests move it by assigning `now`."""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def dialer_settings():
+    """Factory for the Settings subset Dialer reads; keyword overrides go to `settings.dialer`."""
+
+    def make(**overrides) -> SimpleNamespace:
+        dialer = dict(
+            static_contacts=[],
+            outbound_numbers=["02100000001"],
+            outbound_trunk="trunk",
+            default_caller_id="1000",
+            max_concurrent_calls=1,
+            max_calls_per_minute=10,
+            max_calls_per_day=100,
+            max_originations_per_second=0,
+            max_inflight_originations=1,
+            origination_timeout=30,
+            default_retry=60,
+        )
+        dialer.update(overrides)
+        return SimpleNamespace(dialer=SimpleNamespace(**dialer), sms=SimpleNamespace(api_key="", sender=""), company="test")
+
+    return make
+
+
+@pytest.fixture
+def flow_engine(tmp_path):
+    """
+    Factory for a FlowEngine on mocked ARI/session clients, MagicMock settings
+    and an empty ScenarioRegistry. `llm` defaults to a client without an API
+    key; other keywords (intent_cache, local_classifier...) go to FlowEngine.
+    """
+
+    def make(llm=None, stt=None, registry=None, **kwargs) -> FlowEngine:
+        settings = MagicMock()
+        settings.operator.mobile_numbers = []
+        settings.gapgpt.stream = False
+        if llm is None:
+            llm = MagicMock()
+            llm.api_key = ""
+        if registry is None:
+            registry = ScenarioRegistry(str(tmp_path / "scenarios"))
+        return FlowEngine(settings, AsyncMock(), llm, stt if stt is not None else AsyncMock(), AsyncMock(), registry, **kwargs)
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def transcript_logs(tmp_path, monkeypatch):
+    """
+    Point FlowEngine's transcript logs at the test's tmp_path. The real ones in
+    logs/ are training data for the local intent classifier.
+    """
+    log_dir = tmp_path / "logs"
+    built = []
+
+    def build_log(self, name: str, filename: str) -> logging.Logger:
+        log_dir.mkdir(exist_ok=True)
+        lg = logging.getLogger(f"{name}.test.{tmp_path.name}")
+        lg.handlers = [RotatingFileHandler(log_dir / filename)]
+        lg.setLevel(logging.INFO)
+        lg.propagate = False
+        built.append(lg)
+        return lg
+
+    monkeypatch.setattr(FlowEngine, "_build_log", build_log)
+    yield log_dir
+    for lg in built:
+        for handler in lg.handlers:
+            handler.close()
+        lg.handlers = []
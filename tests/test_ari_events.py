@@ -0,0 +1,92 @@
+"""Tests for ARI event sniffing, early filtering and the event filter subscription."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.ari_events import loads, sniff_type
+from core.ari_ws import AriWebSocketClient
+from sessions.session_manager import SessionManager
+
+
+def _settings(event_filter=True):
+    return SimpleNamespace(
+        ws_url="ws://ari", app_name="salehi", username="u", password="p",
+        event_workers=2, event_queue_size=10, event_overflow="block", event_filter=event_filter,
+    )
+
+
+def _client(event_types=SessionManager.HANDLED_EVENTS, ari_client=None, event_filter=True):
+    client = AriWebSocketClient(_settings(event_filter), AsyncMock(), event_types=event_types, ari_client=ari_client)
+    client.dispatcher = MagicMock(dispatch=AsyncMock())
+    return client
+
+
+class TestSniffType:
+    @pytest.mark.parametrize(
+        "message,expected",
+        [
+            ('{"type":"ChannelVarset","variable":"X"}', "ChannelVarset"),
+            ('{\n  "type": "StasisStart",\n  "args": []\n}', "StasisStart"),
+            (b'{"type": "Dial"}', "Dial"),
+            ('{"timestamp":"t","type":"StasisEnd"}', None),  # not first: decode to find out
+            ("not json", None),
+        ],
+    )
+    def test_sniff(self, message, expected):
+        assert sniff_type(message) == expected
+
+    def test_loads_matches_stdlib(self):
+        message = '{"type":"StasisStart","args":["outbound","s1"],"channel":{"id":"c1","name":"سلام"}}'
+        assert loads(message) == json.loads(message)
+
+
+class TestEarlyFiltering:
+    @pytest.mark.asyncio
+    async def test_unhandled_types_are_dropped_before_decode(self, monkeypatch):
+        client = _client()
+        decoded = []
+        monkeypatch.setattr("core.ari_ws.loads", lambda message: decoded.append(message) or json.loads(message))
+
+        await client._handle_message('{"type":"ChannelVarset","variable":"X","value":"1"}')
+        await client._handle_message('{"type":"StasisEnd","channel":{"id":"c1"}}')
+        await client._handle_message('{"channel":{"id":"c1"},"type":"ChannelDialplan"}')
+
+        assert len(decoded) == 2  # the varset never reached the decoder
+        client.dispatcher.dispatch.assert_awaited_once()
+        stats = client.stats()
+        assert stats["received"] == {"ChannelVarset": 1, "StasisEnd": 1, "ChannelDialplan": 1}
+        assert stats["dropped"] == {"ChannelVarset": 1, "ChannelDialplan": 1}
+        assert stats["dispatched"] == {"StasisEnd": 1}
+
+    @pytest.mark.asyncio
+    async def test_without_event_types_everything_is_dispatched(self):
+        client = _client(event_types=None)
+        await client._handle_message('{"type":"ChannelVarset"}')
+        client.dispatcher.dispatch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_bad_json_is_logged_not_raised(self):
+        client = _client()
+        await client._handle_message('{"type":"StasisStart",')
+        client.dispatcher.dispatch.assert_not_awaited()
+
+
+class TestEventFilterSubscription:
+    @pytest.mark.asyncio
+    async def test_filter_lists_handled_types(self):
+        ari = MagicMock(set_event_filter=AsyncMock())
+        client = _client(ari_client=ari)
+        await client._apply_event_filter()
+        ari.set_event_filter.assert_awaited_once_with(SessionManager.HANDLED_EVENTS)
+
+    @pytest.mark.asyncio
+    async def test_filter_failure_and_opt_out_are_tolerated(self):
+        ari = MagicMock(set_event_filter=AsyncMock(side_effect=RuntimeError("404")))
+        await _client(ari_client=ari)._apply_event_filter()
+
+        ari = MagicMock(set_event_filter=AsyncMock())
+        await _client(ari_client=ari, event_filter=False)._apply_event_filter()
+        ari.set_event_filter.assert_not_awaited()
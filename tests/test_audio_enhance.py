@@ -0,0 +1,77 @@
+"""Tests for the in-process NumPy audio enhancement pipeline."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from config.settings import ViraSettings
+from stt_tts import audio_enhance
+from stt_tts.vira_stt import ViraSTTClient
+
+
+def _clip(rate: int = 8000, seconds: float = 2.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    rng = np.random.default_rng(1)
+    return (0.2 * np.sin(2 * np.pi * 440 * t) + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+class TestEnhanceWav:
+    def test_output_is_16k_mono_same_duration(self):
+        audio = audio_enhance.encode_wav(_clip(), 8000)
+
+        samples, rate = audio_enhance.decode_wav(audio_enhance.enhance_wav(audio))
+
+        assert rate == 16000
+        assert len(samples) == 32000
+
+    def test_peak_respects_ceiling(self):
+        loud = audio_enhance.encode_wav(_clip() * 4, 8000)
+
+        samples, _ = audio_enhance.decode_wav(audio_enhance.enhance_wav(loud))
+
+        assert np.max(np.abs(samples)) <= 10 ** (audio_enhance.PEAK_DBFS / 20) + 1e-3
+
+    def test_spectral_subtract_is_transparent_without_reduction(self):
+        samples = audio_enhance.resample(_clip(), 8000, 16000)
+
+        out = audio_enhance.spectral_subtract(samples, 16000, max_reduction_db=0)
+
+        assert np.allclose(out, samples, atol=1e-5)
+
+    def test_highpass_removes_dc(self):
+        dc = np.full(16000, 0.5, dtype=np.float32)
+
+        out = audio_enhance.apply_biquads(dc, 16000, [("highpass", audio_enhance.HIGHPASS_HZ)])
+
+        assert abs(float(np.mean(out[4000:]))) < 0.01
+
+
+class TestClientBackends:
+    def _client(self, backend: str) -> ViraSTTClient:
+        return ViraSTTClient(ViraSettings("", "", "", "", True, enhance_backend=backend))
+
+    def test_invalid_audio_is_not_enhanced(self, monkeypatch):
+        monkeypatch.setattr(audio_enhance, "enhance_wav_ffmpeg", lambda audio: None)
+
+        assert self._client("numpy")._enhance_audio(b"not a wav") is None
+
+    @pytest.mark.parametrize("backend", ["none", "off"])
+    def test_disabled_backend_skips_enhancement(self, backend):
+        audio = audio_enhance.encode_wav(_clip(), 8000)
+
+        assert self._client(backend)._enhance_audio(audio) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("enhanced,archived", [(None, False), (b"enhanced", True)])
+    async def test_only_enhancer_output_is_audited(self, monkeypatch, enhanced, archived):
+        monkeypatch.setattr(audio_enhance, "enhance_with_backend", lambda audio, backend: enhanced)
+        client = self._client("numpy")
+        client.audit_sink = MagicMock()
+
+        await client.transcribe_audio(b"raw", session_id="s1", phase="interest")
+
+        if archived:
+            client.audit_sink.submit.assert_called_once_with(b"enhanced", session_id="s1", phase="interest")
+        else:
+            client.audit_sink.submit.assert_not_called()
@@ -0,0 +1,44 @@
+"""Tests for the audio DSP process pool."""
+
+import asyncio
+import time
+
+import pytest
+
+from stt_tts import audio_enhance
+from stt_tts.audio_workers import AudioWorkerPool
+
+
+def _slow_job(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+class TestAudioWorkerPool:
+    @pytest.mark.asyncio
+    async def test_runs_dsp_jobs_in_workers(self):
+        pool = AudioWorkerPool(max_workers=1, max_pending=2)
+        try:
+            assert await pool.is_empty_audio(b"") is True
+            silence = audio_enhance.encode_wav(audio_enhance.np.zeros(8000), 8000)
+            assert await pool.is_empty_audio(silence) is True
+            resampled = await pool.resample(silence, 16000)
+            _, rate = audio_enhance.decode_wav(resampled)
+            assert rate == 16000
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_back_pressure_caps_admitted_jobs(self):
+        pool = AudioWorkerPool(max_workers=1, max_pending=1)
+        try:
+            tasks = [asyncio.create_task(pool.run(_slow_job, 0.2)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            assert pool.in_flight == 1
+            assert pool.waiting == 2
+            assert pool.queue_depth == 3
+            await asyncio.gather(*tasks)
+            assert pool.queue_depth == 0
+            assert pool.stats()["max_depth"] == 3
+        finally:
+            await pool.close()
@@ -0,0 +1,56 @@
+"""Tests for the background enhanced-audio audit writer."""
+
+import os
+import time
+
+import pytest
+
+from config.settings import AuditSettings
+from stt_tts.audit_sink import AuditSink
+
+
+def _settings(tmp_path, **overrides) -> AuditSettings:
+    values = dict(
+        directory=str(tmp_path),
+        sample_rate=1.0,
+        queue_size=4,
+        max_bytes=0,
+        max_age_hours=0,
+    )
+    values.update(overrides)
+    return AuditSettings(**values)
+
+
+class TestAuditSink:
+    @pytest.mark.asyncio
+    async def test_writes_session_phase_names_and_drops_when_full(self, tmp_path):
+        sink = AuditSink(_settings(tmp_path, queue_size=2))
+
+        assert sink.submit(b"one", session_id="abc", phase="interest")
+        assert sink.submit(b"two", session_id="abc", phase="interest")
+        assert not sink.submit(b"three", session_id="abc", phase="interest")
+        await sink.close()
+
+        names = sorted(p.name for p in tmp_path.iterdir())
+        assert names == ["abc-interest.wav", "abc-interest~2.wav"]
+        assert sink.stats()["dropped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sampling_zero_disables(self, tmp_path):
+        sink = AuditSink(_settings(tmp_path, sample_rate=0))
+
+        assert not sink.submit(b"audio", session_id="abc", phase="p")
+        await sink.close()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_prune_by_age_then_size(self, tmp_path):
+        now = time.time()
+        for idx, age_hours in enumerate([50, 3, 2, 1]):
+            path = tmp_path / f"s{idx}-p.wav"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (now - age_hours * 3600, now - age_hours * 3600))
+        sink = AuditSink(_settings(tmp_path, max_age_hours=24, max_bytes=200))
+
+        assert sink.prune() == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["s2-p.wav", "s3-p.wav"]
@@ -0,0 +1,155 @@
+"""Tests for the event-driven dialer scheduler."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.dialer import ContactItem, Dialer
+
+
+def _dialer(dialer_settings, **overrides) -> Dialer:
+    return Dialer(dialer_settings(**overrides), AsyncMock(), MagicMock())
+
+
+def _fake_originate(dialer: Dialer, started: list):
+    async def originate(contact, line):
+        dialer.session_line[contact.phone_number] = line
+        started.append((contact.phone_number, time.monotonic()))
+
+    return originate
+
+
+class TestNextEligibleTime:
+    def test_per_line_spacing_and_minute_window(self, dialer_settings):
+        dialer = _dialer(dialer_settings, max_calls_per_minute=2)
+        limits = dialer.line_limits.get("02100000001")
+        assert dialer._next_line_delay() == 0.0
+
+        limits["spacing"].events.append(time.monotonic() - 0.25)
+        dialer.line_selector.touch("02100000001")
+        assert 0.7 < dialer._next_line_delay() <= 0.75
+
+        limits["spacing"].events.clear()
+        limits["minute"].events.extend([time.monotonic() - 50, time.monotonic()])
+        dialer.line_selector.touch("02100000001")
+        assert 9.5 < dialer._next_line_delay() <= 10.0
+
+        dialer.line_stats["02100000001"]["active"] = 1
+        dialer.line_selector.touch("02100000001")
+        assert dialer._next_line_delay() is None
+
+    def test_zero_limit_blocks_until_an_event(self, dialer_settings):
+        dialer = _dialer(dialer_settings, max_calls_per_minute=0)
+        assert dialer._next_line_delay() is None
+
+    def test_global_originations_per_second(self, dialer_settings):
+        dialer = _dialer(dialer_settings, outbound_numbers=["1", "2", "3"], max_originations_per_second=2)
+        dialer._record_attempt()
+        assert dialer._next_line_delay() == 0.0
+        dialer._record_attempt()
+        # Bucket of 2 tokens refilling at 2/s: the next token is 0.5 s away.
+        assert 0.45 < dialer._next_line_delay() <= 0.5
+
+
+class TestWakeups:
+    @pytest.mark.asyncio
+    async def test_freed_line_and_new_contacts_wake_the_loop(self, dialer_settings):
+        dialer = _dialer(dialer_settings)
+        started = []
+        dialer._originate = _fake_originate(dialer, started)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(dialer.run(stop))
+        try:
+            await dialer.add_contacts(["09120000001", "09120000002"])
+            await asyncio.sleep(0.05)
+            assert [number for number, _ in started] == ["09120000001"]
+
+            # Past the 1 s per-line spacing, only the busy line blocks the second contact.
+            dialer.line_limits.get("02100000001")["spacing"].events.clear()
+            freed_at = time.monotonic()
+            await dialer.on_session_completed("09120000001")
+            await asyncio.sleep(0.05)
+            assert [number for number, _ in started][1] == "09120000002"
+            assert started[1][1] - freed_at < 0.05
+            assert dialer.wakeups.get("signal") >= 1
+        finally:
+            stop.set()
+            await asyncio.wait_for(runner, 1)
+
+
+def _ari_dialer(dialer_settings, latency: float, fail: bool = False, **overrides):
+    dialer = _dialer(dialer_settings, **overrides)
+    counter = {"sessions": 0, "inflight": 0, "peak": 0}
+
+    async def create_outbound_session(contact_number, metadata):
+        counter["sessions"] += 1
+        return SimpleNamespace(session_id=f"s{counter['sessions']}")
+
+    async def originate_call(**_):
+        counter["inflight"] += 1
+        counter["peak"] = max(counter["peak"], counter["inflight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            counter["inflight"] -= 1
+        if fail:
+            raise RuntimeError("ari down")
+        return {}
+
+    dialer.session_manager.create_outbound_session = create_outbound_session
+    dialer.ari_client.originate_call = originate_call
+    dialer._schedule_timeout_watch = MagicMock()
+    return dialer, counter
+
+
+class TestConcurrentOrigination:
+    @pytest.mark.asyncio
+    async def test_originations_overlap_up_to_inflight_cap(self, dialer_settings):
+        dialer, counter = _ari_dialer(
+            dialer_settings, 0.2, outbound_numbers=[str(n) for n in range(6)], max_inflight_originations=4,
+        )
+        stop = asyncio.Event()
+        runner = asyncio.create_task(dialer.run(stop))
+        try:
+            await dialer.add_contacts([f"0912000000{n}" for n in range(6)])
+            await asyncio.sleep(0.05)
+            # Without the pool each 200 ms ARI round-trip would serialise these.
+            assert counter["peak"] == 4
+            assert len(dialer.inflight_originations) == 4
+            # Capacity is held before the ARI request returns.
+            assert sum(stats["active"] for stats in dialer.line_stats.values()) == 4
+            await asyncio.sleep(0.25)
+            assert counter["sessions"] == 6
+        finally:
+            stop.set()
+            await asyncio.wait_for(runner, 1)
+
+    @pytest.mark.asyncio
+    async def test_reserved_line_is_not_handed_out_twice(self, dialer_settings):
+        dialer, counter = _ari_dialer(dialer_settings, 0.2, max_inflight_originations=4)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(dialer.run(stop))
+        try:
+            await dialer.add_contacts(["09120000001", "09120000002"])
+            await asyncio.sleep(0.05)
+            assert counter["sessions"] == 1
+            assert len(dialer.contacts) == 1
+        finally:
+            stop.set()
+            await asyncio.wait_for(runner, 1)
+
+    @pytest.mark.asyncio
+    async def test_failed_originate_releases_the_line(self, dialer_settings):
+        dialer, _ = _ari_dialer(dialer_settings, 0.0, fail=True)
+        line = dialer._reserve_line()
+        assert dialer.line_stats[line]["active"] == 1
+
+        await dialer._originate(ContactItem(phone_number="09120000001"), line)
+
+        assert dialer.line_stats[line]["active"] == 0
+        assert dialer.session_line == {}
+        # The attempt still counts toward pacing.
+        assert dialer.line_limits.get(line)["minute"].count() == 1
@@ -0,0 +1,166 @@
+"""Tests for ordered, bounded ARI event dispatch."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.event_dispatcher import EventDispatcher, event_key
+from sessions.session import CallLeg, LegDirection, LegState, Session
+
+
+def _event(kind: str, channel: str, n: int = 0) -> dict:
+    return {"type": kind, "channel": {"id": channel}, "n": n}
+
+
+class TestEventKey:
+    def test_keys_follow_the_channel(self):
+        assert event_key(_event("StasisEnd", "c1")) == "c1"
+        assert event_key({"type": "Dial", "peer": {"id": "c2"}}) == "c2"
+        assert event_key({"type": "PlaybackFinished", "playback": {"id": "p", "target_uri": "channel:c3"}}) == "c3"
+        assert event_key({"type": "RecordingFinished", "recording": {"target_uri": "bridge:b1"}}) == "bridge:b1"
+        assert event_key({"type": "ApplicationReplaced"}) is None
+
+
+class TestEventDispatcher:
+    @pytest.mark.asyncio
+    async def test_same_channel_in_order_other_channels_in_parallel(self):
+        seen = []
+        slow_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def handler(event):
+            if event["type"] == "PlaybackFinished" and event["channel"]["id"] == "a":
+                slow_started.set()
+                await release.wait()
+            seen.append((event["channel"]["id"], event["type"]))
+
+        dispatcher = EventDispatcher(handler, workers=4)
+        try:
+            for kind in ("PlaybackFinished", "ChannelHangupRequest", "StasisEnd"):
+                await dispatcher.dispatch(_event(kind, "a"))
+            await slow_started.wait()
+            # Find a channel on another lane; it must not wait behind "a".
+            lane_a = dispatcher._index(_event("x", "a"))
+            other = next(c for c in "bcdefgh" if dispatcher._index(_event("x", c)) != lane_a)
+            await dispatcher.dispatch(_event("StasisEnd", other))
+            for _ in range(10):
+                await asyncio.sleep(0)
+            assert seen == [(other, "StasisEnd")]
+
+            release.set()
+            await dispatcher.join()
+            assert [kind for channel, kind in seen if channel == "a"] == [
+                "PlaybackFinished", "ChannelHangupRequest", "StasisEnd",
+            ]
+            assert dispatcher.stats()["counters"]["dispatched"] == 4
+        finally:
+            await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_do_not_stop_the_lane(self):
+        seen = []
+
+        async def handler(event):
+            if event["n"] == 0:
+                raise RuntimeError("boom")
+            seen.append(event["n"])
+
+        dispatcher = EventDispatcher(handler, workers=1)
+        try:
+            await dispatcher.dispatch(_event("x", "a", 0))
+            await dispatcher.dispatch(_event("x", "a", 1))
+            await dispatcher.join()
+            assert seen == [1]
+            assert dispatcher.counters.get("errors") == 1
+        finally:
+            await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy,handled", [("drop", [0, 1]), ("spawn", [0, 1, 2])])
+    async def test_overflow_policies(self, policy, handled):
+        seen = []
+        release = asyncio.Event()
+
+        async def handler(event):
+            if event["n"] == 0:
+                await release.wait()
+            seen.append(event["n"])
+
+        dispatcher = EventDispatcher(handler, workers=1, queue_size=1, overflow=policy)
+        try:
+            await dispatcher.dispatch(_event("x", "a", 0))
+            await asyncio.sleep(0)  # worker takes event 0 and blocks
+            await dispatcher.dispatch(_event("x", "a", 1))  # fills the lane
+            await dispatcher.dispatch(_event("x", "a", 2))  # overflows
+            assert dispatcher.counters.get("overflow") == 1
+            release.set()
+            await dispatcher.join()
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert sorted(seen) == handled
+        finally:
+            await dispatcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_block_policy_waits_for_room(self):
+        release = asyncio.Event()
+
+        async def handler(event):
+            await release.wait()
+
+        dispatcher = EventDispatcher(handler, workers=1, queue_size=1)
+        try:
+            await dispatcher.dispatch(_event("x", "a", 0))
+            await asyncio.sleep(0)
+            await dispatcher.dispatch(_event("x", "a", 1))
+            blocked = asyncio.create_task(dispatcher.dispatch(_event("x", "a", 2)))
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+            release.set()
+            await asyncio.wait_for(blocked, 1)
+            await dispatcher.join()
+            assert dispatcher.counters.get("dispatched") == 3
+        finally:
+            await dispatcher.stop()
+
+    def test_unknown_policy_is_rejected(self):
+        with pytest.raises(ValueError):
+            EventDispatcher(lambda event: None, overflow="ignore")
+
+
+class TestOperatorConnectOffLane:
+    @pytest.mark.asyncio
+    async def test_waiting_for_an_operator_line_does_not_hold_the_lane(self, flow_engine):
+        engine = flow_engine(stt=MagicMock())
+        engine.settings.operator.timeout = 5
+        engine.inbound_agents = [{"phone_number": "09121111111", "id": 1}]
+
+        # Every line is busy until call "b" ends and frees one.
+        line_free = asyncio.Event()
+        dialer = MagicMock(operator_priority_requests=0)
+        dialer._reserve_line = MagicMock(side_effect=lambda: "02100000001" if line_free.is_set() else None)
+        dialer.on_session_completed = AsyncMock(side_effect=lambda session_id: line_free.set())
+        engine.attach_dialer(dialer)
+
+        caller = Session("a")
+        caller.inbound_leg = CallLeg(channel_id="a", direction=LegDirection.INBOUND, endpoint="0936", state=LegState.ANSWERED)
+
+        async def handler(event):
+            if event["type"] == "StasisStart":
+                await engine.on_inbound_channel_created(caller)
+            else:
+                await dialer.on_session_completed(event["channel"]["id"])
+
+        dispatcher = EventDispatcher(handler, workers=1)  # both calls share the lane
+        try:
+            await dispatcher.dispatch(_event("StasisStart", "a"))
+            await dispatcher.dispatch(_event("StasisEnd", "b"))
+            await asyncio.wait_for(dispatcher.join(), 1)
+            dialer.on_session_completed.assert_awaited_once_with("b")
+
+            await asyncio.wait_for(asyncio.gather(*engine.operator_tasks), 1)
+            endpoint = engine.ari_client.originate_call.await_args.kwargs["endpoint"]
+            assert endpoint.startswith("PJSIP/09121111111@")
+        finally:
+            await dispatcher.stop()
@@ -0,0 +1,73 @@
+"""Tests for transcript normalization and the intent cache."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from config.flow_definition import ScenarioConfig
+from llm.intent_cache import IntentCache, cache_key
+from utils.text_normalize import normalize_persian
+
+
+class TestNormalizePersian:
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("نه‌ ممنون", "نه ممنون"),
+            ("  كجا   هستيد؟ ", "کجا هستید"),
+            ("شماره منو از کجا آوردین!", "شماره منو از کجا اوردین"),
+            ("حتماً ۱۲", "حتما 12"),
+        ],
+    )
+    def test_variants_fold_together(self, raw, expected):
+        assert normalize_persian(raw) == expected
+
+
+class TestIntentCache:
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_ttl(self, monkeypatch):
+        cache = IntentCache(max_entries=2, ttl_seconds=10)
+        await cache.put("a", "yes")
+        await cache.put("b", "no")
+        assert await cache.get("a") == "yes"
+        await cache.put("c", "no")  # evicts "b", the least recently used
+
+        assert await cache.get("b") is None
+        now = time.time()
+        monkeypatch.setattr("llm.intent_cache.time.time", lambda: now + 11)
+        assert await cache.get("a") is None
+        assert cache.stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "intents.sqlite")
+        first = IntentCache(path=path)
+        await first.put("salehi|abc|نه ممنون", "no")
+        first.close()
+
+        second = IntentCache(path=path)
+        try:
+            assert await second.get("salehi|abc|نه ممنون") == "no"
+            assert second.stats()["disk_hits"] == 1
+        finally:
+            second.close()
+
+
+class TestDetectIntentCache:
+    @pytest.mark.asyncio
+    async def test_normalized_repeats_skip_llm(self, flow_engine):
+        llm = MagicMock()
+        llm.api_key = "key"
+        llm.chat = AsyncMock(return_value="no")
+        engine = flow_engine(llm=llm, intent_cache=IntentCache())
+        scenario = ScenarioConfig(name="salehi")
+
+        assert await engine._detect_intent("نه ممنون", scenario) == "no"
+        assert await engine._detect_intent("نه‌ ممنون،", scenario) == "no"
+
+        assert llm.chat.await_count == 1
+        assert engine.intent_cache.stats()["hits"] == 1
+
+    def test_key_changes_with_prompt(self):
+        assert cache_key("s", "h1", "نه") != cache_key("s", "h2", "نه")
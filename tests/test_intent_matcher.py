@@ -0,0 +1,69 @@
+"""Tests for the compiled fallback-token matcher."""
+
+import pytest
+
+from config.flow_definition import ScenarioConfig
+from logic.intent_matcher import YES_FAST_PATH, IntentMatcher
+from logic.marketing_outreach import _YES_FAST_PATH as MARKETING_YES_FAST_PATH
+from logic.scenario_registry import ScenarioRegistry
+
+
+FALLBACK = {
+    "yes": ["بله", "آره", "کجا هستید"],
+    "no": ["نه", "نمیخوام", "ممنون"],
+    "number_question": ["شماره منو از کجا"],
+}
+
+
+class TestIntentMatcher:
+    def test_short_tokens_need_word_boundaries(self):
+        matcher = IntentMatcher.from_fallback_tokens(FALLBACK)
+        assert matcher.match("خونه نیستم") is None
+        assert matcher.match("نه، نمی‌تونم") == "no"
+        assert YES_FAST_PATH.match("به این اشاره کردم") is None
+        assert YES_FAST_PATH.match("آره.") == "yes"
+
+    @pytest.mark.parametrize("transcript", ["بله‌ام", "بله‌ام میخوام", "آره‌"])
+    def test_zwnj_joined_yes_hits_fast_paths(self, transcript):
+        assert YES_FAST_PATH.match(transcript) == "yes"
+        assert MARKETING_YES_FAST_PATH.match(transcript) == "yes"
+
+    def test_zwnj_tokens_match_either_spelling(self):
+        matcher = IntentMatcher({"no": ["نمی‌خوام"]})
+        assert matcher.match("نمی‌خوام") == "no"
+        assert matcher.match("نمیخوام") == "no"
+
+    def test_priority_and_normalization(self):
+        matcher = IntentMatcher.from_fallback_tokens(FALLBACK)
+        assert matcher.match("ممنون، بله") == "yes"
+        assert matcher.match("شماره منو از كجا آوردین") == "number_question"
+        assert matcher.match("ممنون شماره منو از کجا اوردین") == "no"
+
+    def test_overlapping_patterns(self):
+        matcher = IntentMatcher({"a": ["abcd"], "b": ["bc", "cde"]}, priority=["a", "b"], whole_word_max_len=0)
+        assert matcher.match("xbcdex") == "b"
+        assert matcher.match("xabcdx") == "a"
+        assert matcher.match("xyz") is None
+
+
+class TestRegistryMatcher:
+    @pytest.mark.asyncio
+    async def test_detect_intent_uses_compiled_fallback(self, flow_engine):
+        scenario = ScenarioConfig(name="salehi")
+        scenario.llm.fallback_tokens = FALLBACK
+        engine = flow_engine()
+        registry = engine.registry
+
+        assert await engine._detect_intent("نه‌ ممنون", scenario) == "no"
+        assert await engine._detect_intent("خونه نیستم", scenario) == "unknown"
+        assert registry.get_matcher(scenario) is registry.get_matcher(scenario)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("transcript, intent", [("نه‌خیر", "no"), ("بله‌ام", "yes")])
+    async def test_zwnj_joined_answers_with_bundled_scenarios(self, flow_engine, transcript, intent):
+        registry = ScenarioRegistry("config/scenarios")
+        engine = flow_engine(registry=registry)
+
+        for scenario in registry.get_all().values():
+            assert registry.get_matcher(scenario).match(transcript) == intent
+            assert await engine._detect_intent(transcript, scenario) == intent
@@ -0,0 +1,81 @@
+"""Tests for the heap-indexed outbound line selector."""
+
+from logic.line_selector import LineSelector
+
+
+class FakeLines:
+    """line -> [delay, load]; delay None = blocked."""
+
+    def __init__(self, **lines):
+        self.state = {name: list(value) for name, value in lines.items()}
+        self.now = 0.0
+
+    def evaluate(self, line):
+        delay, load = self.state[line]
+        return delay, load
+
+    def clock(self):
+        return self.now
+
+
+def _selector(lines: FakeLines) -> LineSelector:
+    selector = LineSelector(lines.evaluate, clock=lines.clock)
+    selector.reset(lines.state)
+    return selector
+
+
+class TestLineSelector:
+    def test_picks_least_loaded_ready_line(self):
+        lines = FakeLines(a=(0.0, (1, 0, 0)), b=(0.0, (0, 5, 9)), c=(None, (0, 0, 0)))
+        selector = _selector(lines)
+        assert selector.pick() == "b"
+
+        lines.state["b"][1] = (2, 0, 0)
+        selector.touch("b")
+        assert selector.pick() == "a"
+
+    def test_blocked_lines_return_only_when_touched(self):
+        lines = FakeLines(a=(None, (0, 0, 0)))
+        selector = _selector(lines)
+        assert selector.pick() is None
+        assert selector.next_delay() is None
+
+        lines.state["a"][0] = 0.0
+        assert selector.pick() is None
+        selector.touch("a")
+        assert selector.pick() == "a"
+
+    def test_rate_limited_line_is_promoted_when_due(self):
+        lines = FakeLines(a=(1.0, (0, 1, 1)))
+        selector = _selector(lines)
+        assert selector.pick() is None
+        assert selector.next_delay() == 1.0
+
+        lines.now = 1.0
+        lines.state["a"][0] = 0.0
+        assert selector.next_delay() == 0.0
+        assert selector.pick() == "a"
+
+    def test_stale_top_entry_is_re_evaluated(self):
+        lines = FakeLines(a=(0.0, (0, 0, 0)), b=(0.0, (1, 0, 0)))
+        selector = _selector(lines)
+        # "a" became busy without a touch: pick must not hand it out.
+        lines.state["a"][0] = None
+        assert selector.pick() == "b"
+
+    def test_removed_and_reset_lines(self):
+        lines = FakeLines(a=(0.0, (0, 0, 0)), b=(0.0, (1, 0, 0)))
+        selector = _selector(lines)
+        selector.remove("a")
+        assert selector.pick() == "b"
+        selector.reset(["a"])
+        assert len(selector) == 1
+        assert selector.pick() == "a"
+
+    def test_stale_entries_are_compacted(self):
+        lines = FakeLines(a=(0.0, (0, 0, 0)))
+        selector = _selector(lines)
+        for _ in range(1000):
+            selector.touch("a")
+        assert len(selector._ready) <= 4 * len(selector) + 64
+        assert selector.pick() == "a"
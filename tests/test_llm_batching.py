@@ -0,0 +1,67 @@
+"""Tests for micro-batched intent classification."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from llm.client import ChatBatcher
+
+
+def _client(reply):
+    client = MagicMock()
+    client.chat = AsyncMock(side_effect=reply)
+    return client
+
+
+class TestChatBatcher:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self):
+        async def reply(messages, **_):
+            content = messages[0]["content"]
+            return json.dumps(["yes" if "بله" in line else "no" for line in content.splitlines() if line[:1].isdigit()])
+
+        client = _client(reply)
+        batcher = ChatBatcher(client, window_ms=20)
+        results = await asyncio.gather(
+            batcher.classify("rules", "بله", "rules: بله"),
+            batcher.classify("rules", "نه ممنون", "rules: نه ممنون"),
+            batcher.classify("rules", "بله حتما", "rules: بله حتما"),
+        )
+
+        assert results == ["yes", "no", "yes"]
+        assert client.chat.await_count == 1
+        stats = batcher.stats()
+        assert stats["requests_saved"] == 2
+        assert stats["queue_delay"]["count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_lone_call_sends_single_prompt(self):
+        client = _client(["no"])
+        batcher = ChatBatcher(client, window_ms=5)
+        assert await batcher.classify("rules", "نه", "rules: نه") == "no"
+        assert client.chat.await_args.kwargs["messages"][0]["content"] == "rules: نه"
+
+    @pytest.mark.asyncio
+    async def test_unparseable_reply_falls_back_to_singles(self):
+        client = _client(["yes, no", "yes", "no"])
+        batcher = ChatBatcher(client, window_ms=50, max_items=2)
+        results = await asyncio.gather(
+            batcher.classify("rules", "a", "single a"),
+            batcher.classify("rules", "b", "single b"),
+        )
+        assert results == ["yes", "no"]
+        assert client.chat.await_count == 3
+        assert batcher.stats()["parse_fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        client = _client(RuntimeError("403 quota"))
+        batcher = ChatBatcher(client, window_ms=5)
+        results = await asyncio.gather(
+            batcher.classify("rules", "a", "single a"),
+            batcher.classify("rules", "b", "single b"),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,86 @@
+"""Tests for streamed LLM replies and early intent resolution."""
+
+import json
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from config.flow_definition import ScenarioConfig
+from config.settings import GapGPTSettings
+from llm.client import GapGPTClient
+
+
+def _sse(*chunks):
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in chunks]
+    return "".join(lines) + "data: [DONE]\n\n"
+
+
+def _client(handler):
+    client = GapGPTClient(GapGPTSettings(base_url="http://llm.test/v1", api_key="key"))
+    client.client = httpx.AsyncClient(base_url="http://llm.test/v1", transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestChatStream:
+    @pytest.mark.asyncio
+    async def test_sse_deltas_and_json_fallback(self):
+        bodies = [
+            (_sse("ye", "s", "."), "text/event-stream"),
+            (json.dumps({"choices": [{"message": {"content": "no"}}]}), "application/json"),
+        ]
+
+        def handler(request):
+            assert json.loads(request.content)["stream"] is True
+            body, content_type = bodies.pop(0)
+            return httpx.Response(200, text=body, headers={"content-type": content_type})
+
+        client = _client(handler)
+        try:
+            assert [c async for c in client.chat_stream([{"role": "user", "content": "q"}])] == ["ye", "s", "."]
+            assert [c async for c in client.chat_stream([{"role": "user", "content": "q"}])] == ["no"]
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_http_errors_raise(self):
+        client = _client(lambda request: httpx.Response(403, text="quota exceeded"))
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                async for _ in client.chat_stream([{"role": "user", "content": "q"}]):
+                    pass
+        finally:
+            await client.close()
+
+
+class TestEarlyIntent:
+    def _engine(self, flow_engine, chunks, state):
+        async def chat_stream(**_):
+            try:
+                for chunk in chunks:
+                    state["read"] += 1
+                    yield chunk
+            finally:
+                state["closed"] = True
+
+        llm = MagicMock()
+        llm.api_key = "key"
+        llm.chat_stream = chat_stream
+        engine = flow_engine(llm=llm)
+        engine.settings.gapgpt.stream = True
+        return engine
+
+    @pytest.mark.asyncio
+    async def test_resolves_on_first_complete_word(self, flow_engine):
+        state = {"read": 0, "closed": False}
+        engine = self._engine(flow_engine, ["n", "o", " -", " the caller declines", " politely"], state)
+        assert await engine._detect_intent("نمیدونم والا", ScenarioConfig(name="salehi")) == "no"
+        assert state == {"read": 3, "closed": True}
+
+    @pytest.mark.asyncio
+    async def test_waits_for_word_boundary(self, flow_engine):
+        state = {"read": 0, "closed": False}
+        engine = self._engine(flow_engine, ["no", "t sure"], state)
+        # "no" could still become "not"; without a label the token fallback decides.
+        assert await engine._detect_intent("نمیدونم والا", ScenarioConfig(name="salehi")) == "unknown"
+        assert state["read"] == 2
@@ -0,0 +1,86 @@
+"""Tests for the on-box intent classifier tier."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from config.flow_definition import ScenarioConfig
+from llm.local_classifier import LocalIntentClassifier, evaluate, load_labeled_logs, split_holdout
+
+
+SAMPLES = [
+    ("نه ممنون", "no"), ("نه نمیخوام", "no"), ("نیازی ندارم", "no"), ("علاقه ای ندارم ممنون", "no"),
+    ("نمیخوام مزاحم نشید", "no"), ("فعلا نیاز ندارم", "no"),
+    ("بله بفرمایید", "yes"), ("قیمتش چنده", "yes"), ("کجا هستید", "yes"), ("در خدمتم بفرمایید", "yes"),
+    ("اوکی بگید", "yes"), ("سایت دارین", "yes"),
+    ("شماره منو از کجا اوردین", "number_question"), ("شماره منو از کجا دارین", "number_question"),
+    ("از کجا شمارمو دارید", "number_question"), ("شماره من از کجا", "number_question"),
+]
+
+
+def _write_logs(log_dir):
+    (log_dir / "positive_stt.log").write_text(
+        "2026-01-01 10:00:00,000 [INFO] session=a transcript=بله بفرمایید\n", encoding="utf-8"
+    )
+    (log_dir / "negative_stt.log.1").write_text(
+        "2026-01-01 10:00:00,000 [INFO] session=b phase=interest transcript=نه ممنون\n", encoding="utf-8"
+    )
+    (log_dir / "unknown_stt.log").write_text(
+        "2026-01-01 10:00:00,000 [INFO] session=c intent=number_question transcript=شماره منو از کجا\n"
+        "2026-01-01 10:00:01,000 [INFO] session=d phase=interest transcript=الو\n"
+        "2026-01-01 10:00:02,000 [INFO] session=e intent=unknown transcript=\n",
+        encoding="utf-8",
+    )
+
+
+class TestLocalIntentClassifier:
+    def test_load_labeled_logs(self, tmp_path):
+        _write_logs(tmp_path)
+        assert sorted(load_labeled_logs(str(tmp_path))) == sorted([
+            ("بله بفرمایید", "yes"),
+            ("نه ممنون", "no"),
+            ("شماره منو از کجا", "number_question"),
+            ("الو", "unknown"),
+        ])
+
+    def test_fit_predict_and_roundtrip(self, tmp_path):
+        model = LocalIntentClassifier().fit(SAMPLES, epochs=150)
+        assert model.predict("نه، ممنون")[0] == "no"
+        assert model.predict("شماره مرا از کجا اوردین")[0] == "number_question"
+
+        path = str(tmp_path / "model.npz")
+        model.save(path)
+        loaded = LocalIntentClassifier.load(path)
+        assert loaded.predict("قیمتش چنده") == pytest.approx(model.predict("قیمتش چنده"))
+
+        report = evaluate(loaded, SAMPLES)
+        assert report["accuracy"] == 1.0
+        assert report["latency_us_p50"] > 0
+
+    def test_holdout_keeps_repeats_together(self):
+        variants = [("نه ممنون", "no"), ("نه‌ ممنون،", "no")]
+        for fraction in (0.2, 0.5):
+            train, test = split_holdout(SAMPLES + variants, fraction)
+            assert sum(v in test for v in variants) in (0, 2)
+            assert len(train) + len(test) == len(SAMPLES) + 2
+
+
+class TestDetectIntentLocalTier:
+    @pytest.mark.asyncio
+    async def test_confident_answers_skip_llm(self, flow_engine):
+        llm = MagicMock()
+        llm.api_key = "key"
+        llm.chat = AsyncMock(return_value="yes")
+        classifier = MagicMock()
+        engine = flow_engine(llm=llm, local_classifier=classifier)
+        scenario = ScenarioConfig(name="salehi")
+        scenario.llm.local_threshold = 0.8
+
+        classifier.predict.return_value = ("no", 0.95)
+        assert await engine._detect_intent("نیازی ندارم", scenario) == "no"
+        assert llm.chat.await_count == 0
+
+        classifier.predict.return_value = ("no", 0.6)
+        assert await engine._detect_intent("نمیدونم والا", scenario) == "yes"
+        assert llm.chat.await_count == 1
+        assert engine.stats()["intent_sources"] == {"local": 1, "local_escalated": 1}
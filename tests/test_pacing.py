@@ -0,0 +1,144 @@
+"""Tests for predictive pacing against free outbound agents."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from config.settings import PacingSettings
+from logic.dialer import Dialer
+from logic.pacing import PredictivePacer, expected_overflow_ratio, max_transfer_mean
+
+
+def _pacer(clock, load=(1, 0), min_samples=10, target_abandon=0.03):
+    state = {"load": load}
+    settings = PacingSettings(enabled=True, target_abandon=target_abandon, window=100, min_samples=min_samples)
+    return PredictivePacer(settings, lambda: state["load"], clock=clock), state
+
+
+def _learn(pacer, clock, calls: int, answered_every: int, transferred_every: int) -> None:
+    """Feed completed calls: every Nth answers, every Mth answered call transfers."""
+    answered = 0
+    for n in range(calls):
+        sid = f"warm-{n}"
+        pacer.on_originated(sid)
+        clock.now += 10
+        if n % answered_every == 0:
+            pacer.on_answered(sid)
+            answered += 1
+            clock.now += 20
+            if answered % transferred_every == 0:
+                pacer.on_transfer(sid)
+                clock.now += 120
+        pacer.on_finished(sid)
+
+
+class TestOverflowMath:
+    def test_overflow_ratio_grows_with_load(self):
+        assert expected_overflow_ratio(0, 3) == 0.0
+        ratios = [expected_overflow_ratio(mean, 3) for mean in (0.5, 1, 2, 4, 8)]
+        assert ratios == sorted(ratios)
+        assert expected_overflow_ratio(100, 3) > 0.9
+
+    def test_budget_respects_target_and_scales_with_agents(self):
+        assert max_transfer_mean(0, 0.03) == 0.0
+        for agents in (1, 5, 20):
+            budget = max_transfer_mean(agents, 0.03)
+            assert expected_overflow_ratio(budget, agents) == pytest.approx(0.03, abs=1e-3)
+        assert max_transfer_mean(5, 0.1) > max_transfer_mean(5, 0.03)
+        assert max_transfer_mean(20, 0.03) > max_transfer_mean(5, 0.03)
+
+
+class TestPredictivePacer:
+    def test_cold_start_keeps_one_call_per_free_agent_at_most(self, clock):
+        pacer, state = _pacer(clock, load=(1, 0))
+        assert pacer.allow()
+        pacer.reserve()
+        assert not pacer.allow()
+        pacer.on_originated("s1")
+        pacer.on_finished("s1")
+        assert pacer.allow()
+
+        state["load"] = (0, 1)
+        assert not pacer.allow()
+
+    def test_learned_rates_allow_overdialing(self, clock):
+        pacer, state = _pacer(clock, load=(5, 0))
+        _learn(pacer, clock, calls=50, answered_every=5, transferred_every=2)
+        answer_rate, transfer_rate = pacer.rates()
+        assert answer_rate == pytest.approx(0.2)
+        assert transfer_rate == pytest.approx(0.5)
+        assert pacer.ring_time.mean() == 10
+        assert pacer.talk_time.mean() == 20
+        assert pacer.handle_time.mean() == 120
+
+        in_flight = 0
+        while pacer.allow():
+            pacer.on_originated(f"live-{in_flight}")
+            in_flight += 1
+        # Budget for 5 agents at 3 % abandon is ~2.65 transfers; each call yields 0.1.
+        assert 20 <= in_flight <= 27
+
+        # Answered calls are likelier to transfer, so they use more of the budget.
+        for n in range(10):
+            pacer.on_answered(f"live-{n}")
+        assert pacer.expected_transfers() > 2.65
+        assert not pacer.allow()
+
+    def test_busy_agents_due_back_count_as_available(self, clock):
+        pacer, _ = _pacer(clock)
+        _learn(pacer, clock, calls=20, answered_every=1, transferred_every=1)
+        # time to transfer 30 s vs handle time 120 s: a quarter of busy agents count.
+        assert pacer.available_agents(free=1, busy=8) == 3
+
+    def test_without_roster_pacing_is_off(self, clock):
+        pacer, state = _pacer(clock, load=None)
+        for n in range(100):
+            pacer.reserve()
+        assert pacer.allow()
+        assert pacer.decisions.get("unpaced") == 1
+
+    def test_discard_forgets_failed_originations(self, clock):
+        pacer, _ = _pacer(clock)
+        pacer.reserve()
+        pacer.discard()
+        pacer.reserve()
+        pacer.on_originated("s1")
+        pacer.discard("s1")
+        assert pacer.pending == 0 and not pacer.pipeline
+        assert len(pacer.answered) == 0
+
+
+class TestDialerPacing:
+    @pytest.mark.asyncio
+    async def test_dialer_holds_until_an_agent_frees(self, clock, dialer_settings):
+        pacer, state = _pacer(clock, load=(0, 1))
+        settings = dialer_settings(
+            outbound_numbers=["1", "2"], max_concurrent_calls=5, max_calls_per_minute=100, max_inflight_originations=4,
+        )
+        sessions = MagicMock()
+        sessions.create_outbound_session = AsyncMock(side_effect=[SimpleNamespace(session_id=f"s{n}") for n in range(5)])
+        sessions.register_protocol_id = AsyncMock()
+        ari = MagicMock()
+        ari.originate_call = AsyncMock(return_value={})
+        dialer = Dialer(settings, ari, sessions, pacer=pacer)
+        dialer._schedule_timeout_watch = MagicMock()
+        stop = asyncio.Event()
+        runner = asyncio.create_task(dialer.run(stop))
+        try:
+            await dialer.add_contacts(["0912000001", "0912000002"])
+            await asyncio.sleep(0.05)
+            assert sessions.create_outbound_session.await_count == 0
+            assert pacer.decisions.get("hold") >= 1
+
+            state["load"] = (1, 0)
+            await dialer.on_session_completed("agent-call")
+            await asyncio.sleep(0.05)
+            # Cold start: one call in flight for the single free agent.
+            assert sessions.create_outbound_session.await_count == 1
+            assert list(pacer.pipeline) == ["s0"]
+            assert dialer.stats()["pacing"]["in_flight"] == 1
+        finally:
+            stop.set()
+            await asyncio.wait_for(runner, 1)
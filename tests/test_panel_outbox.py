@@ -0,0 +1,168 @@
+"""Tests for the durable panel report outbox and background sender."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from integrations.panel.client import PanelClient
+from integrations.panel.outbox import ReportOutbox
+
+
+def _client(outbox: ReportOutbox, handler) -> PanelClient:
+    client = PanelClient("http://panel.test", "token", company="salehi", outbox=outbox)
+    client.client = httpx.AsyncClient(base_url="http://panel.test", transport=httpx.MockTransport(handler))
+    return client
+
+
+async def _report(client: PanelClient, number_id: int) -> None:
+    await client.report_result(
+        number_id=number_id, phone_number=f"0912000000{number_id}", status="CONNECTED",
+        reason="ok", attempted_at=datetime(2024, 1, 1),
+    )
+
+
+class TestReportOutbox:
+    def test_survives_restart_and_acks(self, tmp_path):
+        path = str(tmp_path / "outbox.sqlite")
+        first = ReportOutbox(path)
+        first.append({"number_id": 1})
+        first.append({"number_id": 2})
+        first.close()
+
+        second = ReportOutbox(path)
+        try:
+            assert len(second) == 2 and second.persistent
+            batch = second.peek(10)
+            assert [payload["number_id"] for _, payload in batch] == [1, 2]
+            second.ack([batch[0][0]])
+            assert [payload["number_id"] for _, payload in second.peek(10)] == [2]
+        finally:
+            second.close()
+
+    def test_cap_drops_oldest(self):
+        outbox = ReportOutbox(max_size=2)
+        for n in range(3):
+            outbox.append({"number_id": n})
+        assert [payload["number_id"] for _, payload in outbox.peek(10)] == [1, 2]
+        assert outbox.stats()["dropped"] == 1
+
+
+class TestReportSender:
+    @pytest.mark.asyncio
+    async def test_report_returns_before_delivery(self):
+        sent = []
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            sent.append(request)
+            return httpx.Response(200, json={})
+
+        client = _client(ReportOutbox(), handler)
+        client.start()
+        try:
+            await asyncio.wait_for(_report(client, 1), 0.5)
+            assert len(client.outbox) == 1
+            release.set()
+            for _ in range(50):
+                if not len(client.outbox):
+                    break
+                await asyncio.sleep(0.01)
+            assert len(sent) == 1 and len(client.outbox) == 0
+            assert client.report_stats()["sent"] == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_reports_are_kept_and_rejected_ones_dropped(self):
+        async def handler(request):
+            number_id = json.loads(request.content)["number_id"]
+            return httpx.Response(503 if number_id == 1 else 422)
+
+        client = _client(ReportOutbox(), handler)
+        await _report(client, 1)
+        await _report(client, 2)
+        delivered, failed = await client._deliver_round()
+        assert (delivered, failed) == (1, 1)
+        assert [payload["number_id"] for _, payload in client.outbox.peek(10)] == [1]
+        assert client.report_stats()["rejected"] == 1
+        client.outbox.ack([item[0] for item in client.outbox.peek(10)])
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_reports_for_one_number_stay_in_order(self):
+        sent = []
+        panel_up = False
+
+        async def handler(request):
+            payload = json.loads(request.content)
+            sent.append((payload["number_id"], payload["status"]))
+            if payload["number_id"] == 1 and not panel_up:
+                return httpx.Response(503)
+            return httpx.Response(200, json={})
+
+        client = _client(ReportOutbox(), handler)
+        for number_id, status in ((1, "MISSED"), (1, "CONNECTED"), (2, "MISSED")):
+            await client.report_result(
+                number_id=number_id, phone_number=f"0912000000{number_id}", status=status,
+                reason="", attempted_at=datetime(2024, 1, 1),
+            )
+        assert await client._deliver_round() == (1, 2)
+        # The final result must not overtake the "missed" that failed before it.
+        assert sorted(sent) == [(1, "MISSED"), (2, "MISSED")]
+
+        panel_up = True
+        sent.clear()
+        assert await client._deliver_round() == (2, 0)
+        assert sent == [(1, "MISSED"), (1, "CONNECTED")]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_close_mid_round_does_not_resend_delivered_reports(self):
+        sent = []
+        first_sent = asyncio.Event()
+
+        async def handler(request):
+            number_id = json.loads(request.content)["number_id"]
+            sent.append(number_id)
+            if number_id == 1:
+                first_sent.set()
+            elif sent.count(2) == 1:
+                await asyncio.sleep(10)  # still in flight when close() cancels the round
+            return httpx.Response(200, json={})
+
+        client = _client(ReportOutbox(), handler)
+        await _report(client, 1)
+        await _report(client, 2)
+        client.start()
+        await asyncio.wait_for(first_sent.wait(), 1)
+        await asyncio.sleep(0.01)
+        await client.close()
+        assert sorted(sent) == [1, 2, 2]
+        assert len(client.outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_unsent_reports_wait_on_disk_for_next_start(self, tmp_path):
+        path = str(tmp_path / "outbox.sqlite")
+
+        async def down(request):
+            raise httpx.ConnectError("panel down")
+
+        client = _client(ReportOutbox(path), down)
+        await _report(client, 1)
+        await client.close()
+
+        received = []
+
+        async def up(request):
+            received.append(request)
+            return httpx.Response(200, json={})
+
+        client = _client(ReportOutbox(path), up)
+        assert len(client.outbox) == 1
+        assert await client._deliver_round() == (1, 0)
+        assert len(received) == 1 and len(client.outbox) == 0
+        await client.close()
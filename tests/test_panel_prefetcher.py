@@ -0,0 +1,128 @@
+"""Tests for the background panel prefetcher and batch de-duplication."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from integrations.panel.client import NextBatchResponse, PanelNumber, PanelOutboundLine
+from logic.dialer import Dialer
+from logic.panel_prefetcher import PanelPrefetcher
+
+
+def _batch(numbers=(), call_allowed=True, retry=None) -> NextBatchResponse:
+    return NextBatchResponse(
+        call_allowed=call_allowed,
+        retry_after_seconds=retry,
+        numbers=[PanelNumber(id=n, phone_number=phone) for n, phone in numbers],
+        agents=[], inbound_agents=[], outbound_agents=[],
+        active_scenarios=None,
+        outbound_lines=[PanelOutboundLine(id=1, phone_number="02100000001")],
+        batch_id="b1", timezone=None, server_time=None, schedule_version=None,
+    )
+
+
+def _dialer(dialer_settings, panel, default_retry=60):
+    settings = dialer_settings(
+        outbound_numbers=[], max_concurrent_calls=3, max_calls_per_minute=100, max_inflight_originations=4,
+        default_retry=default_retry,
+    )
+    sessions = MagicMock()
+    sessions.scenario_handler = None
+    sessions.create_outbound_session = AsyncMock(side_effect=[SimpleNamespace(session_id=f"s{n}") for n in range(10)])
+    sessions.register_protocol_id = AsyncMock()
+    ari = MagicMock()
+    ari.originate_call = AsyncMock(return_value={})
+    dialer = Dialer(settings, ari, sessions, panel_client=panel)
+    dialer._schedule_timeout_watch = MagicMock()
+    return dialer
+
+
+class TestPanelPrefetcher:
+    @pytest.mark.asyncio
+    async def test_low_water_tracks_consumption_rate(self, clock, dialer_settings):
+        panel = MagicMock()
+        dialer = _dialer(dialer_settings, panel, default_retry=10)
+        prefetcher = PanelPrefetcher(dialer, panel, clock=clock)
+        assert prefetcher.low_water() == 1
+
+        # 30 dials in the last minute = 0.5/s; 10 s between polls -> 5 numbers.
+        for _ in range(30):
+            prefetcher.on_consumed()
+        assert prefetcher.low_water() == 5
+        clock.now += 61
+        assert prefetcher.low_water() == 1
+
+    @pytest.mark.asyncio
+    async def test_refill_is_sized_from_capacity_and_queue_depth(self, clock, dialer_settings):
+        panel = MagicMock()
+        panel.get_next_batch = AsyncMock(return_value=_batch([(1, "09120000001")]))
+        dialer = _dialer(dialer_settings, panel)
+        prefetcher = PanelPrefetcher(dialer, panel, clock=clock)
+
+        await prefetcher.poll()
+        # First regular poll: no lines known yet, so no size hint.
+        panel.get_next_batch.assert_awaited_with(size=None)
+        assert prefetcher.call_allowed and len(dialer.contacts) == 1
+        assert not prefetcher.needs_refill()
+
+        await dialer._next_contact()
+        assert prefetcher.needs_refill()
+        await prefetcher.poll(refill=True)
+        # One line with 3 free slots, empty queue.
+        panel.get_next_batch.assert_awaited_with(size=3)
+        assert prefetcher.counters.get("refills") == 1
+        assert prefetcher.earliest_refill == clock.now + 1.0
+
+    @pytest.mark.asyncio
+    async def test_not_allowed_backs_off_and_stops_refills(self, clock, dialer_settings):
+        panel = MagicMock()
+        panel.get_next_batch = AsyncMock(return_value=_batch(call_allowed=False, retry=30))
+        dialer = _dialer(dialer_settings, panel)
+        prefetcher = PanelPrefetcher(dialer, panel, clock=clock)
+
+        await prefetcher.poll()
+        assert prefetcher.next_poll == clock.now + 30
+        assert not prefetcher.needs_refill()
+        assert prefetcher.counters.get("not_allowed") == 1
+
+    @pytest.mark.asyncio
+    async def test_overlapping_batches_are_deduplicated_until_the_call_ends(self, dialer_settings):
+        panel = MagicMock()
+        dialer = _dialer(dialer_settings, panel)
+        numbers = [PanelNumber(id=1, phone_number="0912-000-0001"), PanelNumber(id=2, phone_number="09120000002")]
+        assert await dialer._queue_panel_numbers(numbers, "b1") == 2
+        assert await dialer._queue_panel_numbers([PanelNumber(id=1, phone_number="09120000001")], "b2") == 0
+        assert len(dialer.contacts) == 2
+
+        await dialer._update_outbound_lines([PanelOutboundLine(id=1, phone_number="02100000001")])
+        contact = await dialer._next_contact()
+        line = dialer._reserve_line()
+        await dialer._originate(contact, line)
+        assert dialer.session_number == {"s0": "09120000001"}
+        # Still on a call: the panel re-issuing it is ignored.
+        assert await dialer._queue_panel_numbers([PanelNumber(id=1, phone_number="09120000001")], "b3") == 0
+
+        await dialer.on_session_completed("s0")
+        assert await dialer._queue_panel_numbers([PanelNumber(id=1, phone_number="09120000001")], "b4") == 1
+
+    @pytest.mark.asyncio
+    async def test_dialer_starts_dialing_from_prefetched_batch(self, dialer_settings):
+        panel = MagicMock()
+        panel.get_next_batch = AsyncMock(
+            side_effect=[_batch([(1, "09120000001"), (2, "09120000002")])] + [_batch()] * 10
+        )
+        dialer = _dialer(dialer_settings, panel)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(dialer.run(stop))
+        try:
+            await asyncio.sleep(0.05)
+            # One line: per-line spacing lets a single call through per second.
+            assert dialer.session_manager.create_outbound_session.await_count == 1
+            stats = dialer.stats()["prefetch"]
+            assert stats["counters"]["numbers"] == 2
+            assert stats["queue_depth"] == 1
+        finally:
+            stop.set()
+            await asyncio.wait_for(runner, 1)
@@ -0,0 +1,103 @@
+"""Tests for the dialer rate-limiting primitives."""
+
+import math
+from datetime import datetime, timedelta
+
+from logic.rate_limiter import DailyCounter, RateLimits, ScopedRateLimits, SlidingWindowCounter, TokenBucket
+
+
+class TestTokenBucket:
+    def test_burst_then_refill(self, clock):
+        bucket = TokenBucket(2, clock=clock)
+        assert bucket.try_acquire() and bucket.try_acquire()
+        assert not bucket.try_acquire()
+        assert bucket.delay() == 0.5
+
+        clock.now += 0.5
+        assert bucket.delay() == 0.0
+        assert bucket.try_acquire()
+
+    def test_tokens_cap_at_burst(self, clock):
+        bucket = TokenBucket(10, burst=3, clock=clock)
+        clock.now += 60
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_fractional_rate_spaces_calls(self, clock):
+        bucket = TokenBucket(0.5, clock=clock)
+        bucket.record()
+        assert bucket.delay() == 2.0
+
+    def test_record_overdraws_and_zero_rate_is_unlimited(self, clock):
+        bucket = TokenBucket(1, clock=clock)
+        bucket.record(3)
+        assert bucket.delay() == 3.0
+
+        unlimited = TokenBucket(0, clock=clock)
+        assert all(unlimited.try_acquire() for _ in range(100))
+        assert unlimited.delay() == 0.0
+
+
+class TestSlidingWindowCounter:
+    def test_next_slot_is_oldest_kept_event_plus_window(self, clock):
+        window = SlidingWindowCounter(2, 60, clock=clock)
+        window.record()
+        clock.now += 10
+        window.record()
+        assert window.count() == 2
+        assert window.delay() == 50
+
+        clock.now += 50
+        assert window.delay() == 0.0
+        assert window.remaining() == 1
+
+    def test_keeps_only_limit_events(self, clock):
+        window = SlidingWindowCounter(3, 1.0, clock=clock)
+        for _ in range(1000):
+            window.record()
+        assert len(window.events) == 3
+
+    def test_zero_limit_never_allows(self, clock):
+        window = SlidingWindowCounter(0, 60, clock=clock)
+        assert window.delay() == math.inf
+        window.record()
+        assert window.count() == 0
+
+
+class TestDailyCounter:
+    def test_exhausted_until_midnight_then_resets(self):
+        now = {"value": datetime(2026, 1, 1, 23, 0)}
+        day = DailyCounter(2, now=lambda: now["value"])
+        day.record()
+        day.record()
+        assert day.delay() == 3600
+        assert day.remaining() == 0
+
+        now["value"] += timedelta(hours=1)
+        assert day.delay() == 0.0
+        assert day.count() == 0
+
+
+class TestRateLimits:
+    def test_group_waits_for_slowest_limiter(self, clock):
+        limits = RateLimits(
+            spacing=SlidingWindowCounter(1, 1.0, clock=clock),
+            minute=SlidingWindowCounter(2, 60.0, clock=clock),
+        )
+        assert limits.try_acquire()
+        assert not limits.try_acquire()
+        assert limits.delay() == 1.0
+
+        clock.now += 1
+        assert limits.try_acquire()
+        assert limits.delay() == 59.0
+        assert limits["minute"].count() == 2
+
+    def test_scoped_limits_are_independent_and_droppable(self, clock):
+        scoped = ScopedRateLimits(lambda: RateLimits(spacing=SlidingWindowCounter(1, 1.0, clock=clock)))
+        scoped.get("line-a").record()
+        assert scoped.get("line-a").delay() == 1.0
+        assert scoped.get("line-b").delay() == 0.0
+
+        scoped.drop("line-a")
+        assert "line-a" not in scoped
+        assert scoped.get("line-a").delay() == 0.0
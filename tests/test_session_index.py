@@ -0,0 +1,76 @@
+"""Tests for SessionManager's per-session reverse indexes and lock-free registry."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from sessions.session_manager import SessionManager
+
+
+def _manager() -> SessionManager:
+    return SessionManager(MagicMock(), scenario_handler=None)
+
+
+class TestSessionReverseIndex:
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_only_own_keys(self):
+        manager = _manager()
+        first = await manager.create_outbound_session("09120000001")
+        second = await manager.create_outbound_session("09120000002")
+        for session, tag in ((first, "a"), (second, "b")):
+            manager._index_channel(session.session_id, f"chan-{tag}")
+            await manager.register_protocol_id(session.session_id, f"proto-{tag}")
+            await manager.register_playback(session.session_id, f"play-{tag}")
+            await manager.register_recording(session.session_id, f"rec-{tag}")
+        assert first.channel_keys == {"chan-a"} and first.recording_keys == {"rec-a"}
+
+        manager._unindex_session(first)
+
+        assert first.session_id not in manager.sessions
+        assert manager.channel_to_session == {"chan-b": second.session_id}
+        assert manager.playback_to_session == {"play-b": second.session_id}
+        assert manager.recording_to_session == {"rec-b": second.session_id}
+        assert manager.protocol_id_to_session == {"proto-b": second.session_id}
+        assert not first.channel_keys and not first.protocol_keys
+
+    @pytest.mark.asyncio
+    async def test_remapped_key_moves_to_new_owner(self):
+        manager = _manager()
+        first = await manager.create_outbound_session("09120000001")
+        second = await manager.create_outbound_session("09120000002")
+        manager._index_channel(first.session_id, "chan")
+        manager._index_channel(second.session_id, "chan")
+        assert "chan" not in first.channel_keys and "chan" in second.channel_keys
+
+        # Cleaning the previous owner must not drop the key now owned by another session.
+        manager._unindex_session(first)
+        assert manager.channel_to_session == {"chan": second.session_id}
+
+
+class TestWaitingInboundPromotion:
+    @pytest.mark.asyncio
+    async def test_concurrent_promotions_on_one_line_do_not_double_register(self):
+        manager = _manager()
+        manager._accept_inbound = AsyncMock()
+        registered = []
+
+        async def try_register(session_id, line):
+            await asyncio.sleep(0)
+            registered.append(session_id)
+            return len(registered) == 1  # one free slot
+
+        manager.dialer = SimpleNamespace(try_register_waiting_inbound=try_register)
+        first = await manager.create_outbound_session("09120000001")
+        second = await manager.create_outbound_session("09120000002")
+        manager._queue_waiting_inbound("line", first.session_id, "chan-a")
+        manager._queue_waiting_inbound("line", second.session_id, "chan-b")
+
+        await asyncio.gather(
+            manager._try_start_waiting_inbound("line"),
+            manager._try_start_waiting_inbound("line"),
+        )
+        assert registered == [first.session_id, second.session_id]
+        assert [sid for sid, _ in manager.waiting_inbound["line"]] == [second.session_id]
+        manager._accept_inbound.assert_awaited_once()
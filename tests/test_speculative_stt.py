@@ -0,0 +1,100 @@
+"""Tests for the speculative raw-vs-enhanced STT turn pipeline."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from config.flow_definition import FlowStep, ScenarioConfig, STTConfig
+from sessions.session import Session
+from stt_tts.vira_stt import STTResult
+
+
+def _stt(delays: dict, texts: dict, cancelled: list):
+    async def transcribe_audio(audio, enhance=True, **_):
+        branch = "enhanced" if enhance else "raw"
+        try:
+            await asyncio.sleep(delays[branch])
+        except asyncio.CancelledError:
+            cancelled.append(branch)
+            raise
+        if isinstance(texts[branch], Exception):
+            raise texts[branch]
+        return STTResult(status="ok", text=texts[branch])
+
+    stt = MagicMock()
+    stt.transcribe_audio = transcribe_audio
+    return stt
+
+
+class TestTranscribeSpeculative:
+    @pytest.mark.asyncio
+    async def test_first_non_empty_wins_and_loser_is_cancelled(self, flow_engine):
+        cancelled = []
+        engine = flow_engine(stt=_stt({"raw": 0.0, "enhanced": 0.5}, {"raw": "بله", "enhanced": "بله"}, cancelled))
+        text = await engine._transcribe_speculative(Session("s1"), ScenarioConfig(name="x"), "interest", b"wav")
+        await asyncio.sleep(0)
+
+        assert text == "بله"
+        assert cancelled == ["enhanced"]
+        assert engine.stats()["speculative_wins"] == {"raw": 1}
+        assert engine.stats()["turn_stages"]["stt_raw"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_raw_waits_for_enhanced(self, flow_engine):
+        engine = flow_engine(stt=_stt({"raw": 0.0, "enhanced": 0.01}, {"raw": "", "enhanced": "نه"}, []))
+        assert await engine._transcribe_speculative(Session("s1"), ScenarioConfig(name="x"), "interest", b"wav") == "نه"
+        assert engine.speculative_wins.get("enhanced") == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_surface_only_without_any_answer(self, flow_engine):
+        scenario = ScenarioConfig(name="x")
+        engine = flow_engine(stt=_stt({"raw": 0.0, "enhanced": 0.01}, {"raw": RuntimeError("boom"), "enhanced": ""}, []))
+        assert await engine._transcribe_speculative(Session("s1"), scenario, "interest", b"wav") == ""
+
+        engine = flow_engine(stt=_stt({"raw": 0.0, "enhanced": 0.0}, {"raw": RuntimeError("403"), "enhanced": RuntimeError("403")}, []))
+        with pytest.raises(RuntimeError):
+            await engine._transcribe_speculative(Session("s1"), scenario, "interest", b"wav")
+
+
+class TestPrestartedIntent:
+    @pytest.mark.asyncio
+    async def test_classify_step_reuses_prestarted_detection(self, flow_engine):
+        engine = flow_engine(stt=MagicMock())
+        engine._detect_intent = AsyncMock(return_value="yes")
+        engine._stop_processing_playback = AsyncMock()
+        engine._start_processing_playback = AsyncMock()
+        session = Session("s1")
+        session.metadata["last_transcript"] = "بله"
+        scenario = ScenarioConfig(name="x")
+
+        engine._prestart_intent(session, "بله", scenario)
+        await engine._classify_intent_step(session, FlowStep(step="classify", type="classify_intent"), scenario, False)
+
+        assert engine._detect_intent.await_count == 1
+        assert session.metadata["last_intent"] == "yes"
+        assert session.session_id not in engine.pending_intents
+
+    @pytest.mark.asyncio
+    async def test_intent_detection_starts_when_the_race_is_won(self, flow_engine):
+        order = []
+        engine = flow_engine(stt=_stt({"raw": 0.0, "enhanced": 0.5}, {"raw": "بله", "enhanced": "بله"}, []))
+        scenario = ScenarioConfig(
+            name="x", stt=STTConfig(speculative=True), flow=[FlowStep(step="classify", type="classify_intent")],
+        )
+        engine._get_scenario = MagicMock(return_value=scenario)
+        engine.ari_client.fetch_stored_recording = AsyncMock(return_value=b"wav")
+        engine._is_empty_audio_async = AsyncMock(return_value=False)
+
+        async def detect_intent(transcript, scenario):
+            order.append(("llm", transcript))
+            await asyncio.sleep(0)
+            return "yes"
+
+        engine._detect_intent = detect_intent
+        engine._execute_step = AsyncMock(side_effect=lambda *a, **k: order.append(("step", None)))
+
+        await engine._process_recording(Session("s1"), "rec-1", "interest", False, "classify", None, None)
+
+        assert order == [("llm", "بله"), ("step", None)]
+        assert engine.pending_intents["s1"][0] == "بله"
@@ -0,0 +1,108 @@
+"""Tests for streaming capture over a local RTP stand-in."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from config.flow_definition import STTConfig
+from config.settings import StreamingSettings
+from stt_tts.rtp_stream import LocalRtpSender, RtpReceiver, decode_payload, encode_payload
+from stt_tts.streaming import SpeechEndpointer, StreamingCapture
+from stt_tts.vad import VoiceActivityDetector
+from stt_tts.vira_stt import STTResult
+
+
+RATE = 16000
+
+
+def _utterance(speech_s: list[float], gap_s: float = 0.5, tail_s: float = 1.0) -> np.ndarray:
+    """Tone bursts separated by gaps over a low noise floor."""
+    rng = np.random.default_rng(0)
+    parts = [np.zeros(int(0.3 * RATE))]
+    for idx, seconds in enumerate(speech_s):
+        t = np.arange(int(seconds * RATE)) / RATE
+        parts.append(0.3 * np.sin(2 * np.pi * 300 * t))
+        parts.append(np.zeros(int((gap_s if idx < len(speech_s) - 1 else tail_s) * RATE)))
+    audio = np.concatenate(parts)
+    return (audio + 0.001 * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+class TestCodecs:
+    @pytest.mark.parametrize("codec,tolerance", [("slin16", 1e-4), ("ulaw", 0.02)])
+    def test_round_trip(self, codec, tolerance):
+        samples = (0.5 * np.sin(np.linspace(0, 20, 320))).astype(np.float32)
+
+        decoded = decode_payload(encode_payload(samples, codec), codec)
+
+        assert np.max(np.abs(decoded - samples)) < tolerance
+
+
+class TestSpeechEndpointer:
+    def test_splits_at_pauses_and_ends_after_silence(self):
+        endpointer = SpeechEndpointer(VoiceActivityDetector(RATE), end_silence_ms=700)
+        audio = _utterance([1.2, 0.8])
+
+        events = []
+        for offset in range(0, len(audio), 320):
+            events.extend(endpointer.push(audio[offset:offset + 320]))
+
+        assert [kind for kind, _ in events] == ["segment", "segment", "end"]
+        assert len(events[-1][1]) == 0
+        assert endpointer.done
+
+    def test_silence_never_starts_speech(self):
+        endpointer = SpeechEndpointer(VoiceActivityDetector(RATE))
+
+        assert endpointer.push(np.zeros(RATE, dtype=np.float32)) == []
+        assert not endpointer.speech_detected
+
+
+class TestRtp:
+    @pytest.mark.asyncio
+    async def test_receiver_gets_sender_frames(self):
+        frames = []
+        receiver = RtpReceiver("slin16", frames.append)
+        port = await receiver.start()
+        try:
+            sent = await LocalRtpSender("slin16").send("127.0.0.1", port, np.zeros(RATE, dtype=np.float32), speed=0)
+            await asyncio.sleep(0.05)
+        finally:
+            receiver.close()
+
+        assert sent == 50
+        assert receiver.packets == 50
+        assert sum(len(f) for f in frames) == RATE
+
+
+class TestStreamingCapture:
+    @pytest.mark.asyncio
+    async def test_transcribes_segments_before_max_duration(self):
+        ari = MagicMock()
+        ari.snoop_channel = AsyncMock(return_value={"id": "snoop-1"})
+        ari.external_media = AsyncMock(return_value={"id": "media-1"})
+        ari.create_bridge = AsyncMock(return_value={"id": "bridge-1"})
+        ari.add_channel_to_bridge = AsyncMock()
+        ari.hangup_channel = AsyncMock()
+        ari.delete_bridge = AsyncMock()
+        stt = MagicMock()
+        replies = iter(["سلام", "بله"])
+        stt.transcribe_audio = AsyncMock(side_effect=lambda *a, **k: STTResult("success", next(replies)))
+        capture = StreamingCapture(
+            ari, stt, StreamingSettings("127.0.0.1", "127.0.0.1", "slin16"),
+            "sess-1", "chan-1", "interest", STTConfig(max_duration=10, max_silence=2),
+        )
+
+        await capture.start()
+        await LocalRtpSender("slin16").send("127.0.0.1", capture.tap.receiver.port, _utterance([1.2, 0.8]), speed=0)
+        await asyncio.wait_for(capture.wait_for_end_of_speech(), timeout=2)
+        result = await capture.transcript()
+        await capture.close()
+
+        assert result.reason == "speech_end"
+        assert result.text == "سلام بله"
+        assert result.segments == 2
+        assert stt.transcribe_audio.await_args.kwargs["phase"] == "interest-2"
+        ari.delete_bridge.assert_awaited_once_with("bridge-1")
+        assert ari.hangup_channel.await_count == 2
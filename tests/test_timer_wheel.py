@@ -0,0 +1,93 @@
+"""Tests for the hierarchical timer wheel and the dialer's origination timeouts."""
+
+import asyncio
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.dialer import Dialer
+from utils.timer_wheel import TimerWheel
+
+
+class TestTimerWheel:
+    def test_fires_on_time_never_early(self, clock):
+        wheel = TimerWheel(tick=0.1, clock=clock)
+        fired = []
+        wheel.schedule("a", 1.0, fired.append, "a")
+
+        assert wheel.advance(clock.now + 0.95) == 0
+        assert wheel.advance(clock.now + 1.0) == 1
+        assert fired == ["a"] and wheel.pending() == 0
+
+    def test_cancel_and_reschedule_replace(self, clock):
+        wheel = TimerWheel(tick=0.1, clock=clock)
+        fired = []
+        wheel.schedule("a", 1.0, fired.append, "first")
+        wheel.schedule("a", 2.0, fired.append, "second")
+        wheel.schedule("b", 1.0, fired.append, "b")
+        assert wheel.cancel("b") and not wheel.cancel("b")
+
+        wheel.advance(clock.now + 1.5)
+        assert fired == []
+        wheel.advance(clock.now + 2.0)
+        assert fired == ["second"]
+        assert wheel.stats()["counters"] == {"scheduled": 3, "cancelled": 2, "fired": 1}
+
+    def test_cascading_keeps_every_deadline(self, clock):
+        # Tiny wheels so deadlines cross every level, including beyond the top one.
+        wheel = TimerWheel(tick=1.0, slots=4, levels=3, clock=clock)
+        rng = random.Random(7)
+        fired = {}
+        delays = [rng.randrange(1, 200) for _ in range(300)]
+        for n, delay in enumerate(delays):
+            wheel.schedule(n, delay, lambda n=n: fired.__setitem__(n, clock.now))
+        start = clock.now
+        for _ in range(200):
+            clock.now += 1.0
+            wheel.advance()
+        assert {n: at - start for n, at in fired.items()} == {n: float(d) for n, d in enumerate(delays)}
+
+    def test_late_schedule_after_idle(self, clock):
+        wheel = TimerWheel(tick=0.1, clock=clock)
+        fired = []
+        clock.now += 3600  # idle for an hour, nothing advanced the wheel
+        wheel.schedule("a", 0.5, fired.append, "a")
+        wheel.advance(clock.now + 0.4)
+        assert fired == []
+        wheel.advance(clock.now + 0.5)
+        assert fired == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_driver_runs_coroutine_callbacks(self):
+        wheel = TimerWheel(tick=0.01)
+        done = asyncio.Event()
+
+        async def callback(value):
+            done.set()
+            return value
+
+        try:
+            wheel.schedule("a", 0.02, callback, 1)
+            await asyncio.wait_for(done.wait(), 1)
+            assert wheel.pending() == 0
+        finally:
+            await wheel.stop()
+
+
+class TestOriginationTimeout:
+    @pytest.mark.asyncio
+    async def test_answer_and_hangup_cancel_the_timeout(self, clock, dialer_settings):
+        dialer = Dialer(dialer_settings(), AsyncMock(), MagicMock(), timers=TimerWheel(clock=clock))
+        dialer._mark_missed_if_no_events = MagicMock()
+        dialer._schedule_timeout_watch("s1")
+        dialer._schedule_timeout_watch("s2")
+        dialer._schedule_timeout_watch("s3")
+
+        dialer.on_call_answered("s1")
+        await dialer.on_session_completed("s2")
+        dialer.timers.advance(clock.now + 30)
+
+        dialer._mark_missed_if_no_events.assert_called_once_with("s3")
+        assert dialer.stats()["timers"]["pending"] == 0
+        await dialer.timers.stop()
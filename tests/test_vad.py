@@ -0,0 +1,94 @@
+"""Tests for the local VAD and VAD-driven recording stop."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from config.flow_definition import VADConfig
+from config.settings import StreamingSettings
+from stt_tts.rtp_stream import LocalRtpSender
+from stt_tts.streaming import VadRecordingMonitor
+from stt_tts.vad import UtteranceEndDetector, VoiceActivityDetector
+from utils.metrics import Histogram
+
+
+RATE = 16000
+
+
+def _speech_then_silence(speech_s: float = 0.8, silence_s: float = 1.2) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    t = np.arange(int(speech_s * RATE)) / RATE
+    voiced = 0.2 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    audio = np.concatenate([np.zeros(int(0.2 * RATE)), voiced, np.zeros(int(silence_s * RATE))])
+    return (audio + 0.002 * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+def _ari() -> MagicMock:
+    ari = MagicMock()
+    ari.snoop_channel = AsyncMock(return_value={"id": "snoop-1"})
+    ari.external_media = AsyncMock(return_value={"id": "media-1"})
+    ari.create_bridge = AsyncMock(return_value={"id": "bridge-1"})
+    ari.add_channel_to_bridge = AsyncMock()
+    ari.hangup_channel = AsyncMock()
+    ari.delete_bridge = AsyncMock()
+    ari.stop_recording = AsyncMock()
+    return ari
+
+
+class TestVoiceActivityDetector:
+    def test_noise_is_not_speech_and_tone_is(self):
+        vad = VoiceActivityDetector(RATE, mode=2)
+        noise = 0.003 * np.random.default_rng(0).standard_normal((25, vad.frame_len))
+        tone = 0.2 * np.sin(2 * np.pi * 200 * np.arange(25 * vad.frame_len) / RATE).reshape(25, -1)
+
+        assert not vad.classify(noise.astype(np.float32)).any()
+        assert vad.classify(tone.astype(np.float32)).all()
+
+    def test_end_detector_fires_once_after_silence(self):
+        detector = UtteranceEndDetector(VoiceActivityDetector(RATE), min_speech_ms=200, end_silence_ms=600)
+        audio = _speech_then_silence()
+
+        fired_at = [
+            offset for offset in range(0, len(audio), 320) if detector.push(audio[offset:offset + 320])
+        ]
+
+        assert len(fired_at) == 1
+        # 0.2 s lead-in + 0.8 s speech + 0.6 s silence
+        assert abs(fired_at[0] / RATE - 1.6) < 0.1
+
+
+class TestVadRecordingMonitor:
+    @pytest.mark.parametrize("stop", [True, False])
+    @pytest.mark.asyncio
+    async def test_stops_recording_at_end_of_utterance(self, stop):
+        ari = _ari()
+        monitor = VadRecordingMonitor(
+            ari, StreamingSettings("127.0.0.1", "127.0.0.1", "slin16"), "sess-1", "chan-1",
+            "interest-sess-1", VADConfig(enabled=True, stop_recording=stop, end_silence_ms=600),
+        )
+
+        await monitor.start()
+        await LocalRtpSender("slin16").send("127.0.0.1", monitor.tap.receiver.port, _speech_then_silence(), speed=0)
+        await asyncio.sleep(0.05)
+        await monitor.close()
+
+        assert monitor.last_voice_at is not None
+        assert monitor.stopped is stop
+        if stop:
+            ari.stop_recording.assert_awaited_once_with("interest-sess-1")
+        else:
+            ari.stop_recording.assert_not_awaited()
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        hist = Histogram(buckets_ms=(100, 500))
+        for seconds in (0.05, 0.2, 0.3, 2.0):
+            hist.observe(seconds)
+
+        snap = hist.snapshot()
+
+        assert snap["buckets"] == {"le_100": 1, "le_500": 3, "inf": 4}
+        assert snap["count"] == 4
@@ -0,0 +1,86 @@
+"""Tests for startup warm-up and readiness."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from config.flow_definition import ScenarioConfig
+from core.ari_client import AriClient
+from core.warmup import Readiness, WarmupResult, open_connections, warm_up
+
+
+def _mock_client(handler, base_url="http://upstream.test"):
+    return httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(handler))
+
+
+class TestOpenConnections:
+    @pytest.mark.asyncio
+    async def test_counts_responses_and_raises_when_all_fail(self):
+        async with _mock_client(lambda request: httpx.Response(405)) as client:
+            assert await open_connections(client, "HEAD", "/", 3) == 3
+            with pytest.raises(httpx.HTTPStatusError):
+                await open_connections(client, "HEAD", "/", 2, require_ok=True)
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_checks_upstreams_prompts_and_websocket(self):
+        seen = []
+
+        def ari_handler(request):
+            seen.append(request.url.raw_path.decode())
+            if request.url.raw_path == b"/ari/sounds/custom%2Fmissing":
+                return httpx.Response(404)
+            return httpx.Response(200, json={})
+
+        ari = AriClient(SimpleNamespace(base_url="http://ari.test/ari", app_name="app", username="u", password="p"))
+        ari.client = _mock_client(ari_handler, "http://ari.test/ari")
+        ws = SimpleNamespace(connected=asyncio.Event())
+        ws.connected.set()
+        scenario = ScenarioConfig(name="s", prompts={"hello": "sound:custom/hello", "bye": "sound:custom/missing"})
+        registry = MagicMock()
+        registry.get_all.return_value = {"s": scenario}
+        upstream = SimpleNamespace(client=_mock_client(lambda request: httpx.Response(200)), api_key="")
+        settings = SimpleNamespace(
+            warmup=SimpleNamespace(connections=2, timeout=1.0),
+            vira=SimpleNamespace(stt_url="http://upstream.test/stt", tts_url=""),
+        )
+
+        results = {r.name: r for r in await warm_up(settings, ari, ws, registry, upstream, upstream, upstream)}
+
+        assert seen.count("/ari/asterisk/info") == 2
+        assert results["ari"].ok and results["ari_ws"].ok and results["vira_stt"].opened == 2
+        assert not results["prompts"].ok and "custom/missing" in results["prompts"].detail
+        assert "gapgpt" not in results and "vira_tts" not in results
+
+    @pytest.mark.asyncio
+    async def test_websocket_timeout_is_reported(self):
+        ari = AriClient(SimpleNamespace(base_url="http://ari.test/ari", app_name="app", username="u", password="p"))
+        ari.client = _mock_client(lambda request: httpx.Response(200, json={}), "http://ari.test/ari")
+        registry = MagicMock()
+        registry.get_all.return_value = {}
+        settings = SimpleNamespace(
+            warmup=SimpleNamespace(connections=1, timeout=0.05),
+            vira=SimpleNamespace(stt_url="", tts_url=""),
+        )
+        results = await warm_up(
+            settings, ari, SimpleNamespace(connected=asyncio.Event()), registry,
+            None, None, SimpleNamespace(api_key=""),
+        )
+        readiness = Readiness()
+        assert readiness.mark(results) is False
+
+
+class TestReadiness:
+    def test_file_tracks_required_checks(self, tmp_path):
+        path = tmp_path / "run" / "ready.json"
+        readiness = Readiness(str(path))
+        assert readiness.mark([WarmupResult("ari", True), WarmupResult("ari_ws", True), WarmupResult("prompts", False)])
+        assert json.loads(path.read_text())["ready"] is True
+
+        readiness.clear()
+        assert not path.exists() and readiness.ready is False
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyStats:
+    """
+    Rolling latency tracker (seconds in, milliseconds out).
+    Keeps lifetime count/total/max and a bounded window for percentiles.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._recent.append(seconds)
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            values = sorted(self._recent)
+        if not values:
+            return 0.0
+        idx = min(len(values) - 1, max(0, int(round(pct / 100.0 * (len(values) - 1)))))
+        return values[idx]
+
+    def snapshot(self) -> Dict[str, float]:
+        avg = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "avg_ms": round(avg * 1000, 2),
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class _Timer:
+    def __init__(self, stats: LatencyStats):
+        self.stats = stats
+        self.start: Optional[float] = None
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - (self.start or time.perf_counter())
+        self.stats.observe(self.elapsed)
+
+
+class Counters:
+    """
+    Named integer counters (e.g. per-status or per-event-type).
+    """
+
+    def __init__(self):
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, key: str) -> int:
+        return self._values.get(key, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (seconds in, millisecond bucket bounds).
+    Bucket keys are cumulative upper bounds, Prometheus style ("le_500", ..., "inf").
+    """
+
+    DEFAULT_BUCKETS_MS = (100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+    def __init__(self, buckets_ms: tuple = DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.bounds) + 1)
+        self.latency = LatencyStats()
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        idx = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if ms <= bound:
+                idx = i
+                break
+        with self._lock:
+            self._counts[idx] += 1
+        self.latency.observe(seconds)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self._counts)
+        buckets: Dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.bounds, counts):
+            running += count
+            buckets[f"le_{bound}"] = running
+        buckets["inf"] = running + counts[-1]
+        return {"buckets": buckets, **self.latency.snapshot()}
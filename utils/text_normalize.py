@@ -0,0 +1,37 @@
+"""
+Persian transcript normalization for matching and cache keys.
+"""
+import re
+
+# Arabic code points STT sometimes emits -> Persian equivalents.
+_CHAR_MAP = {
+    "ي": "ی",  # ARABIC YEH -> FARSI YEH
+    "ى": "ی",  # ALEF MAKSURA -> FARSI YEH
+    "ك": "ک",  # ARABIC KAF -> KEHEH
+    "ة": "ه",  # TEH MARBUTA -> HEH
+    "أ": "ا",  # ALEF WITH HAMZA ABOVE
+    "إ": "ا",  # ALEF WITH HAMZA BELOW
+    "ٱ": "ا",  # ALEF WASLA
+    "آ": "ا",  # ALEF WITH MADDA
+    "ؤ": "و",  # WAW WITH HAMZA
+}
+# ZWNJ/ZWJ/ZWSP separate words ("نه‌خیر", "بله‌ام"), so they become spaces;
+# BOM, tatweel and harakat are dropped.
+for _cp in ("​", "‌", "‍"):
+    _CHAR_MAP[_cp] = " "
+for _cp in ("﻿", "ـ", "ٰ", *map(chr, range(0x064B, 0x0653))):
+    _CHAR_MAP[_cp] = ""
+# Persian and Arabic-Indic digits -> ASCII.
+for _i in range(10):
+    _CHAR_MAP[chr(0x06F0 + _i)] = str(_i)
+    _CHAR_MAP[chr(0x0660 + _i)] = str(_i)
+_TRANSLATION = str.maketrans(_CHAR_MAP)
+
+_PUNCTUATION = re.compile(r"[\s\.,!?;:\"'()\[\]\-،؛؟«»]+")
+
+
+def normalize_persian(text: str) -> str:
+    """Lowercase, unify Arabic/Persian letters, split on ZWNJ, drop diacritics, fold punctuation and whitespace."""
+    if not text:
+        return ""
+    return _PUNCTUATION.sub(" ", text.lower().translate(_TRANSLATION)).strip()
@@ -0,0 +1,200 @@
+"""
+Hierarchical timer wheel for per-session deadlines.
+
+One driver task serves every timer (origination timeouts, operator timeouts,
+max call duration, recording watchdogs...) instead of one sleeping task per
+deadline. Timers are bucketed by expiry tick into `levels` wheels of `slots`
+slots each: level 0 holds timers due within `slots` ticks, level 1 within
+`slots**2`, and so on; when a lower wheel wraps, the matching higher slot is
+cascaded down. Scheduling and cancelling are O(1); each tick only touches the
+slot that is due.
+
+Timers are keyed, typically `(session_id, "origination")`: scheduling an
+existing key replaces it and `cancel(key)` removes it, so callers cancel
+deadlines explicitly when the call is answered or hung up. Callbacks may be
+plain functions or coroutine functions (run as tasks when they fire).
+Resolution is one tick (`tick` seconds, 0.1 by default); timers never fire
+early.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+from utils.metrics import Counters, LatencyStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    __slots__ = ("key", "expires", "deadline", "callback", "args", "level", "slot")
+
+    def __init__(self, key: Hashable, expires: int, deadline: float, callback: Callable, args: tuple):
+        self.key = key
+        self.expires = expires  # absolute tick
+        self.deadline = deadline  # clock time, for lateness stats
+        self.callback = callback
+        self.args = args
+        self.level = 0
+        self.slot = 0
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 64,
+        levels: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError("TimerWheel needs tick > 0, slots >= 2 and levels >= 1")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.clock = clock
+        self.origin = clock()
+        self.current = 0  # last processed tick
+        self.wheels: List[List[Dict[Hashable, TimerHandle]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self.timers: Dict[Hashable, TimerHandle] = {}
+        self.counters = Counters()
+        self.lateness = LatencyStats()
+        self._nonempty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: Set[asyncio.Task] = set()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.timers
+
+    def pending(self) -> int:
+        return len(self.timers)
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        """Run `callback(*args)` after `delay` seconds; replaces any timer already under `key`."""
+        self.cancel(key)
+        if not self.timers:
+            self.advance()  # catch up after idling so the new timer lands in level 0 when it can
+        deadline = self.clock() + max(0.0, delay)
+        # Round up so a timer never fires early; the current tick is already processed.
+        expires = max(self.current + 1, math.ceil((deadline - self.origin) / self.tick))
+        handle = TimerHandle(key, expires, deadline, callback, args)
+        self.timers[key] = handle
+        self._place(handle)
+        self.counters.inc("scheduled")
+        self._nonempty.set()
+        self._ensure_running()
+        return handle
+
+    def cancel(self, key: Hashable) -> bool:
+        handle = self.timers.pop(key, None)
+        if handle is None:
+            return False
+        del self.wheels[handle.level][handle.slot][key]
+        self.counters.inc("cancelled")
+        return True
+
+    def _place(self, handle: TimerHandle) -> None:
+        delta = handle.expires - self.current
+        level = 0
+        span = self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+        # Beyond the top wheel: park in its furthest slot; cascading re-places it.
+        expires = min(handle.expires, self.current + span - 1)
+        handle.level = level
+        handle.slot = (expires // self.slots ** level) % self.slots
+        self.wheels[level][handle.slot][handle.key] = handle
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """Process every tick up to `now` (default: the clock), firing due timers; returns the number fired."""
+        target = int(((self.clock() if now is None else now) - self.origin) / self.tick)
+        fired = 0
+        while self.current < target:
+            if not self.timers:
+                self.current = target
+                break
+            self.current += 1
+            self._cascade()
+            due = self.wheels[0][self.current % self.slots]
+            if due:
+                self.wheels[0][self.current % self.slots] = {}
+                for handle in due.values():
+                    del self.timers[handle.key]
+                    self._fire(handle)
+                    fired += 1
+        return fired
+
+    def _cascade(self) -> None:
+        # Highest wheel first, so timers it hands down land in slots not yet processed.
+        for level in range(self.levels - 1, 0, -1):
+            span = self.slots ** level
+            if self.current % span:
+                continue
+            slot = (self.current // span) % self.slots
+            bucket = self.wheels[level][slot]
+            if bucket:
+                self.wheels[level][slot] = {}
+                for handle in bucket.values():
+                    self._place(handle)
+
+    def _fire(self, handle: TimerHandle) -> None:
+        self.counters.inc("fired")
+        self.lateness.observe(max(0.0, self.clock() - handle.deadline))
+        try:
+            result = handle.callback(*handle.args)
+        except Exception as exc:
+            self.counters.inc("errors")
+            logger.exception("Timer %r callback failed: %s", handle.key, exc)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self._callbacks.add(task)
+            task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        self._callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.counters.inc("errors")
+            logger.error("Timer callback failed: %s", task.exception(), exc_info=task.exception())
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No loop yet (sync setup code); the next schedule inside the loop starts it.
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            if not self.timers:
+                self._nonempty.clear()
+                await self._nonempty.wait()
+            next_tick = self.origin + (self.current + 1) * self.tick
+            await asyncio.sleep(max(0.0, next_tick - self.clock()))
+            try:
+                self.advance()
+            except Exception as exc:
+                logger.exception("Timer wheel tick failed: %s", exc)
+
+    async def stop(self) -> None:
+        tasks = list(self._callbacks)
+        if self._task:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.timers),
+            "tick_ms": round(self.tick * 1000, 1),
+            "counters": self.counters.snapshot(),
+            "lateness": self.lateness.snapshot(),
+        }